@@ -41,27 +41,44 @@ class ArcDataCommandsLoader(AzCommandsLoader):
         return self.command_table
 
     def load_arguments(self, command):
-        from azext_arcdata.postgres.arguments import (
-            load_arguments as postgres_arguments,
-        )
-        from azext_arcdata.sqlmi.arguments import (
-            load_arguments as sqlmi_arguments,
-        )
-        from azext_arcdata.sqlmidb.arguments import (
-            load_arguments as sqlmidb_arguments,
-        )
-        from azext_arcdata.dc.arguments import (
-            load_arguments as dc_arguments,
-        )
-        from azext_arcdata.ad_connector.arguments import (
-            load_arguments as ad_arguments,
-        )
+        """
+        Load the arguments of the command groups the given command belongs
+        to, so that a command does not import every group's argument module.
+        Every group is loaded when the command is not known.
+        """
+        import importlib
+
+        modules = [
+            module
+            for module, scopes in _ARGUMENT_SCOPES
+            if any(_in_scope(command, scope) for scope in scopes)
+        ] or [module for module, _ in _ARGUMENT_SCOPES]
+
+        for module in modules:
+            importlib.import_module(module).load_arguments(self, command)
+
+
+_ARGUMENT_SCOPES = [
+    ("azext_arcdata.postgres.arguments", ["postgres arc-server"]),
+    (
+        "azext_arcdata.sqlmi.arguments",
+        ["sql mi-arc", "sql instance-failover-group-arc"],
+    ),
+    ("azext_arcdata.sqlmidb.arguments", ["sql midb-arc"]),
+    (
+        "azext_arcdata.dc.arguments",
+        ["arcdata dc", "arcdata resource-kind", "arc resource"],
+    ),
+    ("azext_arcdata.ad_connector.arguments", ["arcdata ad-connector"]),
+]
+"""
+The argument module of each command group and the command scopes it
+registers arguments for, in the order they are loaded.
+"""
+
 
-        postgres_arguments(self, command)
-        sqlmi_arguments(self, command)
-        sqlmidb_arguments(self, command)
-        dc_arguments(self, command)
-        ad_arguments(self, command)
+def _in_scope(command, scope):
+    return command == scope or (command or "").startswith(scope + " ")
 
 
 COMMAND_LOADER_CLS = ArcDataCommandsLoader
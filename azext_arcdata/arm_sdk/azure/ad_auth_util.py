@@ -14,9 +14,17 @@ from knack.log import get_logger
 import atexit
 import os
 import msal
+import threading
+import time
 
 log = get_logger(__name__)
 
+TOKEN_REFRESH_MARGIN_SECONDS = 5 * 60
+"""
+Tokens expiring within this many seconds are refreshed before being handed
+out.
+"""
+
 # #############################################################################
 # -- AAD related functions --
 # #############################################################################
@@ -124,43 +132,159 @@ def _get_token_using_msal(spn, scopes):
 
     :return: auth token string, None if auth fails
     """
-    cache = msal.SerializableTokenCache()
-    cache_file = _get_cache_file()
-    if os.path.exists(cache_file):
-        cache.deserialize(open(cache_file, "r").read())
-    atexit.register(
-        lambda: open(cache_file, "w").write(cache.serialize())
-        if cache.has_state_changed
-        else None
-    )
-
-    app = msal.ConfidentialClientApplication(
-        spn.client_id,
-        spn.client_secret,
-        azure_constants.AAD_LOGIN_URL + spn.tenant_id,
-        token_cache=cache,
-    )
-
-    # First look up a token from cache, since we are looking for token for the
-    # current app, NOT for an end user. Notice we give account parameter as
-    # None.
-    result = app.acquire_token_silent(scopes, account=None)
-    if result:
-        log.info("Get AAD token from cache.")
-    else:
-        log.info("No suitable token exists in cache. Get a new one from AAD.")
-        result = app.acquire_token_for_client(scopes)
-    if "access_token" in result:
-        return result["access_token"]
-    else:
-        log.error(
-            "Failed to get access token from AAD with the following error"
-        )
-        log.error('Error: "{}"'.format(result.get("error")))
-        log.error(
-            'Error description: "{}"'.format(result.get("error_description"))
-        )
-        log.error('Correlation Id: "{}"'.format(result.get("correlation_id")))
+    return _token_broker.get_token(spn, scopes)
+
+
+class _TokenBroker(object):
+    """
+    Process wide AAD token broker. The token cache file is read once and
+    written back once at exit, one MSAL application is kept per service
+    principal and the tokens handed out are kept in memory per (tenant,
+    client, scopes) until they are about to expire.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._cache = None
+        self._apps = {}
+        self._tokens = {}
+
+    def get_token(self, spn, scopes):
+        key = (spn.tenant_id, spn.client_id, tuple(sorted(scopes)))
+
+        with self._lock:
+            token = self._tokens.get(key)
+            if token and token["expires_on"] - time.time() > (
+                TOKEN_REFRESH_MARGIN_SECONDS
+            ):
+                return token["access_token"]
+
+            app = self._get_app(spn)
+
+            # First look up a token from cache, since we are looking for token
+            # for the current app, NOT for an end user. Notice we give account
+            # parameter as None.
+            result = app.acquire_token_silent(list(scopes), account=None)
+            if result and result.get("expires_in", 0) > (
+                TOKEN_REFRESH_MARGIN_SECONDS
+            ):
+                log.info("Get AAD token from cache.")
+            else:
+                log.info(
+                    "No suitable token exists in cache. Get a new one from AAD."
+                )
+                result = app.acquire_token_for_client(list(scopes))
+
+            if "access_token" not in result:
+                log.error(
+                    "Failed to get access token from AAD with the following "
+                    "error"
+                )
+                log.error('Error: "{}"'.format(result.get("error")))
+                log.error(
+                    'Error description: "{}"'.format(
+                        result.get("error_description")
+                    )
+                )
+                log.error(
+                    'Correlation Id: "{}"'.format(result.get("correlation_id"))
+                )
+                return None
+
+            self._tokens[key] = {
+                "access_token": result["access_token"],
+                "expires_on": time.time() + int(result.get("expires_in", 0)),
+            }
+            return result["access_token"]
+
+    def _get_app(self, spn):
+        """
+        Get the MSAL application of the service principal, creating it (and
+        loading the token cache) on first use.
+        """
+        key = (spn.tenant_id, spn.client_id)
+        app, client_secret = self._apps.get(key, (None, None))
+
+        if app is None or client_secret != spn.client_secret:
+            app = msal.ConfidentialClientApplication(
+                spn.client_id,
+                spn.client_secret,
+                azure_constants.AAD_LOGIN_URL + spn.tenant_id,
+                token_cache=self._get_cache(),
+            )
+            self._apps[key] = (app, spn.client_secret)
+
+        return app
+
+    def _get_cache(self):
+        if self._cache is None:
+            cache = msal.SerializableTokenCache()
+            cache_file = _get_cache_file()
+            with _cache_file_lock(cache_file):
+                with open(cache_file, "r") as f:
+                    content = f.read()
+            if content:
+                cache.deserialize(content)
+
+            self._cache = cache
+            atexit.register(self.save)
+
+        return self._cache
+
+    def save(self):
+        """
+        Write the token cache back to disk if it changed.
+        """
+        with self._lock:
+            if self._cache is None or not self._cache.has_state_changed:
+                return
+
+            cache_file = _get_cache_file()
+            with _cache_file_lock(cache_file):
+                with open(cache_file, "w") as f:
+                    f.write(self._cache.serialize())
+            self._cache.has_state_changed = False
+
+
+_token_broker = _TokenBroker()
+
+
+class _cache_file_lock(object):
+    """
+    Exclusive lock on the token cache file, shared with other processes
+    through a sibling lock file.
+    """
+
+    def __init__(self, cache_file):
+        self._path = cache_file + ".lock"
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self._path, "a+")
+        if os.name == "nt":
+            import msvcrt
+
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if os.name == "nt":
+                import msvcrt
+
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
 
 
 def _get_cache_file():
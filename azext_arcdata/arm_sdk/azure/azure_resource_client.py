@@ -44,12 +44,19 @@ from azext_arcdata.dc.exceptions import (
     ServerError,
     RequestTimeoutError,
 )
+from azext_arcdata.core.http_session import get_session
 from azext_arcdata.core.output import OutputStream
-from azext_arcdata.core.util import retry
+from azext_arcdata.core.util import (
+    format_retry_stats,
+    retry,
+    retry_deadline,
+    submit_in_context,
+)
 from urllib3.exceptions import NewConnectionError, MaxRetryError, TimeoutError
 from knack.log import get_logger
 from requests.exceptions import HTTPError
 
+import hashlib
 import json
 import os
 import uuid
@@ -58,9 +65,21 @@ import requests
 
 CONNECTION_RETRY_ATTEMPTS = 12
 RETRY_INTERVAL = 5
+SHADOW_RESOURCE_UPLOAD_MAX_WORKERS = 8
+UPLOAD_RETRY_DEADLINE_SECONDS = 30 * 60
 
 log = get_logger(__name__)
 
+
+def _get_azure_session(url):
+    """
+    Get the shared session for an Azure url. The calls of this client are
+    retried with `retry` by their callers, so the session does not retry on
+    its own and the attempts do not multiply.
+    """
+    return get_session(url, max_retries=0)
+
+
 err_msg = '\tFailed to {} resource: "{}" with error: "{}"'
 
 __all__ = ["AzureResourceClient"]
@@ -181,7 +200,7 @@ class AzureResourceClient(object):
             subscription_id, resource_group_name, instance_type, resource_name
         )
         try:
-            response = requests.put(
+            response = _get_azure_session(url).put(
                 url,
                 headers=self._get_header(resource_uri),
                 data=json.dumps(params),
@@ -213,7 +232,9 @@ class AzureResourceClient(object):
             subscription_id, resource_group_name, instance_type, resource_name
         )
         try:
-            response = requests.get(url, headers=self._get_header(resource_uri))
+            response = _get_azure_session(url).get(
+                url, headers=self._get_header(resource_uri)
+            )
             response.raise_for_status()
         except requests.exceptions.HTTPError as e:
             log.error(err_msg.format("Get", resource_name, e.response.text))
@@ -230,7 +251,9 @@ class AzureResourceClient(object):
             subscription_id, resource_group_name, instance_type, resource_name
         )
         try:
-            response = requests.get(url, headers=self._get_header(resource_uri))
+            response = _get_azure_session(url).get(
+                url, headers=self._get_header(resource_uri)
+            )
             response.raise_for_status()
         except requests.exceptions.HTTPError as e:
             if response.status_code == 404:
@@ -256,6 +279,44 @@ class AzureResourceClient(object):
             )
         )
 
+    def list_azure_resources(
+        self, instance_type, subscription_id, resource_group_name
+    ):
+        """
+        List the Azure resources of a type in a resource group
+        :param instance_type: Azure resource type
+        :param subscription_id: Azure subscription ID
+        :param resource_group_name: resource group name
+        :return: The resources, following every page of the listing.
+        """
+        resource_uri = azure_constants.RESOURCE_URI.format(
+            subscription_id, resource_group_name, instance_type, ""
+        ).rstrip("/")
+
+        api_version = azure_constants.API_VERSION
+
+        if instance_type == INSTANCE_TYPE_POSTGRES:
+            api_version = azure_constants.PG_API_VERSION
+
+        url = (
+            self._get_rp_endpoint()
+            + resource_uri
+            + azure_constants.AZURE_ARM_API_VERSION_STR
+            + api_version
+        )
+
+        resources = []
+        while url:
+            response = _get_azure_session(url).get(
+                url, headers=self._get_header(resource_uri)
+            )
+            response.raise_for_status()
+            page = response.json()
+            resources.extend(page.get("value", []))
+            url = page.get("nextLink")
+
+        return resources
+
     def delete_azure_resource(
         self, resource_name, instance_type, subscription_id, resource_group_name
     ):
@@ -275,7 +336,7 @@ class AzureResourceClient(object):
                 resource_name,
             )
 
-            response = requests.delete(
+            response = _get_azure_session(url).delete(
                 url, headers=self._get_header(resource_uri)
             )
             response.raise_for_status()
@@ -335,7 +396,7 @@ class AzureResourceClient(object):
             resource_name,
         )
 
-        response = requests.put(
+        response = _get_azure_session(url).put(
             url, headers=self._get_header(resource_uri), data=json.dumps(params)
         )
         try:
@@ -421,7 +482,7 @@ class AzureResourceClient(object):
 
     @staticmethod
     def _post(url, body, headers):
-        response = requests.post(url, data=body, headers=headers)
+        response = _get_azure_session(url).post(url, data=body, headers=headers)
 
         try:
             response.raise_for_status()
@@ -1010,21 +1071,31 @@ class AzureResourceClient(object):
 
         return True
 
-    def upload_dc_resource(self, path):
+    def upload_dc_resource(self, path, concurrency=None):
         """
-        Upload data file exported from a data controller to Azure.
+        Upload data file exported from a data controller to Azure. The
+        retried calls of the whole upload share a deadline of
+        `UPLOAD_RETRY_DEADLINE_SECONDS`.
+        :param path: The path of the exported data file.
+        :param concurrency: The maximum number of parallel uploads of metrics
+        resources or log batches.
         """
+        try:
+            with retry_deadline(UPLOAD_RETRY_DEADLINE_SECONDS):
+                self._upload_dc_resource(path, concurrency)
+        finally:
+            for line in format_retry_stats():
+                log.debug("Retried %s", line)
 
+    def _upload_dc_resource(self, path, concurrency):
         import uuid
         from datetime import datetime
-        from jsonschema import validate
-        from azext_arcdata.core.serialization import Sanitizer
         from azext_arcdata.dc.constants import LAST_USAGE_UPLOAD_FLAG
         from azext_arcdata.arm_sdk.azure.export_util import (
+            ExportFileReader,
             ExportType,
             logs_upload,
             metrics_upload,
-            EXPORT_DATA_JSON_SCHEMA,
             EXPORT_FILE_DICT_KEY,
             EXPORT_SANITIZERS,
             get_export_timestamp_from_file,
@@ -1034,15 +1105,17 @@ class AzureResourceClient(object):
         )
 
         log.debug("Uploading file: '%s'", path)
-        with open(path, encoding="utf-8") as input_file:
-            data = json.load(input_file)
-            data = Sanitizer.sanitize_object(data, EXPORT_SANITIZERS)
-            validate(data, EXPORT_DATA_JSON_SCHEMA)
+
+        # Only the top level properties are loaded here, the instance lists
+        # and data entries are streamed from the file as they are uploaded
+        #
+        reader = ExportFileReader(path, EXPORT_SANITIZERS)
+        data = reader.read_header()
 
         # Check expected properties
         #
         for expected_key in EXPORT_FILE_DICT_KEY:
-            if expected_key not in data:
+            if expected_key not in reader.keys:
                 raise ValueError(
                     '"{}" is not found in the input file "{}".'.format(
                         expected_key, path
@@ -1072,37 +1145,15 @@ class AzureResourceClient(object):
         set_azure_upload_status(data_controller, data_controller_azure)
         self._create_dc_azure_resource(data_controller)
 
-        # Delete shadow resources for resource instances deleted from the
-        # cluster in k8s
+        # Delete/Create/Update shadow resources for resource instances deleted
+        # from or still active in the cluster in k8s
         #
-        deleted = dict()
-
-        for instance in data["deletedInstances"]:
-            instance_key = "{}/{}.{}".format(
-                instance["kind"],
-                instance["instanceName"],
-                instance["instanceNamespace"],
-            )
-
-            if instance_key not in deleted.keys():
-                try:
-                    self._delete_azure_resource(instance, data_controller)
-                    deleted[instance_key] = True
-                except Exception as e:
-                    self.stdout(
-                        'Failed to delete Azure resource for "{}" in "{}".'.format(
-                            instance["instanceName"],
-                            instance["instanceNamespace"],
-                        )
-                    )
-                    self.stderr(e)
-                    continue
-
-        # Create/Update shadow resources for resource instances still active in
-        # the cluster in k8s
-        #
-        for instance in data["instances"]:
-            self._create_azure_resource(instance, data_controller)
+        self._reconcile_azure_resources(
+            reader.iter_items("deletedInstances"),
+            reader.iter_items("instances"),
+            data_controller,
+            max_workers=concurrency,
+        )
 
         data_timestamp = datetime.strptime(
             data["dataTimestamp"], "%Y-%m-%dT%H:%M:%S.%fZ"
@@ -1112,23 +1163,28 @@ class AzureResourceClient(object):
         #
         try:
             if export_type == ExportType.metrics.value:
-                metrics_upload(data["data"])
+                metrics_upload(
+                    reader.iter_items("data"), max_workers=concurrency
+                )
             elif export_type == ExportType.logs.value:
                 (
                     customer_id,
                     shared_key,
                 ) = get_log_workspace_credentials_from_env()
                 self.stdout('Log Analytics workspace: "{}"'.format(customer_id))
-                for file in data["data"]:
-                    with open(file, encoding="utf-8") as input_file:
-                        data = json.load(input_file)
-                    logs_upload(data["data"], customer_id, shared_key)
+                for file in reader.iter_items("data"):
+                    logs_upload(
+                        ExportFileReader(file).iter_items("data"),
+                        customer_id,
+                        shared_key,
+                        max_workers=concurrency,
+                    )
             elif export_type == "usage":
                 if data_controller:
                     self.stdout("\n")
                     self.stdout("Start uploading usage...")
                     correlation_vector = str(uuid.uuid4())
-                    for usage in data["data"]:
+                    for usage in reader.iter_items("data"):
                         self._upload_usages_dps(
                             data_controller,
                             usage,
@@ -1288,6 +1344,197 @@ class AzureResourceClient(object):
             ),
         )
 
+    def _get_azure_resource_hashes(self, data_controller):
+        """
+        Get the hash of every data service shadow resource in the resource
+        group of the data controller, keyed by resource type and name.
+        :return: The hashes, None if the resources could not be listed.
+        """
+        hashes = dict()
+
+        for instance_type in azure_constants.RESOURCE_TYPES_OF_DATA_SERVICES:
+            try:
+                resources = retry(
+                    lambda: self.list_azure_resources(
+                        instance_type=instance_type,
+                        subscription_id=data_controller["subscriptionId"],
+                        resource_group_name=data_controller[
+                            "resourceGroupName"
+                        ],
+                    ),
+                    retry_count=CONNECTION_RETRY_ATTEMPTS,
+                    retry_delay=RETRY_INTERVAL,
+                    retry_method="list Azure resources",
+                    retry_on_exceptions=(
+                        ConnectionError,
+                        NewConnectionError,
+                        MaxRetryError,
+                    ),
+                )
+            except Exception as e:
+                log.warning(
+                    "Unable to list Azure resources of type '%s', every "
+                    "resource instance will be uploaded: %s",
+                    instance_type,
+                    e,
+                )
+                return None
+
+            for resource in resources:
+                properties = resource.get("properties") or {}
+                hashes[
+                    (instance_type, resource["name"].lower())
+                ] = self._get_shadow_resource_hash(
+                    properties.get("dataControllerId"),
+                    properties.get("k8sRaw"),
+                )
+
+        return hashes
+
+    @staticmethod
+    def _get_shadow_resource_hash(data_controller_id, k8s_raw):
+        """
+        Hash the properties of a shadow resource that are derived from the
+        exported custom resource.
+        """
+        properties = {
+            "dataControllerId": (data_controller_id or "").lower(),
+            "k8sRaw": k8s_raw,
+        }
+        return hashlib.sha256(
+            json.dumps(
+                properties, sort_keys=True, separators=(",", ":")
+            ).encode("utf-8")
+        ).hexdigest()
+
+    def _reconcile_azure_resources(
+        self, deleted_instances, instances, data_controller, max_workers=None
+    ):
+        """
+        Reconcile the shadow resources of the resource instances with what
+        already exists in Azure. Shadow resources of deleted instances are
+        deleted if present, those of active instances are created or updated
+        unless their `k8sRaw` is unchanged. The remaining calls run on a
+        bounded thread pool.
+        :param deleted_instances: The `deletedInstances` of the export file.
+        :param instances: The `instances` of the export file.
+        :param data_controller: The data controller of the export file.
+        :param max_workers: The maximum number of concurrent calls.
+        """
+        from concurrent.futures import (
+            FIRST_COMPLETED,
+            ThreadPoolExecutor,
+            wait,
+        )
+
+        max_workers = max(1, max_workers or SHADOW_RESOURCE_UPLOAD_MAX_WORKERS)
+        existing = self._get_azure_resource_hashes(data_controller)
+        data_controller_id = azure_constants.RESOURCE_URI.format(
+            data_controller["subscriptionId"],
+            data_controller["resourceGroupName"],
+            INSTANCE_TYPE_DATA_CONTROLLER,
+            data_controller["instanceName"],
+        )
+        skipped = []
+
+        def resource_key(instance):
+            instance_type = azure_constants.RESOURCE_TYPE_FOR_KIND.get(
+                instance.get("kind")
+            )
+            if instance_type is None:
+                self.stdout(
+                    'Skipping "{}" in "{}", kind "{}" is not supported.'.format(
+                        instance.get("instanceName"),
+                        instance.get("instanceNamespace"),
+                        instance.get("kind"),
+                    )
+                )
+                return None
+
+            return instance_type, instance["instanceName"].lower()
+
+        def run(executor, tasks):
+            # Only keep a bounded number of calls in flight so the instance
+            # lists are consumed as they are streamed from the file
+            #
+            pending = dict()
+            for instance, task in tasks:
+                if len(pending) >= max_workers * 2:
+                    done = wait(
+                        list(pending), return_when=FIRST_COMPLETED
+                    ).done
+                    for future in done:
+                        yield pending.pop(future), future
+
+                future = submit_in_context(
+                    executor, task, instance, data_controller
+                )
+                pending[future] = instance
+
+            for future in list(pending):
+                yield pending.pop(future), future
+
+        def deletions():
+            deleted = set()
+            for instance in deleted_instances:
+                key = resource_key(instance)
+                if key is None or key in deleted:
+                    continue
+
+                deleted.add(key)
+                if existing is not None and key not in existing:
+                    continue
+
+                yield instance, self._delete_azure_resource
+
+        def creations():
+            for instance in instances:
+                key = resource_key(instance)
+                if key is None:
+                    continue
+
+                if existing is not None and existing.get(key) == (
+                    self._get_shadow_resource_hash(
+                        data_controller_id, _.get(instance, "k8sRaw")
+                    )
+                ):
+                    skipped.append(instance["instanceName"])
+                    continue
+
+                yield instance, self._create_azure_resource
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Delete shadow resources for resource instances deleted from the
+            # cluster in k8s
+            #
+            for instance, future in run(executor, deletions()):
+                try:
+                    future.result()
+                    if existing is not None:
+                        existing.pop(resource_key(instance), None)
+                except Exception as e:
+                    self.stdout(
+                        'Failed to delete Azure resource for "{}" in "{}".'.format(
+                            instance["instanceName"],
+                            instance["instanceNamespace"],
+                        )
+                    )
+                    self.stderr(e)
+
+            # Create/Update shadow resources for resource instances still
+            # active in the cluster in k8s
+            #
+            for instance, future in run(executor, creations()):
+                future.result()
+
+        if skipped:
+            self.stdout(
+                "\t{} resource(s) unchanged since the last upload.".format(
+                    len(skipped)
+                )
+            )
+            log.info("Skipped unchanged resources: %s", ", ".join(skipped))
+
     def _upload_usages_dps(
         self, data_controller, usage, timestamp, correlation_vector
     ):
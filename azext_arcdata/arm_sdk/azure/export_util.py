@@ -10,14 +10,15 @@ import hashlib
 import hmac
 import json
 import os
+from collections import OrderedDict
 from enum import Enum
 from http import HTTPStatus
 
 import ndjson
-import requests
 from azext_arcdata.core.http_codes import http_status_codes
+from azext_arcdata.core.http_session import get_session
 from azext_arcdata.core.prompt import prompt_for_input, prompt_y_n
-from azext_arcdata.core.util import display, retry
+from azext_arcdata.core.util import display, retry, submit_in_context
 from azext_arcdata.arm_sdk.azure import constants as azure_constants
 from azext_arcdata.arm_sdk.azure.ad_auth_util import acquire_token
 from azext_arcdata.dc.constants import (
@@ -42,7 +43,6 @@ from azext_arcdata.sqlmi.constants import (
     SQLMI_TIER_GENERAL_PURPOSE_AZURE,
 )
 from jsonschema import validate
-from knack.cli import CLIError
 from knack.log import get_logger
 from knack.prompting import NoTTYException, prompt
 from requests.adapters import HTTPAdapter
@@ -125,8 +125,18 @@ Metric error msg could be ignored
 """
 
 
+METRICS_UPLOAD_MAX_WORKERS = 8
+"""
+Default number of resources whose metrics are posted concurrently
+"""
+
+
 def _post_metrics(url, body, headers):
-    response = requests.post(url, data=body, headers=headers)
+    # Retried by the caller
+    #
+    response = get_session(url, max_retries=0).post(
+        url, data=body, headers=headers
+    )
 
     log.info("Metrics upload reponse header: {}".format(response.headers))
     try:
@@ -142,74 +152,168 @@ def _post_metrics(url, body, headers):
     return response
 
 
-def metrics_upload(metrics):
+def _filter_recent_metrics(metrics, current_time):
+    """
+    Keep the metric records that are not older than 30 minutes, anything older
+    is rejected by Azure Monitor.
+    """
+    return list(
+        filter(
+            lambda metric: (
+                current_time
+                - datetime.datetime.strptime(
+                    metric["time"], "%Y-%m-%dT%H:%M:%SZ"
+                )
+            ).total_seconds()
+            / 60
+            <= 30,
+            metrics,
+        )
+    )
+
+
+def _upload_resource_metrics(region_value, resource_id_value, metrics, headers):
+    """
+    Upload the metrics of a single resource.
+    :return: The number of data points pushed.
+    """
+    url = _set_url(region_value, resource_id_value)
+    retry(
+        lambda: _post_metrics(url, body=ndjson.dumps(metrics), headers=headers),
+        retry_count=CONNECTION_RETRY_ATTEMPTS,
+        retry_delay=RETRY_INTERVAL,
+        retry_method="post metrics data",
+        retry_on_exceptions=(
+            NewConnectionError,
+            MaxRetryError,
+            TimeoutError,
+            RequestTimeoutError,
+            ServerError,
+        ),
+    )
+    return len(metrics)
+
 
-    if metrics is None:
+def metrics_upload(metrics, max_workers=None):
+    """
+    Upload the exported metrics of every resource to Azure Monitor. Resources
+    are uploaded on a bounded worker pool, grouped by region so that the
+    results are reported per region in the order they appear in the file.
+    :param metrics: The `data` entries of a metrics export file, as a list or
+    an iterable.
+    :param max_workers: The maximum number of concurrent uploads.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from itertools import chain
+
+    # The entries are streamed from the export file, so the first one is
+    # read ahead to tell whether there is anything to upload
+    #
+    metrics = iter(metrics or ())
+    first = next(metrics, None)
+    if first is None:
         display("No metrics need to upload.")
-    else:
-        display("\n")
-        for data in metrics:
-            resource_id_value = data[MetricsDataStructure.resource_id_key.value]
-            region_value = data[MetricsDataStructure.region_key.value]
-            metrics = data["metrics"]
-            if not resource_id_value or not metrics or not region_value:
-                CLIError(
-                    "{} is not valid. Please check the file contains {} and "
-                    "metrics fields. Or export the data to file and try again."
-                )
+        return
 
-            current_time = datetime.datetime.utcnow()
-
-            filtered_metrics = list(
-                filter(
-                    lambda metric: (
-                        current_time
-                        - datetime.datetime.strptime(
-                            metric["time"], "%Y-%m-%dT%H:%M:%SZ"
-                        )
-                    ).total_seconds()
-                    / 60
-                    <= 30,
-                    metrics,
-                )
-            )
-            if filtered_metrics is None or not filtered_metrics:
-                print(
-                    "The metrics data are older than 30 minutes for {}, please"
-                    " export and upload again.".format(resource_id_value)
-                )
-                continue
-            log.info(
-                "Metrics data in file has {} records. {} are in last 30 mins".format(
-                    len(metrics), len(filtered_metrics)
+    display("\n")
+    current_time = datetime.datetime.utcnow()
+    regions = OrderedDict()
+
+    for data in chain([first], metrics):
+        resource_id_value = data.get(
+            MetricsDataStructure.resource_id_key.value
+        )
+        region_value = data.get(MetricsDataStructure.region_key.value)
+        resource_metrics = data.get(MetricsDataStructure.metrics_key.value)
+        if not resource_id_value or not resource_metrics or not region_value:
+            log.warning(
+                "Skipping the metrics of {}, the entry is not valid. Please "
+                "check the file contains {}, {} and {} fields. Or export the "
+                "data to file and try again.".format(
+                    resource_id_value or "a resource",
+                    MetricsDataStructure.resource_id_key.value,
+                    MetricsDataStructure.region_key.value,
+                    MetricsDataStructure.metrics_key.value,
                 )
             )
-            display("Azure resource_id: {}".format(resource_id_value))
+            continue
 
-            # Setup request header and url
-            headers = _set_header()
-            url = _set_url(region_value, resource_id_value)
-            retry(
-                lambda: _post_metrics(
-                    url, body=ndjson.dumps(filtered_metrics), headers=headers
-                ),
-                retry_count=CONNECTION_RETRY_ATTEMPTS,
-                retry_delay=RETRY_INTERVAL,
-                retry_method="post metrics data",
-                retry_on_exceptions=(
-                    NewConnectionError,
-                    MaxRetryError,
-                    TimeoutError,
-                    RequestTimeoutError,
-                    ServerError,
-                ),
+        filtered_metrics = _filter_recent_metrics(
+            resource_metrics, current_time
+        )
+        if not filtered_metrics:
+            print(
+                "The metrics data are older than 30 minutes for {}, please"
+                " export and upload again.".format(resource_id_value)
             )
+            continue
+        log.info(
+            "Metrics data in file has {} records. {} are in last 30 mins".format(
+                len(resource_metrics), len(filtered_metrics)
+            )
+        )
+
+        regions.setdefault(region_value, []).append(
+            (resource_id_value, filtered_metrics)
+        )
+
+    if not regions:
+        return
+
+    # Setup request header once, it is shared by all the uploads
+    headers = _set_header()
+    max_workers = max(1, max_workers or METRICS_UPLOAD_MAX_WORKERS)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # A resource can appear more than once in the metrics, each entry is
+        # uploaded and reported on its own.
+        #
+        futures = []
+        for region_value, resources in regions.items():
+            for resource_id_value, filtered_metrics in resources:
+                future = submit_in_context(
+                    executor,
+                    _upload_resource_metrics,
+                    region_value,
+                    resource_id_value,
+                    filtered_metrics,
+                    headers,
+                )
+                futures.append((region_value, resource_id_value, future))
 
-            display(
-                "Metrics upload pushed {} data points successfully.\n".format(
-                    len(filtered_metrics)
+        succeeded = 0
+        failed = []
+        for region_value, resource_id_value, future in futures:
+            display("Azure resource_id: {}".format(resource_id_value))
+            try:
+                count = future.result()
+                succeeded += 1
+                display(
+                    "Metrics upload pushed {} data points successfully.\n".format(
+                        count
+                    )
+                )
+            except Exception as e:
+                log.debug(e)
+                failed.append(resource_id_value)
+                display(
+                    "Metrics upload failed in region {}: {}\n".format(
+                        region_value, e
+                    )
                 )
+
+    display(
+        "Metrics upload finished: {} resource(s) succeeded, {} failed.".format(
+            succeeded, len(failed)
+        )
+    )
+
+    if failed:
+        raise Exception(
+            "Failed to upload metrics for {} resource(s): {}".format(
+                len(failed), ", ".join(failed)
             )
+        )
 
 
 """
@@ -282,6 +386,16 @@ LOGS_MAXIMUM_POST_SIZE = 25 * 1024 * 1024
 Maximum post size to logs analytics workspace is 30M bytes. 5M for buffer
 """
 
+LOGS_DECOMPRESS_CHUNK_SIZE = 1024 * 1024
+"""
+Size of the compressed log chunks decompressed at a time during upload
+"""
+
+LOGS_UPLOAD_MAX_WORKERS = 4
+"""
+Default number of log batches posted concurrently
+"""
+
 LOGS_FILE_SIZE = 512 * 1024 * 1024
 """
 Maximum log export file size
@@ -341,25 +455,149 @@ def _write_logs(data_controller, logs, file_name, resource, timestamp):
 """
 
 
-def logs_upload(logs, customer_id, shared_key):
-    import base64
+def logs_upload(logs, customer_id, shared_key, max_workers=None):
+    """
+    Upload the exported logs of every instance to Log Analytics. Each
+    instance's records are streamed out of the compressed payload and cut into
+    batches under `LOGS_MAXIMUM_POST_SIZE`, which are posted concurrently over
+    a shared retry session.
+    :param logs: The `data` entries of a logs export data file.
+    :param customer_id: The Log Analytics workspace id.
+    :param shared_key: The Log Analytics workspace shared key.
+    :param max_workers: The maximum number of concurrent posts.
+    """
+    from concurrent.futures import (
+        FIRST_COMPLETED,
+        ThreadPoolExecutor,
+        wait,
+    )
+
+    max_workers = max(1, max_workers or LOGS_UPLOAD_MAX_WORKERS)
+    session = _requests_retry_session(_build_log_request_uri(customer_id))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for log in logs:
+            log_table_name = log["instance_type"] + "_logs"
+            pending = set()
+
+            # Only keep a bounded number of batches in flight so the
+            # decompressed log is never fully held in memory
+            #
+            for body, record_count in _split_log_records(log["logs"]):
+                if len(pending) >= max_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+
+                pending.add(
+                    executor.submit(
+                        _post_logs_to_logs_analytics,
+                        customer_id,
+                        shared_key,
+                        log["instance_name"],
+                        body,
+                        log_table_name,
+                        log["instance_type"],
+                        log["resource_id"],
+                        record_count=record_count,
+                        session=session,
+                    )
+                )
+
+            for future in pending:
+                future.result()
+
+
+def _iter_log_records(compressed_logs):
+    """
+    Incrementally decompress a base64 encoded, deflated JSON array of log
+    records and yield the raw JSON text of each record.
+    """
+    import codecs
     import zlib
 
-    for log in logs:
-        unzip = str(
-            zlib.decompress(base64.b64decode(log["logs"]), -zlib.MAX_WBITS),
-            "utf-8",
-        )
-        log_table_name = log["instance_type"] + "_logs"
-        _post_logs_to_logs_analytics(
-            customer_id,
-            shared_key,
-            log["instance_name"],
-            unzip,
-            log_table_name,
-            log["instance_type"],
-            log["resource_id"],
-        )
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    json_decoder = json.JSONDecoder()
+    raw = base64.b64decode(compressed_logs)
+
+    def chunks():
+        for offset in range(0, len(raw), LOGS_DECOMPRESS_CHUNK_SIZE):
+            yield text_decoder.decode(
+                decompressor.decompress(
+                    raw[offset : offset + LOGS_DECOMPRESS_CHUNK_SIZE]
+                )
+            )
+        yield text_decoder.decode(decompressor.flush(), final=True)
+
+    source = chunks()
+    buffer = ""
+    index = 0
+    started = False
+    exhausted = False
+
+    while True:
+        # Skip the array delimiters and whitespace between records
+        #
+        while index < len(buffer) and buffer[index] in " \t\r\n,[":
+            if buffer[index] == "[":
+                if started:
+                    break
+                started = True
+            index += 1
+
+        if index < len(buffer) and buffer[index] == "]":
+            return
+
+        if index < len(buffer):
+            try:
+                _, end = json_decoder.raw_decode(buffer, index)
+                yield buffer[index:end]
+                index = end
+                continue
+            except ValueError:
+                if exhausted:
+                    raise
+
+        if exhausted:
+            return
+
+        try:
+            buffer = buffer[index:] + next(source)
+            index = 0
+        except StopIteration:
+            exhausted = True
+
+
+def _split_log_records(compressed_logs, max_size=LOGS_MAXIMUM_POST_SIZE):
+    """
+    Group the records of a compressed log payload into JSON array post bodies
+    no larger than `max_size` bytes.
+    :return: A generator of (utf-8 encoded body, record count) tuples.
+    """
+    batch = []
+    batch_size = 2
+
+    for record in _iter_log_records(compressed_logs):
+        record = record.encode("utf-8")
+        record_size = len(record) + 1
+
+        if batch and batch_size + record_size > max_size:
+            yield b"[" + b",".join(batch) + b"]", len(batch)
+            batch = []
+            batch_size = 2
+
+        if record_size + 2 > max_size:
+            log.warning(
+                "A log record of %d bytes exceeds the maximum post size.",
+                record_size,
+            )
+
+        batch.append(record)
+        batch_size += record_size
+
+    if batch:
+        yield b"[" + b",".join(batch) + b"]", len(batch)
 
 
 def _convert_to_logs_format(logs, instance, instance_type, resource_uri):
@@ -514,7 +752,9 @@ def _test_log_workspace_key(customer_id, shared_key):
     )
     succeed = False
     try:
-        response = requests.post(uri, data=body, headers=headers)
+        response = _requests_retry_session(uri).post(
+            uri, data=body, headers=headers
+        )
         if 200 <= response.status_code <= 299:
             succeed = True
     finally:
@@ -529,19 +769,25 @@ def _post_logs_to_logs_analytics(
     log_type,
     instance_type,
     resource_uri,
+    record_count=None,
+    session=None,
 ):
     uri = _build_log_request_uri(customer_id)
-    body = body.encode("utf-8")
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if record_count is None:
+        record_count = len(json.loads(body))
     headers = _build_log_request_header(
         customer_id, shared_key, len(body), log_type, resource_uri
     )
 
-    response = _requests_retry_session().post(uri, data=body, headers=headers)
+    session = session or _requests_retry_session(uri)
+    response = session.post(uri, data=body, headers=headers)
     if 200 <= response.status_code <= 299:
         display(
             '\tSuccessfully upload "{}" records for resource type "{}", '
             'instance: "{}\'s" log to table: "{}" '.format(
-                len(json.loads(body)), instance_type, instance_name, log_type
+                record_count, instance_type, instance_name, log_type
             )
         )
     else:
@@ -556,6 +802,7 @@ def _post_logs_to_logs_analytics(
 # https://urllib3.readthedocs.io/en/latest/reference/urllib3.util.html
 # Explains how retry works
 def _requests_retry_session(
+    uri,
     retries=LOGS_POST_RETRY_CAP,
     backoff_factor=LOGS_BACKOFF_FACTOR,
     session=None,
@@ -563,16 +810,17 @@ def _requests_retry_session(
     """
     Get a retry request session
     :arg:
+      - uri: the log analytics uri the session is used for
       - retries: number of retries
       - backoff_factor: for exponential backoff
       - status_forcelist: server error code list
         Now retry on three cases based on the following doc:
         https://docs.microsoft.com/en-us/azure/azure-monitor/platform/
         data-collector-api#return-codes
-      - session: https request retry session
+      - session: https request retry session, the shared pooled session
+        for the uri's host is used if not given
     :return: retry session
     """
-    session = session or requests.Session()
     max_retries = Retry(
         total=retries,
         read=retries,
@@ -585,6 +833,9 @@ def _requests_retry_session(
         ),
         method_whitelist=frozenset(["POST"]),
     )
+    if session is None:
+        return get_session(uri, max_retries=max_retries)
+
     adapter = HTTPAdapter(max_retries=max_retries)
     session.mount("https://", adapter)
     return session
@@ -680,6 +931,200 @@ example: SanitizerRule(".*externalEndpoint")
 """
 
 
+# #############################################################################
+# Export file reader
+# #############################################################################
+
+EXPORT_FILE_STREAMED_KEYS = ("instances", "deletedInstances", "data")
+"""
+Export file array properties that are read one entry at a time
+"""
+
+EXPORT_FILE_READ_CHUNK_SIZE = 1024 * 1024
+"""
+Number of characters read from an export file at a time
+"""
+
+
+class ExportFileReader(object):
+    """
+    Incremental reader for export files. Only the top level of the document is
+    scanned, the `instances`, `deletedInstances` and `data` arrays are yielded
+    one validated and sanitized entry at a time so that a large export is
+    never fully loaded into memory.
+    """
+
+    def __init__(self, path, sanitizers=None, schema=EXPORT_DATA_JSON_SCHEMA):
+        self._path = path
+        self._sanitizers = sanitizers or []
+        self._schema = schema
+        self._decoder = json.JSONDecoder()
+        self._file = None
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._keys = []
+
+    @property
+    def keys(self):
+        """
+        The top level property names found by `read_header`.
+        """
+        return self._keys
+
+    def read_header(self):
+        """
+        Read every top level property except the streamed arrays, which are
+        skipped entry by entry. The result is validated against the export
+        schema with the streamed arrays present in the file standing in as
+        empty lists.
+        :return: The sanitized top level properties.
+        """
+        from azext_arcdata.core.serialization import Sanitizer
+
+        header = {}
+        streamed = []
+        for key, value in self._scan():
+            if value is self:
+                streamed.append(key)
+            else:
+                header[key] = Sanitizer.sanitize_object(
+                    {key: value}, self._sanitizers
+                )[key]
+
+        self._keys = list(header.keys()) + streamed
+        validate(
+            dict(header, **{key: [] for key in streamed}),
+            self._schema,
+        )
+        return header
+
+    def iter_items(self, key):
+        """
+        Yield the entries of the top level `key` array one at a time, each
+        sanitized and validated against the schema of the array's items.
+        """
+        from azext_arcdata.core.serialization import Sanitizer
+
+        sanitizer = Sanitizer(self._sanitizers)
+        path = ".".join(["", key])
+        item_schema = (
+            self._schema.get("properties", {}).get(key, {}).get("items")
+        )
+
+        for _, item in self._scan(stream_key=key):
+            item = sanitizer.sanitize(item, path)
+            if item_schema:
+                validate(item, item_schema)
+            yield item
+
+    def _scan(self, stream_key=None):
+        """
+        Scan the top level object of the file. Yields (key, value) for the
+        properties that are not streamed, (key, self) for each streamed array
+        that was skipped and (key, entry) for the entries of `stream_key`.
+        """
+        with open(self._path, encoding="utf-8") as self._file:
+            self._buffer, self._pos, self._eof = "", 0, False
+            self._expect("{")
+            if self._peek() == "}":
+                return
+
+            while True:
+                key = self._decode()
+                self._expect(":")
+
+                if key in EXPORT_FILE_STREAMED_KEYS and self._peek() == "[":
+                    self._expect("[")
+                    items = self._iter_array()
+                    if key == stream_key:
+                        for item in items:
+                            yield key, item
+                    else:
+                        for _ in items:
+                            pass
+                        if stream_key is None:
+                            yield key, self
+                else:
+                    value = self._decode()
+                    if stream_key is None:
+                        yield key, value
+
+                if self._peek() == ",":
+                    self._expect(",")
+                    continue
+                self._expect("}")
+                return
+
+    def _iter_array(self):
+        if self._peek() == "]":
+            self._expect("]")
+            return
+
+        while True:
+            yield self._decode()
+            if self._peek() == ",":
+                self._expect(",")
+                continue
+            self._expect("]")
+            return
+
+    def _fill(self):
+        if self._eof:
+            return False
+
+        # Grow the read size with the pending value so that decoding a value
+        # larger than a chunk stays linear
+        #
+        chunk = self._file.read(
+            max(EXPORT_FILE_READ_CHUNK_SIZE, len(self._buffer) - self._pos)
+        )
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            while (
+                self._pos < len(self._buffer)
+                and self._buffer[self._pos] in " \t\r\n"
+            ):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError(
+                    'Unexpected end of export file "{}".'.format(self._path)
+                )
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(
+                'Invalid export file "{}". Expected "{}" but found "{}".'.format(
+                    self._path, char, self._buffer[self._pos]
+                )
+            )
+        self._pos += 1
+
+    def _decode(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number at the end of the buffer may continue in the next
+                # chunk, read more before accepting it
+                if end < len(self._buffer) or not self._fill():
+                    self._pos = end
+                    return value
+            except ValueError:
+                if not self._fill():
+                    raise
+
+
 # #############################################################################
 # Upload status functions
 # #############################################################################
@@ -349,8 +349,8 @@ class ArmClient(object):
             polling=polling,
         )
 
-    def export_upload_log_and_metrics_dc(self, path):
-        self._resource_client.upload_dc_resource(path)
+    def export_upload_log_and_metrics_dc(self, path, concurrency=None):
+        self._resource_client.upload_dc_resource(path, concurrency=concurrency)
 
     # ======================================================================== #
     # == SQL MI ============================================================== #
@@ -0,0 +1,31 @@
+# ------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# ------------------------------------------------------------------------------
+
+"""
+Client factories that defer importing a command group's client, and with it
+the Kubernetes and Azure SDKs, until one of its commands actually runs.
+"""
+
+import importlib
+
+__all__ = ["lazy_beget"]
+
+
+def lazy_beget(factory_path):
+    """
+    Get a client factory for the command table that imports the real one the
+    first time it is called.
+    :param factory_path: The real client factory as `module#name`, e.g.
+    `azext_arcdata.sqlmi.client#beget`.
+    :return: The client factory.
+    """
+    module_name, factory_name = factory_path.split("#")
+
+    def beget(az_cli, kwargs):
+        module = importlib.import_module(module_name)
+        return getattr(module, factory_name)(az_cli, kwargs)
+
+    return beget
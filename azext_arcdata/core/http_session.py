@@ -0,0 +1,101 @@
+# ------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# ------------------------------------------------------------------------------
+
+"""
+Process wide, pooled HTTP sessions shared by the export and upload code paths.
+"""
+
+from knack.log import get_logger
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+
+import atexit
+import requests
+import threading
+
+__all__ = ["get_session", "close_sessions"]
+
+logger = get_logger(__name__)
+
+HTTP_POOL_CONNECTIONS = 10
+"""
+Number of per-host connection pools cached by a session adapter.
+"""
+
+HTTP_POOL_MAXSIZE = 32
+"""
+Maximum number of keep-alive connections kept open per host.
+"""
+
+HTTP_CONNECT_RETRIES = 3
+"""
+Connection retries applied to a session when no retry policy is given.
+"""
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def get_session(url, max_retries=None, pool_maxsize=None):
+    """
+    Get the shared `requests.Session` for the scheme and host of `url`, the
+    retry policy and the pool size. The session is created on first use with
+    a pooled keep-alive adapter, later calls with the same arguments reuse it.
+    Hosts whose calls are already retried by the caller should be given a
+    `max_retries` of 0, so that the attempts do not multiply.
+    :param url: The url (or any url on the host) the session is used for.
+    :param max_retries: An optional `urllib3.util.retry.Retry` policy or
+    number of connection retries, `HTTP_CONNECT_RETRIES` if not given.
+    :param pool_maxsize: The maximum number of pooled connections for the host.
+    :return: The shared session.
+    """
+    parsed = urlparse(url)
+    prefix = "{}://{}".format(parsed.scheme, parsed.netloc.lower())
+    if max_retries is None:
+        max_retries = HTTP_CONNECT_RETRIES
+    pool_maxsize = pool_maxsize or HTTP_POOL_MAXSIZE
+    key = (prefix, _get_retries_key(max_retries), pool_maxsize)
+
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_CONNECTIONS,
+                pool_maxsize=pool_maxsize,
+                max_retries=max_retries,
+            )
+            session = requests.Session()
+            session.mount(prefix, adapter)
+            _sessions[key] = session
+            logger.debug(
+                "Created pooled HTTP session for %s with %s retries",
+                prefix,
+                max_retries,
+            )
+
+    return session
+
+
+def _get_retries_key(max_retries):
+    """
+    Key of a retry policy: a new `Retry` built with the same settings as an
+    earlier one gets the same session.
+    """
+    if isinstance(max_retries, int):
+        return max_retries
+
+    return repr(sorted(vars(max_retries).items()))
+
+
+@atexit.register
+def close_sessions():
+    """
+    Close every shared session and release their pooled connections.
+    """
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -2,17 +2,10 @@ import json
 import pprint
 import uuid
 import yaml
-from json import scanner
-from json.decoder import py_scanstring
 
 from functools import wraps
 import pydash as _
 
-try:
-    from _json import scanstring as c_scanstring
-except ImportError:
-    c_scanstring = None
-
 
 def get_full_type_name(obj):
     if not isinstance(obj, type):
@@ -51,9 +44,73 @@ def clear_changes_tracking(obj):
     _.get(obj, "_clear_change_tracking", _.noop)()
 
 
+class _SerializationPlan(object):
+    """The parts of serializing an instance that only depend on its class and the tag filters, computed once per class and reused for every instance"""
+
+    def __init__(self, cls, includeTags, excludeTags, excludeUntagged):
+        self.typeName = get_full_type_name(cls)
+        self.itemAccess = hasattr(cls, "__getitem__")
+        self._cls = cls
+        self._includeTags = includeTags
+        self._excludeTags = excludeTags
+        self._excludeUntagged = excludeUntagged
+        self._includedKeys = {}
+
+        # this is to support the use of the @jsonProperty attribute for getters and setter functions.
+        self.classProperties = [
+            key
+            for key in dir(cls)
+            if not key.startswith("_")
+            and isinstance(getattr(cls, key, None), jsonProperty)
+            and self.includes(key)
+        ]
+
+    def includes(self, key):
+        """Returns true or false indicating whether the key passes the tag filters"""
+        included = self._includedKeys.get(key)
+        if included is None:
+            included = self._matchTags(key)
+            self._includedKeys[key] = included
+        return included
+
+    def _matchTags(self, key):
+        # Since properties with tags are only available as class properties (not instance properties) we resolve the key properties to assess the tag existance, rather than the instance values
+        propDef = _.get(self._cls, key, None)
+        propTags = _.get(propDef, "fget.__wrapped__.tags", [])
+
+        def matchTag(tags, excludeUntagged):
+            if len(propTags) == 0 and excludeUntagged is False:
+                return True
+
+            return any(t in tags for t in propTags)
+
+        if len(self._includeTags) > 0 and not matchTag(
+            self._includeTags, self._excludeUntagged
+        ):
+            return False
+
+        if len(self._excludeTags) > 0 and matchTag(
+            self._excludeTags, not self._excludeUntagged
+        ):
+            return False
+
+        return True
+
+    def getValue(self, obj, key):
+        if not self.itemAccess:
+            try:
+                return getattr(obj, key)
+            except Exception:
+                pass
+        return _.get(obj, key)
+
+
 class ExtendedJsonEncoder(json.JSONEncoder):
     """JSONEncoder with additional capabilities to allow for encoding of Typed, and Untyped POPO objects using the jsonProperty attribute"""
 
+    # serialization plans shared by all encoders, keyed by class and tag filters
+    _plans = {}
+
     def __init__(
         self,
         includeTags=[],
@@ -72,12 +129,26 @@ class ExtendedJsonEncoder(json.JSONEncoder):
         """
         super().__init__(*args, **kwargs)
         self._serializedInstances = (
-            []
-        )  # ensure instances are only serialized once to prevent circular serialization
+            {}
+        )  # ensure instances are only serialized once to prevent circular serialization. Keyed by id(), holding the instance keeps the id from being reused
         self._includeTags = includeTags
         self._excludeTags = excludeTags
         self._excludeUntagged = excludeUntagged
         self._changesOnly = changesOnly
+        self._tagFilter = (
+            tuple(includeTags),
+            tuple(excludeTags),
+            excludeUntagged,
+        )
+
+    def _get_plan(self, cls):
+        """Returns the serialization plan of the class for the tag filters of this encoder"""
+        key = (cls,) + self._tagFilter
+        plan = ExtendedJsonEncoder._plans.get(key)
+        if plan is None:
+            plan = _SerializationPlan(cls, *self._tagFilter)
+            ExtendedJsonEncoder._plans[key] = plan
+        return plan
 
     def default(self, obj):
         """Overrides the json.dumps default serializer"""
@@ -85,89 +156,27 @@ class ExtendedJsonEncoder(json.JSONEncoder):
             return None
 
         # using __ref__ as a mechanism to prevent circular references in serialization
-        if obj in self._serializedInstances and hasattr(obj, "__ref__"):
+        if id(obj) in self._serializedInstances and hasattr(obj, "__ref__"):
             return "__ref__:{0}".format(obj.__ref__)
 
-        self._serializedInstances.append(obj)
+        self._serializedInstances[id(obj)] = obj
 
         try:
             return json.JSONEncoder.default(self, obj)
         except:
             if hasattr(obj, "__dict__"):
                 try:
+                    plan = self._get_plan(type(obj))
 
-                    def matchTag(key, tags, excludeUntagged):
-                        """Matches the tags decorated on the property against the given list of tags and returns true or false if any matches are present
-
-                        Arguments:
-                            key {str} -- property name to check for tags
-                            tags {str} -- list of tags to check against
-                            excludeUntagged {bool} -- flag to indicate whether to exclude the property if no tags are present. It the property is untagged, and this value is set to True, then the results will be True
-
-                        Returns:
-                            [bool] -- [True or false indicating whether the key has a matching tag.]
-                        """
-
-                        # Since properties with tags are only available as class properties (not instance properties) we resolve the key properties to assess the tag existance, rather than the instance values
-                        propDef = _.get(type(obj), key, None)
-                        propTags = _.get(propDef, "fget.__wrapped__.tags", [])
-
-                        if len(propTags) == 0 and excludeUntagged is False:
-                            return True
-
-                        return _.some(propTags, lambda t: t in tags)
-
-                    def filterKeysByTags(keys):
-                        if len(self._includeTags) > 0:
-                            keys = _.filter_(
-                                keys,
-                                lambda k: matchTag(
-                                    k, self._includeTags, self._excludeUntagged
-                                ),
-                            )
-                        if len(self._excludeTags) > 0:
-                            keys = _.filter_(
-                                keys,
-                                lambda k: matchTag(
-                                    k,
-                                    self._excludeTags,
-                                    not self._excludeUntagged,
-                                )
-                                is False,
-                            )
-
-                        return filterKeysByChanged(keys)
-
-                    def filterKeysByChanged(keys):
+                    def filterKeys(keys):
+                        keys = [k for k in keys if plan.includes(k)]
                         if self._changesOnly is False:
                             return keys
 
-                        changed_keys = _.result(
-                            obj, "_changed_keys", _.identity([])
+                        changed_keys = set(
+                            _.result(obj, "_changed_keys", _.identity([]))
                         )
-
-                        return _.filter_(
-                            keys, lambda k: _.index_of(changed_keys, k) > -1
-                        )
-
-                    # this is a complex type that may or may not declare all attributes, so we will return a dictionary
-                    def mapVal(destination, key):
-                        if key.startswith("_"):
-                            return destination
-                        destination[key] = _.get(obj, key)
-                        return destination
-
-                    # this is to support the use of the @jsonProperty attribute for getters and setter functions.
-                    def mapClassProp(destination, key):
-                        if key.startswith("_"):
-                            return destination
-
-                        if issubclass(
-                            type(_.get(type(obj), key, None)), jsonProperty
-                        ):
-                            destination[key] = _.get(obj, key)
-
-                        return destination
+                        return [k for k in keys if k in changed_keys]
 
                     ref = set_object_ref(obj)
 
@@ -178,20 +187,19 @@ class ExtendedJsonEncoder(json.JSONEncoder):
                     # if True, it will deserialize to a dictionary rather than the original type.
                     if not _.get(obj, "_exclude_type_info", False):
                         result = {
-                            "__type__": get_full_type_name(obj),
+                            "__type__": plan.typeName,
                             "__ref__": ref,
                         }
 
-                    result.update(
-                        _.reduce_(
-                            filterKeysByTags(obj.__dict__.keys()), mapVal, {}
-                        )
-                    )  # Apply instance properties
-                    result.update(
-                        _.reduce_(
-                            filterKeysByTags(dir(type(obj))), mapClassProp, {}
-                        )
-                    )  # Apply class properties
+                    # this is a complex type that may or may not declare all attributes, so we will return a dictionary
+                    # Apply instance properties
+                    for key in filterKeys(obj.__dict__.keys()):
+                        if not key.startswith("_"):
+                            result[key] = plan.getValue(obj, key)
+
+                    # Apply class properties
+                    for key in filterKeys(plan.classProperties):
+                        result[key] = plan.getValue(obj, key)
 
                     return result
                 except:
@@ -200,36 +208,58 @@ class ExtendedJsonEncoder(json.JSONEncoder):
 
 
 class ExtendedJsonDecoder(json.JSONDecoder):
-    """JSONDecoder capable of deserializing json strings that are encoded with type and reference information via the EntityAwareJsonEncoder"""
+    """JSONDecoder capable of deserializing json strings that are encoded with type and reference information via the EntityAwareJsonEncoder
+
+    The document is parsed by the default (C accelerated) scanner, types and references are then resolved in a single pass over the parsed tree.
+    """
 
     def __init__(self, *args, **kwargs):
-        super().__init__(object_hook=self.object_hook, *args, **kwargs)
-        self.parse_string = self._parse_string
-        self.scanstr = (
-            c_scanstring or py_scanstring
-        )  # Hack: since the default json decoder does not allow us to override the scanstr directly, we need to duplicate this here so we can resolve references
-        self.scan_once = scanner.py_make_scanner(self)
+        super().__init__(*args, **kwargs)
         self._ref_instances = {}
 
-    def _parse_string(self, s, *args, **kwargs):
-        """parses a given string using scanstr
+    def decode(self, s, *args, **kwargs):
+        """Overrides the json.loads decoder to resolve types and references once the document is parsed"""
+        return self._resolve(super().decode(s, *args, **kwargs))
+
+    def _resolve(self, value):
+        """resolves the types and references of a parsed value
+
+        Values are visited in document order and objects are resolved once all their values are, which is the order the scanner reads them in. A reference string is therefore only replaced by an instance that is complete, as it would be when resolved while scanning.
 
         Arguments:
-            s {[str]} -- string to parse
+            value {[Any]} -- parsed value
 
         Returns:
-            [type] -- returns a tuple of the object, and the string representation
+            [type] -- the value, with types and references resolved
         """
-        results = self.scanstr(s, *args, **kwargs)
-        if results[0].startswith("__ref__"):
-            refKey = results[0].split(":")[1]
-            refObj = _.get(self._ref_instances, refKey)
+        if isinstance(value, str):
+            return self._resolve_ref(value)
+
+        if isinstance(value, dict):
+            for key, item in value.items():
+                resolved = self._resolve(item)
+                if resolved is not item:
+                    value[key] = resolved
+            return self._resolve_object(value)
+
+        if isinstance(value, list):
+            for index, item in enumerate(value):
+                resolved = self._resolve(item)
+                if resolved is not item:
+                    value[index] = resolved
+
+        return value
+
+    def _resolve_ref(self, s):
+        """returns the decoded instance a `__ref__:` string refers to, or the string itself"""
+        if s.startswith("__ref__"):
+            refObj = self._ref_instances.get(s.split(":")[1])
             if refObj is not None:
-                results = (refObj, results[1])
-        return results
+                return refObj
+        return s
 
-    def object_hook(self, obj):
-        """object_hook implementation with type and ref support."""
+    def _resolve_object(self, obj):
+        """hydrates an instance of the __type__ of the object, if it has one, and registers it by its __ref__"""
         if isinstance(obj, dict):
             if "__type__" in obj:
                 # import the type
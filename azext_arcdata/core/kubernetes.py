@@ -5,6 +5,7 @@
 # ------------------------------------------------------------------------------
 
 from azext_arcdata.core.http_codes import http_status_codes
+from azext_arcdata.kubernetes_sdk.client_pool import get_api_client
 from azext_arcdata.core.util import (
     display,
     retry,
@@ -31,6 +32,7 @@ import base64
 import json
 import os
 import re
+import time
 import yaml
 
 logger = get_logger(__name__)
@@ -70,7 +72,7 @@ def create_namespace(cluster_name, labels=None):
         body = k8sClient.V1Namespace()
         body.metadata = k8sClient.V1ObjectMeta(name=cluster_name, labels=labels)
 
-        k8sClient.CoreV1Api().create_namespace(body=body)
+        k8sClient.CoreV1Api(get_api_client()).create_namespace(body=body)
     except K8sApiException as e:
         logger.error(e.body)
         raise
@@ -87,7 +89,8 @@ def patch_namespace(cluster_name, body):
     # and must start with and end with a alphanumeric character.
     #
     try:
-        k8sClient.CoreV1Api().patch_namespace(name=cluster_name, body=body)
+        api = k8sClient.CoreV1Api(get_api_client())
+        api.patch_namespace(name=cluster_name, body=body)
     except K8sApiException as e:
         logger.error(e.body)
         raise
@@ -106,254 +109,230 @@ def wrap_404(func):
             raise
 
 
+def _namespaced_list_functions():
+    """
+    The list functions of the workload resources a namespace is checked for
+    when tearing it down, in the order they are checked.
+    """
+    apps = k8sClient.AppsV1Api(get_api_client())
+    core = k8sClient.CoreV1Api(get_api_client())
+
+    return [
+        apps.list_namespaced_stateful_set,
+        apps.list_namespaced_daemon_set,
+        apps.list_namespaced_deployment,
+        apps.list_namespaced_replica_set,
+        core.list_namespaced_service,
+        core.list_namespaced_persistent_volume_claim,
+        core.list_namespaced_pod,
+    ]
+
+
+def _find_namespaced_resources(cluster_name, label=None):
+    """
+    Find the first kind of workload resource left in the namespace. Each kind
+    is checked with a single item list request.
+    :return: The list function of that kind, None if the namespace is empty.
+    """
+    kwargs = {"label_selector": label} if label else {}
+
+    for list_func in _namespaced_list_functions():
+        if list_func(namespace=cluster_name, limit=1, **kwargs).items:
+            return list_func
+
+    return None
+
+
 def namespace_is_empty(cluster_name, label=None):
     """
     Returns True if K8s namespace is empty.
     """
 
     try:
-        kwargs = {"label_selector": label} if label else {}
-
-        if (
-            len(
-                k8sClient.AppsV1Api()
-                .list_namespaced_stateful_set(namespace=cluster_name, **kwargs)
-                .items
-            )
-            > 0
-        ):
-            return False
-        elif (
-            len(
-                k8sClient.AppsV1Api()
-                .list_namespaced_daemon_set(namespace=cluster_name, **kwargs)
-                .items
-            )
-            > 0
-        ):
-            return False
-        elif (
-            len(
-                k8sClient.AppsV1Api()
-                .list_namespaced_deployment(namespace=cluster_name, **kwargs)
-                .items
-            )
-            > 0
-        ):
-            return False
-        elif (
-            len(
-                k8sClient.AppsV1Api()
-                .list_namespaced_replica_set(namespace=cluster_name, **kwargs)
-                .items
-            )
-            > 0
-        ):
-            return False
-        elif (
-            len(
-                k8sClient.CoreV1Api()
-                .list_namespaced_service(namespace=cluster_name, **kwargs)
-                .items
-            )
-            > 0
-        ):
-            return False
-        elif (
-            len(
-                k8sClient.CoreV1Api()
-                .list_namespaced_persistent_volume_claim(
-                    namespace=cluster_name, **kwargs
-                )
-                .items
-            )
-            > 0
-        ):
-            return False
-        elif (
-            len(
-                k8sClient.CoreV1Api()
-                .list_namespaced_pod(namespace=cluster_name, **kwargs)
-                .items
-            )
-            > 0
-        ):
-            return False
-        else:
-            return True
+        return _find_namespaced_resources(cluster_name, label) is None
     except K8sApiException as e:
         logger.error(e.body)
         return False
 
 
-def delete_cluster_resources(cluster_name, label=None):
+def wait_for_namespace_empty(cluster_name, label=None, timeout_seconds=None):
     """
-    Delete cluster resources.
+    Wait until the K8s namespace is empty, watching the resources that are
+    still being finalized rather than listing the namespace repeatedly.
+    :param cluster_name: The namespace.
+    :param label: Optional label selector of the resources waited for.
+    :param timeout_seconds: How long to wait at most, None to wait until the
+    namespace is empty.
+    :return: True if the namespace is empty.
     """
-    try:
-        kwargs = {"label_selector": label} if label else {}
-        body = k8sClient.V1DeleteOptions()
-
-        logger.debug("Deleting stateful sets")
-        wrap_404(
-            lambda: k8sClient.AppsV1Api().delete_collection_namespaced_stateful_set(
-                namespace=cluster_name, **kwargs
-            )
-        )
+    from azext_arcdata.kubernetes_sdk.waiter import wait_for_objects
 
-        logger.debug("Deleting daemon sets")
-        wrap_404(
-            lambda: k8sClient.AppsV1Api().delete_collection_namespaced_daemon_set(
-                namespace=cluster_name, **kwargs
-            )
-        )
-
-        logger.debug("Deleting deployments")
-        wrap_404(
-            lambda: k8sClient.AppsV1Api().delete_collection_namespaced_deployment(
-                namespace=cluster_name, **kwargs
-            )
-        )
-
-        logger.debug("Deleting replica sets")
-        wrap_404(
-            lambda: k8sClient.AppsV1Api().delete_collection_namespaced_replica_set(
-                namespace=cluster_name, **kwargs
-            )
-        )
-
-        logger.debug("Deleting services")
-        wrap_404(
-            lambda: k8sClient.CoreV1Api().delete_collection_namespaced_service_account(
-                namespace=cluster_name, **kwargs
-            )
-        )
-        services = (
-            k8sClient.CoreV1Api()
-            .list_namespaced_service(namespace=cluster_name, **kwargs)
-            .items
-        )
-        for service in services:
-            wrap_404(
-                lambda: k8sClient.CoreV1Api().delete_namespaced_service(
-                    name=service.metadata.name,
-                    namespace=cluster_name,
-                    body=body,
-                )
-            )
+    kwargs = {"label_selector": label} if label else {}
+    deadline = (
+        None if timeout_seconds is None else time.monotonic() + timeout_seconds
+    )
 
-        logger.debug("Deleting secrets")
-        wrap_404(
-            lambda: k8sClient.CoreV1Api().delete_collection_namespaced_secret(
-                namespace=cluster_name, **kwargs
-            )
-        )
+    while True:
+        try:
+            list_func = _find_namespaced_resources(cluster_name, label)
+        except K8sApiException as e:
+            logger.error(e.body)
+            return False
 
-        secrets = (
-            k8sClient.CoreV1Api()
-            .list_namespaced_secret(namespace=cluster_name)
-            .items
-        )
-        controller_token_secret = "controller-token-secret"
-        names = [n.metadata.name for n in secrets]
-        if names and controller_token_secret in names:
-            wrap_404(
-                lambda: k8sClient.CoreV1Api().delete_namespaced_secret(
-                    name=controller_token_secret,
-                    namespace=cluster_name,
-                    body=body,
-                )
-            )
+        if list_func is None:
+            return True
 
-        controller_token_private_secret = "controller-token-private-secret"
-        if names and controller_token_private_secret in names:
-            wrap_404(
-                lambda: k8sClient.CoreV1Api().delete_namespaced_secret(
-                    name=controller_token_private_secret,
-                    namespace=cluster_name,
-                    body=body,
-                )
-            )
+        remaining = None
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
 
-        app_service_proxy = "appproxy-secret"
-        if names and app_service_proxy in names:
-            wrap_404(
-                lambda: k8sClient.CoreV1Api().delete_namespaced_secret(
-                    name=app_service_proxy, namespace=cluster_name, body=body
-                )
-            )
+        logger.debug("Waiting for %s to finish.", list_func.__name__)
+        if (
+            wait_for_objects(
+                list_func,
+                lambda objects: not objects,
+                timeout_seconds=remaining,
+                namespace=cluster_name,
+                **kwargs
+            )
+            is None
+        ):
+            return False
 
-        logger.debug("Deleting persistent volume claims")
-        wrap_404(
-            lambda: k8sClient.CoreV1Api().delete_collection_namespaced_persistent_volume_claim(
-                namespace=cluster_name, **kwargs
-            )
-        )
 
-        logger.debug("Deleting Controller replica set")
-        controller_replicaset = "control"
-        replicasets = (
-            k8sClient.AppsV1Api()
-            .list_namespaced_replica_set(namespace=cluster_name)
-            .items
-        )
-        names = [n.metadata.name for n in replicasets]
-        if names and controller_replicaset in names:
-            wrap_404(
-                lambda: k8sClient.AppsV1Api().delete_namespaced_replica_set(
-                    name=controller_replicaset,
-                    namespace=cluster_name,
-                    body=body,
-                )
-            )
+def delete_cluster_resources(cluster_name, label=None, max_workers=None):
+    """
+    Delete cluster resources. The independent delete requests are issued
+    concurrently, pods are deleted once their controllers are gone.
+    """
+    from azext_arcdata.core.task_graph import TaskGraph
 
-        logger.debug("Deleting pods")
-        wrap_404(
-            lambda: k8sClient.CoreV1Api().delete_collection_namespaced_pod(
-                namespace=cluster_name, **kwargs
-            )
-        )
+    try:
+        kwargs = {"label_selector": label} if label else {}
+        body = k8sClient.V1DeleteOptions()
+        apps = k8sClient.AppsV1Api(get_api_client())
+        core = k8sClient.CoreV1Api(get_api_client())
+        rbac = k8sClient.RbacAuthorizationV1Api(get_api_client())
 
-        logger.debug("Deleting service accounts")
-        wrap_404(
-            lambda: k8sClient.CoreV1Api().delete_collection_namespaced_service_account(
-                namespace=cluster_name, **kwargs
-            )
-        )
+        def delete_collection(description, func):
+            logger.debug("Deleting %s", description)
+            wrap_404(lambda: func(namespace=cluster_name, **kwargs))
 
-        logger.debug("Deleting roles")
-        wrap_404(
-            lambda: k8sClient.RbacAuthorizationV1Api().delete_collection_namespaced_role_binding(
-                namespace=cluster_name, **kwargs
-            )
-        )
+        def delete_named(func, name):
+            wrap_404(lambda: func(name=name, namespace=cluster_name, body=body))
 
-        wrap_404(
-            lambda: k8sClient.RbacAuthorizationV1Api().delete_collection_namespaced_role(
+        def delete_services():
+            logger.debug("Deleting services")
+            services = core.list_namespaced_service(
                 namespace=cluster_name, **kwargs
-            )
-        )
-
-        admin_rule = "namespaced-admin"
-        roles = (
-            k8sClient.RbacAuthorizationV1Api()
-            .list_namespaced_role(namespace=cluster_name)
-            .items
-        )
-        names = [n.metadata.name for n in roles]
-        if names and admin_rule in names:
-            wrap_404(
-                lambda: k8sClient.RbacAuthorizationV1Api().delete_namespaced_role(
-                    name=admin_rule, namespace=cluster_name, body=body
+            ).items
+            for service in services:
+                delete_named(
+                    core.delete_namespaced_service, service.metadata.name
                 )
-            )
 
-        logger.debug("Deleting config maps")
-        wrap_404(
-            lambda: k8sClient.CoreV1Api().delete_collection_namespaced_config_map(
-                namespace=cluster_name, **kwargs
-            )
-        )
+        graph = TaskGraph(max_workers=max_workers)
+        controllers = [
+            graph.add(
+                "stateful sets",
+                lambda: delete_collection(
+                    "stateful sets",
+                    apps.delete_collection_namespaced_stateful_set,
+                ),
+            ),
+            graph.add(
+                "daemon sets",
+                lambda: delete_collection(
+                    "daemon sets", apps.delete_collection_namespaced_daemon_set
+                ),
+            ),
+            graph.add(
+                "deployments",
+                lambda: delete_collection(
+                    "deployments", apps.delete_collection_namespaced_deployment
+                ),
+            ),
+            graph.add(
+                "replica sets",
+                lambda: delete_collection(
+                    "replica sets",
+                    apps.delete_collection_namespaced_replica_set,
+                ),
+            ),
+            graph.add(
+                "controller replica set",
+                lambda: delete_named(
+                    apps.delete_namespaced_replica_set, "control"
+                ),
+            ),
+        ]
+        graph.add("services", delete_services)
+        graph.add(
+            "secrets",
+            lambda: delete_collection(
+                "secrets", core.delete_collection_namespaced_secret
+            ),
+        )
+        for secret in [
+            "controller-token-secret",
+            "controller-token-private-secret",
+            "appproxy-secret",
+        ]:
+            graph.add(
+                "secret {}".format(secret),
+                lambda secret=secret: delete_named(
+                    core.delete_namespaced_secret, secret
+                ),
+            )
+        graph.add(
+            "persistent volume claims",
+            lambda: delete_collection(
+                "persistent volume claims",
+                core.delete_collection_namespaced_persistent_volume_claim,
+            ),
+        )
+        graph.add(
+            "service accounts",
+            lambda: delete_collection(
+                "service accounts",
+                core.delete_collection_namespaced_service_account,
+            ),
+        )
+        graph.add(
+            "role bindings",
+            lambda: delete_collection(
+                "role bindings",
+                rbac.delete_collection_namespaced_role_binding,
+            ),
+        )
+        graph.add(
+            "roles",
+            lambda: delete_collection(
+                "roles", rbac.delete_collection_namespaced_role
+            ),
+        )
+        graph.add(
+            "admin role",
+            lambda: delete_named(
+                rbac.delete_namespaced_role, "namespaced-admin"
+            ),
+        )
+        graph.add(
+            "config maps",
+            lambda: delete_collection(
+                "config maps", core.delete_collection_namespaced_config_map
+            ),
+        )
+        graph.add(
+            "pods",
+            lambda: delete_collection(
+                "pods", core.delete_collection_namespaced_pod
+            ),
+            depends_on=controllers,
+        )
+        graph.run()
 
         return (namespace_is_empty(cluster_name, label=label), HTTPStatus.OK)
 
@@ -380,7 +359,7 @@ def get_namespace(cluster_name):
     :return:
     """
     try:
-        ns = k8sClient.CoreV1Api().read_namespace(cluster_name)
+        ns = k8sClient.CoreV1Api(get_api_client()).read_namespace(cluster_name)
         return ns
     except K8sApiException as e:
         logger.debug(e.body)
@@ -404,7 +383,8 @@ def update_namespace_label(cluster_name):
     Update K8s namespace label and add the MSSQL_CLUSTER if not already added.
     """
     try:
-        namespaces_list = k8sClient.CoreV1Api().list_namespace().items
+        api = k8sClient.CoreV1Api(get_api_client())
+        namespaces_list = api.list_namespace().items
         for namespace in namespaces_list:
 
             # Find the namespace
@@ -416,7 +396,7 @@ def update_namespace_label(cluster_name):
                 labels["MSSQL_CLUSTER"] = cluster_name
                 body = k8sClient.V1Namespace()
                 body.metadata = k8sClient.V1ObjectMeta(labels=labels)
-                k8sClient.CoreV1Api().patch_namespace(
+                k8sClient.CoreV1Api(get_api_client()).patch_namespace(
                     name=cluster_name, body=body
                 )
                 return
@@ -431,13 +411,13 @@ def delete_namespace(cluster_name):
     """
     try:
         namespacesList = (
-            k8sClient.CoreV1Api()
+            k8sClient.CoreV1Api(get_api_client())
             .list_namespace(label_selector="MSSQL_CLUSTER=" + cluster_name)
             .items
         )
         namespaces = [n.metadata.name for n in namespacesList]
         if cluster_name in namespaces:
-            k8sClient.CoreV1Api().delete_namespace(
+            k8sClient.CoreV1Api(get_api_client()).delete_namespace(
                 name=cluster_name, body=k8sClient.V1DeleteOptions()
             )
             display("Cluster deleted.")
@@ -462,7 +442,7 @@ def setup_private_registry(
             cluster_name, docker_registry, secret_name=secret_name
         )
 
-        k8sClient.CoreV1Api().create_namespaced_secret(
+        k8sClient.CoreV1Api(get_api_client()).create_namespaced_secret(
             namespace=cluster_name, body=body
         )
     except K8sApiException as e:
@@ -489,13 +469,13 @@ def update_private_registry_secret(
             password=password,
         )
 
-        k8sClient.CoreV1Api().patch_namespaced_secret(
+        k8sClient.CoreV1Api(get_api_client()).patch_namespaced_secret(
             name=secret_name, namespace=cluster_name, body=body
         )
     except K8sApiException as e:
         if e.status == HTTPStatus.NOT_FOUND:
             try:
-                k8sClient.CoreV1Api().create_namespaced_secret(
+                k8sClient.CoreV1Api(get_api_client()).create_namespaced_secret(
                     namespace=cluster_name, body=body
                 )
             except K8sApiException as e:
@@ -587,7 +567,7 @@ def create_empty_secret(cluster_name, secret_name):
             namespace=cluster_name,
             labels={"MSSQL_CLUSTER": cluster_name},
         )
-        k8sClient.CoreV1Api().create_namespaced_secret(
+        k8sClient.CoreV1Api(get_api_client()).create_namespaced_secret(
             namespace=cluster_name, body=body
         )
     except K8sApiException as e:
@@ -600,21 +580,20 @@ def update_cluster_role(cluster_role_name, cluster_role_body):
     Update the cluster role.
     """
     try:
-        k8sClient.RbacAuthorizationV1Api().patch_cluster_role(
+        k8sClient.RbacAuthorizationV1Api(get_api_client()).patch_cluster_role(
             name=cluster_role_name, body=cluster_role_body
         )
     except K8sApiException as e:
         if e.status == HTTPStatus.NOT_FOUND:
-            k8sClient.RbacAuthorizationV1Api().create_cluster_role(
-                body=cluster_role_body
-            )
+            api = k8sClient.RbacAuthorizationV1Api(get_api_client())
+            api.create_cluster_role(body=cluster_role_body)
         else:
             raise
 
 
 def delete_service_account(name, namespace):
     try:
-        k8sClient.CoreV1Api().delete_namespaced_service_account(
+        k8sClient.CoreV1Api(get_api_client()).delete_namespaced_service_account(
             name=name, namespace=namespace
         )
     except K8sApiException as e:
@@ -635,7 +614,7 @@ def delete_cluster_role(cluster_role_name):
     Update the cluster role.
     """
     try:
-        k8sClient.RbacAuthorizationV1Api().delete_cluster_role(
+        k8sClient.RbacAuthorizationV1Api(get_api_client()).delete_cluster_role(
             name=cluster_role_name
         )
     except K8sApiException as e:
@@ -656,9 +635,8 @@ def delete_cluster_role_binding(cluster_role_binding_name):
     delete the cluster role.
     """
     try:
-        k8sClient.RbacAuthorizationV1Api().delete_cluster_role_binding(
-            name=cluster_role_binding_name
-        )
+        api = k8sClient.RbacAuthorizationV1Api(get_api_client())
+        api.delete_cluster_role_binding(name=cluster_role_binding_name)
     except K8sApiException as e:
         if e.status == HTTPStatus.NOT_FOUND:
             # already deleted
@@ -679,14 +657,14 @@ def update_cluster_role_binding(
     Update the cluster role binding.
     """
     try:
-        k8sClient.RbacAuthorizationV1Api().patch_cluster_role_binding(
+        api = k8sClient.RbacAuthorizationV1Api(get_api_client())
+        api.patch_cluster_role_binding(
             name=cluster_role_binding_name, body=cluster_role_binding_body
         )
     except K8sApiException as e:
         if e.status == HTTPStatus.NOT_FOUND:
-            k8sClient.RbacAuthorizationV1Api().create_cluster_role_binding(
-                body=cluster_role_binding_body
-            )
+            api = k8sClient.RbacAuthorizationV1Api(get_api_client())
+            api.create_cluster_role_binding(body=cluster_role_binding_body)
         else:
             raise
 
@@ -703,7 +681,7 @@ def create_config_map(cluster_name, config_map_name, data):
             namespace=cluster_name,
             labels={"MSSQL_CLUSTER": cluster_name},
         )
-        k8sClient.CoreV1Api().create_namespaced_config_map(
+        k8sClient.CoreV1Api(get_api_client()).create_namespaced_config_map(
             namespace=cluster_name, body=body
         )
     except K8sApiException as e:
@@ -716,7 +694,8 @@ def get_config_map(cluster_name, config_map_name):
     Retrieve the requested config map
     """
     try:
-        config_map = k8sClient.CoreV1Api().read_namespaced_config_map(
+        api = k8sClient.CoreV1Api(get_api_client())
+        config_map = api.read_namespaced_config_map(
             config_map_name, cluster_name
         )
 
@@ -732,7 +711,7 @@ def patch_config_map(cluster_name, config_map_name, patch):
     Patch the config map
     """
     try:
-        k8sClient.CoreV1Api().patch_namespaced_config_map(
+        k8sClient.CoreV1Api(get_api_client()).patch_namespaced_config_map(
             config_map_name, cluster_name, patch
         )
     except K8sApiException as e:
@@ -747,7 +726,7 @@ def create_secret(cluster_name, config):
 
     try:
         body = yaml.safe_load(config)
-        k8sClient.CoreV1Api().create_namespaced_secret(
+        k8sClient.CoreV1Api(get_api_client()).create_namespaced_secret(
             namespace=cluster_name, body=body
         )
     except K8sApiException as e:
@@ -761,7 +740,8 @@ def service_account_exists(cluster_name, service_account_name):
     """
 
     try:
-        service_account = k8sClient.CoreV1Api().read_namespaced_service_account(
+        api = k8sClient.CoreV1Api(get_api_client())
+        service_account = api.read_namespaced_service_account(
             service_account_name, cluster_name
         )
         return service_account_name == service_account.metadata.name
@@ -778,12 +758,13 @@ def update_service_account(namespace, name, service_account_body):
     :service_account_body: yaml definition of the service account
     """
     try:
-        k8sClient.CoreV1Api().patch_namespaced_service_account(
+        k8sClient.CoreV1Api(get_api_client()).patch_namespaced_service_account(
             namespace=namespace, name=name, body=service_account_body
         )
     except K8sApiException as e:
         if e.status == HTTPStatus.NOT_FOUND:
-            k8sClient.CoreV1Api().create_namespaced_service_account(
+            api = k8sClient.CoreV1Api(get_api_client())
+            api.create_namespaced_service_account(
                 namespace=namespace, body=service_account_body
             )
         else:
@@ -796,9 +777,8 @@ def namespaced_role_exists(cluster_name, role_name):
     """
 
     try:
-        role = k8sClient.RbacAuthorizationV1Api().read_namespaced_role(
-            role_name, cluster_name
-        )
+        api = k8sClient.RbacAuthorizationV1Api(get_api_client())
+        role = api.read_namespaced_role(role_name, cluster_name)
         return role_name == role.metadata.name
     except K8sApiException as e:
         logger.debug(e.body)
@@ -811,10 +791,9 @@ def namespaced_role_binding_exists(cluster_name, role_binding_name):
     """
 
     try:
-        role_binding = (
-            k8sClient.RbacAuthorizationV1Api().read_namespaced_role_binding(
-                role_binding_name, cluster_name
-            )
+        api = k8sClient.RbacAuthorizationV1Api(get_api_client())
+        role_binding = api.read_namespaced_role_binding(
+            role_binding_name, cluster_name
         )
         return role_binding_name == role_binding.metadata.name
     except K8sApiException as e:
@@ -828,7 +807,8 @@ def cluster_role_exists(role_name):
     """
 
     try:
-        role = k8sClient.RbacAuthorizationV1Api().read_cluster_role(role_name)
+        api = k8sClient.RbacAuthorizationV1Api(get_api_client())
+        role = api.read_cluster_role(role_name)
         return role_name == role.metadata.name
     except K8sApiException as e:
         logger.debug(e.body)
@@ -841,11 +821,8 @@ def cluster_role_binding_exists(role_binding_name):
     """
 
     try:
-        role_binding = (
-            k8sClient.RbacAuthorizationV1Api().read_cluster_role_binding(
-                role_binding_name
-            )
-        )
+        api = k8sClient.RbacAuthorizationV1Api(get_api_client())
+        role_binding = api.read_cluster_role_binding(role_binding_name)
         return role_binding_name == role_binding.metadata.name
     except K8sApiException as e:
         logger.debug(e.body)
@@ -907,7 +884,8 @@ def create_namespace_with_retry(
         retry_method="check if namespace is empty",
         retry_on_exceptions=(NewConnectionError, MaxRetryError),
     ):
-        namespace_response = k8sClient.CoreV1Api().read_namespace(namespace)
+        api = k8sClient.CoreV1Api(get_api_client())
+        namespace_response = api.read_namespace(namespace)
 
         if cluster_label_key:
             if (
@@ -952,7 +930,7 @@ def validate_rwx_storage_class(name: str, type: str, instanceType: str):
     except ConfigException as e:
         config.load_kube_config()
     storageClass = None
-    for s in client.StorageV1Api().list_storage_class().items:
+    for s in client.StorageV1Api(get_api_client()).list_storage_class().items:
         if s.metadata.name == name:
             storageClass = s
 
@@ -29,6 +29,32 @@ class SanitizerRule:
             return value
 
 
+class _PathNode(object):
+    """
+    A property path of the sanitized objects. The rule is matched against
+    the path once, however many values are found at that path.
+    """
+
+    def __init__(self, path, rule):
+        self.path = path
+        self._rule = rule
+        self._is_match = None
+        self._children = {}
+
+    @property
+    def is_match(self):
+        if self._is_match is None:
+            self._is_match = bool(self._rule.is_property_match(self.path))
+        return self._is_match
+
+    def child(self, key):
+        node = self._children.get(key)
+        if node is None:
+            node = _PathNode(".".join([self.path, key]), self._rule)
+            self._children[key] = node
+        return node
+
+
 class Sanitizer(object):
     """
     Object sanitizer allowing for properties to be excluded based on
@@ -47,6 +73,7 @@ class Sanitizer(object):
         super().__init__(*args, **kwargs)
         self._serializedInstances = []
         self._filters = filters
+        self._paths = {}
 
     def sanitize_value(self, property_path, property_value):
         for f in self._filters:
@@ -60,43 +87,52 @@ class Sanitizer(object):
 
         return property_value
 
-    def _array_sanitizer_aggregator(self, path, value, aggregator):
-        aggregator.append(self.sanitize(value, path))
-        return aggregator
-
     def sanitize(self, obj, path=""):
         """
-        Sanitizes the given object and returns a new dict with properties that
-        are allowed to be serialized.
+        Sanitizes the given object in place and returns it. Objects that are
+        not a dict or a list are sanitized as a new dict of their properties.
+        When there are no filters the object is returned as is.
         """
+        if not self._filters:
+            return obj
+
+        node = self._paths.get(path)
+        if node is None:
+            node = _PathNode(path, self._filters[0])
+            self._paths[path] = node
+
+        return self._sanitize(obj, node)
+
+    def _sanitize(self, obj, node):
         if obj is None:
             return None
 
         if isinstance(obj, list):
-            result = _.reduce_(
-                obj,
-                lambda agg, value: self._array_sanitizer_aggregator(
-                    path, value, agg
-                ),
-                [],
-            )
-            return result
+            # array items share the property path of the array
+            for i, value in enumerate(obj):
+                sanitized = self._sanitize(value, node)
+                if sanitized is not value:
+                    obj[i] = sanitized
+            return obj
 
-        obj = _.get(obj, "__dict__", obj)
+        if not isinstance(obj, dict) and hasattr(obj, "__dict__"):
+            obj = dict(obj.__dict__)
 
         if isinstance(obj, dict):
             # if the object is a dict, we need to pass each property to each
-            # filter to determine if it should be serialized or not. And return
-            # the resulting dictionary
-            result = {}
-            for key in _.keys(obj):
-                result[key] = self.sanitize(obj[key], ".".join([path, key]))
-
-            return result
-        else:
-            # if the object is not a dict by this point, it is going to be a
-            # simple type, so we can just return it.
-            return self.sanitize_value(path, obj)
+            # filter to determine if it should be serialized or not.
+            for key, value in obj.items():
+                sanitized = self._sanitize(value, node.child(key))
+                if sanitized is not value:
+                    obj[key] = sanitized
+            return obj
+
+        # if the object is not a dict by this point, it is going to be a
+        # simple type, so we can just return it.
+        if node.is_match:
+            return self.sanitize_value(node.path, obj)
+
+        return obj
 
     @staticmethod
     def sanitize_object(obj, filters: List[SanitizerRule] = []):
@@ -203,7 +203,10 @@ class NoOptDataControllerServiceProxy(BaseServiceProxy):
         subscription = "noopt"
         arm_client = ArmClient(NoOptCred(), subscription)
 
-        arm_client.export_upload_log_and_metrics_dc(command_value_object.path)
+        arm_client.export_upload_log_and_metrics_dc(
+            command_value_object.path,
+            concurrency=command_value_object.concurrency,
+        )
 
 
 # ============================================================================ #
@@ -576,8 +579,10 @@ class KubernetesDataControllerServiceProxy(
     # non abstract / indirect only functions (below)
     ############################################################################
 
-    def export(self, namespace, export_type, path):
-        self._client.export(namespace, export_type, path)
+    def export(self, namespace, export_type, path, concurrency=None):
+        self._client.export(
+            namespace, export_type, path, concurrency=concurrency
+        )
 
     def copy_logs(
         self,
@@ -591,6 +596,8 @@ class KubernetesDataControllerServiceProxy(
         skip_compress=False,
         exclude_dumps=False,
         exclude_system_logs=False,
+        concurrency=None,
+        pod_timeout=0,
     ):
         """
         Copy Logs commands - requires kube config
@@ -609,6 +616,8 @@ class KubernetesDataControllerServiceProxy(
             skip_compress,
             exclude_dumps,
             exclude_system_logs,
+            concurrency,
+            pod_timeout,
         )
 
     def capture_debug_dump(
@@ -0,0 +1,146 @@
+# ------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# ------------------------------------------------------------------------------
+
+"""
+Run a set of dependent tasks in parallel, each as soon as its dependencies
+completed.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from knack.log import get_logger
+
+import threading
+import time
+
+__all__ = ["TaskGraph"]
+
+logger = get_logger(__name__)
+
+TASK_GRAPH_MAX_WORKERS = 8
+"""
+Default number of tasks of a graph that run at the same time.
+"""
+
+
+class TaskGraph(object):
+    """
+    A dependency graph of named tasks. `run` starts every task whose
+    dependencies completed, in parallel, and records how long each one took.
+    The first failing task, or an interrupt, stops the graph: no further
+    tasks are started, `stopped` is set for the running ones and the
+    exception is raised without waiting for them. Tasks that wait for a long
+    time should return once `stopped` is set. Each task runs in a copy of
+    the context `run` was called in.
+    """
+
+    def __init__(self, max_workers=None):
+        """
+        :param max_workers: The maximum number of tasks running at once.
+        """
+        self._max_workers = max_workers or TASK_GRAPH_MAX_WORKERS
+        self._tasks = {}
+        self.results = {}
+        self.timings = {}
+        self.stopped = threading.Event()
+
+    def add(self, name, func, depends_on=None):
+        """
+        Add a task to the graph.
+        :param name: The unique name of the task.
+        :param func: The callable run by the task, without arguments.
+        :param depends_on: The names of the tasks that must complete first.
+        :return: The name of the task.
+        """
+        if name in self._tasks:
+            raise ValueError("Task `{}` is already defined.".format(name))
+
+        depends_on = list(depends_on or [])
+        for dependency in depends_on:
+            if dependency not in self._tasks:
+                raise ValueError(
+                    "Task `{0}` depends on unknown task `{1}`.".format(
+                        name, dependency
+                    )
+                )
+
+        self._tasks[name] = (func, depends_on)
+        return name
+
+    def run(self):
+        """
+        Run every task of the graph. Tasks can read the results of their
+        dependencies from `results` while the graph runs.
+        :return: The result of each task, keyed by task name.
+        """
+        results = self.results
+        pending = dict(self._tasks)
+        running = {}
+        started = {}
+
+        def _run(name, func):
+            started[name] = time.monotonic()
+            try:
+                return func()
+            finally:
+                self.timings[name] = time.monotonic() - started[name]
+
+        # Not a `with` block: leaving one waits for the running tasks, which
+        # would keep an interrupted or failed graph going.
+        #
+        executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        try:
+            while pending or running:
+                for name, (func, depends_on) in list(pending.items()):
+                    if all(d in results for d in depends_on):
+                        del pending[name]
+                        logger.debug("Starting task `%s`.", name)
+                        running[
+                            executor.submit(
+                                copy_context().run, _run, name, func
+                            )
+                        ] = name
+
+                if not running:
+                    break
+
+                done, _ = wait(
+                    list(running.keys()), return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        logger.debug("Task `%s` failed: %s", name, e)
+                        raise
+                    logger.debug(
+                        "Task `%s` completed in %.1fs.",
+                        name,
+                        self.timings[name],
+                    )
+        except BaseException:
+            self.stopped.set()
+            for future in running:
+                future.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=not self.stopped.is_set())
+
+        return results
+
+    def format_timings(self):
+        """
+        Format the duration of each task that ran, longest first.
+        :return: One line per task.
+        """
+        width = max([len(name) for name in self.timings] or [0])
+        return [
+            "{0}  {1:7.1f}s".format(name.ljust(width), seconds)
+            for name, seconds in sorted(
+                self.timings.items(), key=lambda t: t[1], reverse=True
+            )
+        ]
@@ -20,28 +20,44 @@ from azext_arcdata.core.constants import (
 )
 from knack.log import get_logger
 from knack.cli import CLIError
-from kubernetes import config as kconfig
-from jsonpatch import JsonPatch
-from jsonpath_ng.ext import parse
-from humanfriendly.terminal.spinners import AutomaticSpinner
-from jinja2 import Template as JinjaTemplate
 from pathlib import Path, PureWindowsPath
 from string import Template
-from functools import wraps
+from functools import lru_cache, wraps
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from email.utils import parsedate_to_datetime
 
+import base64
 import os
+import threading
 import time
 import platform
+import random
 import json
 import re
 import sys
 import signal
 import pydash as _
 import yaml
-import pem
 
 logger = get_logger(__name__)
 
+KUBE_CONFIG_TOKEN_TTL_SECONDS = 5 * 60
+"""
+Time a loaded kube config is reused when its bearer token does not carry an
+expiry, e.g. a token issued by an exec credential plugin.
+"""
+
+KUBE_CONFIG_REFRESH_MARGIN_SECONDS = 60
+"""
+Time before the expiry of a bearer token at which the kube config is loaded
+again.
+"""
+
+_kube_config_cache = {}
+_kube_config_stats = {"saved_seconds": 0.0}
+_kube_config_lock = threading.RLock()
+
 
 def is_windows():
     """
@@ -254,6 +270,7 @@ def check_missing(stdout, force, config_object, help_object, config_filename):
     Check for missing values and prompt user for them or raise an error in no
     tty environments.
     """
+    from jsonpath_ng.ext import parse
 
     def parse_for_missing(cfg_object):
         """
@@ -452,6 +469,8 @@ def check_and_set_kubectl_context():
     """
     Check and set environment var for kubectl command context
     """
+    from kubernetes import config as kconfig
+
     try:
         if os.getenv("KUBERNETES_SERVICE_HOST"):
             kconfig.load_incluster_config()
@@ -471,6 +490,7 @@ def load_kube_config(context=None):
     :param context:
     :return:
     """
+    from kubernetes import config as kconfig
 
     # This is a temporary workaround until this change gets checked in.
     # Python Kubernetes Library does not handle cases where the KUBECONFIG
@@ -615,9 +635,111 @@ def retry_method(
     return retry_method_wrapper
 
 
+RETRY_BACKOFF_INITIAL_SECONDS = 0.5
+"""
+Wait before the first retry. Each further retry waits twice as long.
+"""
+
+RETRY_BACKOFF_MAX_MULTIPLIER = 2
+"""
+Longest wait between two attempts, as a multiple of the caller's
+`retry_delay`.
+"""
+
+RETRY_AFTER_STATUS_CODES = (429, 503)
+"""
+HTTP status codes whose `Retry-After` header is honored between attempts.
+"""
+
+_retry_deadline = ContextVar("retry_deadline", default=None)
+
+_retry_stats = {}
+_retry_stats_lock = threading.Lock()
+
+
+@contextmanager
+def retry_deadline(seconds):
+    """
+    Bound the total time spent retrying by every `retry` call made within the
+    block, including nested ones and the ones made by tasks submitted with
+    `submit_in_context`. An enclosing deadline that is sooner remains in
+    effect. Without one, each `retry` call only keeps to its own budget.
+    :param seconds: The budget in seconds.
+    """
+    outer = _retry_deadline.get()
+    deadline = time.monotonic() + seconds
+    token = _retry_deadline.set(
+        deadline if outer is None else min(outer, deadline)
+    )
+    try:
+        yield
+    finally:
+        _retry_deadline.reset(token)
+
+
+def submit_in_context(executor, func, *args, **kwargs):
+    """
+    Submit `func` to `executor` in a copy of the current context, so that the
+    task keeps to the `retry_deadline` of the caller.
+    :param executor: The executor running the task.
+    :param func: The task.
+    :return: The future of the task.
+    """
+    return executor.submit(copy_context().run, func, *args, **kwargs)
+
+
+def get_retry_stats():
+    """
+    Get the retry counters of the process, keyed by the `retry_method`
+    description of the retried calls: the number of calls, attempts and
+    calls that failed after retrying, and the seconds spent waiting between
+    attempts.
+    :return: A copy of the counters.
+    """
+    with _retry_stats_lock:
+        return {method: dict(stats) for method, stats in _retry_stats.items()}
+
+
+def format_retry_stats():
+    """
+    Describe the retried calls of the process, one line per call that needed
+    more than one attempt or failed.
+    :return: The lines of the description, none when no call was retried.
+    """
+    return [
+        "{0}: {1} call(s), {2} attempt(s), {3} failed, waited {4:.1f}s".format(
+            method,
+            stats["calls"],
+            stats["attempts"],
+            stats["failures"],
+            stats["waited_seconds"],
+        )
+        for method, stats in sorted(get_retry_stats().items())
+        if stats["attempts"] > stats["calls"] or stats["failures"]
+    ]
+
+
+def _record_retry(retry_method, attempts, waited, failed):
+    with _retry_stats_lock:
+        stats = _retry_stats.setdefault(
+            retry_method or "retry",
+            {"calls": 0, "attempts": 0, "failures": 0, "waited_seconds": 0.0},
+        )
+        stats["calls"] += 1
+        stats["attempts"] += attempts
+        stats["failures"] += 1 if failed else 0
+        stats["waited_seconds"] += waited
+
+
 def retry(func, *func_args, **kwargs):
     """
-    Function retry until max limit
+    Function retry until max limit. Attempts are spaced by an exponential
+    backoff with jitter, starting at `RETRY_BACKOFF_INITIAL_SECONDS`, and
+    go on until at least `retry_count` attempts were made and
+    `retry_count * retry_delay` seconds were spent waiting between them, or
+    the deadline of an enclosing `retry_deadline` is reached. A
+    `Retry-After` header on a 429 or 503 response is honored. Every call is
+    counted in `get_retry_stats`.
     :param func : Function to retry
     :param func_args : Arguments to func
     :param int retry_count : Retry attempts
@@ -632,34 +754,117 @@ def retry(func, *func_args, **kwargs):
     retry_count = kwargs.get("retry_count", connection_retry_attempts)
     retry_delay = kwargs.get("retry_delay", connection_retry_interval_seconds)
     retry_method = kwargs.get("retry_method", None)
-    retry_on_exceptions = kwargs.get("retry_on_exceptions", None)
+    retry_on_exceptions = kwargs.get("retry_on_exceptions", None) or ()
     exception_caused = None
-    for i in range(retry_count):
+
+    start = time.monotonic()
+    deadline = _retry_deadline.get()
+    wait_budget = retry_count * retry_delay
+    waited = 0.0
+    attempts = 0
+    while True:
         try:
             return_value = func(*func_args)
+            _record_retry(retry_method, attempts + 1, waited, False)
+            if attempts:
+                logger.debug(
+                    "Succeeded to %s after %d attempt(s), waited %.1fs"
+                    % (retry_method, attempts + 1, waited)
+                )
             return return_value if return_value is not None else True
         except retry_on_exceptions as e:
             exception_caused = e
-            logger.debug(
-                "Waiting for %d seconds before trying to %s again"
-                % (retry_delay, retry_method)
-            )
-            time.sleep(retry_delay)
-            continue
+        attempts += 1
+
+        if attempts >= retry_count and waited >= wait_budget:
+            break
+
+        delay = _get_retry_delay(attempts - 1, retry_delay, exception_caused)
+        if waited < wait_budget:
+            delay = min(delay, wait_budget - waited)
+        if deadline is not None and time.monotonic() + delay > deadline:
+            break
+
+        logger.debug(
+            "Waiting for %.1f seconds before trying to %s again"
+            % (delay, retry_method)
+        )
+        time.sleep(delay)
+        waited += delay
+
+    elapsed = time.monotonic() - start
+    _record_retry(retry_method, attempts, waited, True)
+    logger.debug(
+        "Failed to %s after %d attempt(s) in %.1fs, waited %.1fs"
+        % (retry_method, attempts, elapsed, waited)
+    )
     logger.debug(exception_caused)
     log_error(
         str(
             _.get(exception_caused, ["reason", "__context__"], exception_caused)
         ),
-        "Failed to %s after retrying for %d minute(s)."
-        % (retry_method, (retry_count * retry_delay) / 60),
+        "Failed to %s after retrying for %d second(s)."
+        % (retry_method, elapsed),
     )
     raise Exception(
-        "Failed to %s after retrying for %d minute(s)."
-        % (retry_method, (retry_count * retry_delay) / 60)
+        "Failed to %s after retrying for %d second(s)."
+        % (retry_method, elapsed)
     )
 
 
+def _get_retry_delay(retry_number, retry_delay, exception):
+    """
+    Get the wait before the next attempt: the exponential backoff with equal
+    jitter, or the server's `Retry-After` when that is longer.
+    """
+    backoff = min(
+        RETRY_BACKOFF_INITIAL_SECONDS * 2**retry_number,
+        retry_delay * RETRY_BACKOFF_MAX_MULTIPLIER,
+    )
+    delay = backoff / 2 + random.uniform(0, backoff / 2)
+
+    retry_after = _get_retry_after(exception)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+
+    return delay
+
+
+def _get_retry_after(exception):
+    """
+    Get the `Retry-After` of a throttled or unavailable HTTP response, from a
+    Kubernetes `ApiException`, an Azure `HttpResponseError` or a `requests`
+    `HTTPError`.
+    :return: The number of seconds to wait, None if there is none.
+    """
+    status = getattr(exception, "status", None) or getattr(
+        exception, "status_code", None
+    )
+    headers = getattr(exception, "headers", None)
+    response = getattr(exception, "response", None)
+    if response is not None:
+        status = status or getattr(response, "status_code", None)
+        headers = headers or getattr(response, "headers", None)
+
+    if status not in RETRY_AFTER_STATUS_CODES or not headers:
+        return None
+
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
 class TimeoutError(Exception):
     pass
 
@@ -840,6 +1045,102 @@ def trim_dict_entries(d: dict):
     return d
 
 
+# ---------------------------------------------------------------------------- #
+# ---------------------------------------------------------------------------- #
+# ---------------------------------------------------------------------------- #
+
+JSON_PATH_CACHE_SIZE = 256
+"""
+Number of distinct JSON paths whose compiled expression is kept in memory.
+"""
+
+_PLAIN_JSON_PATH_SEGMENT = re.compile(
+    r"^([A-Za-z_][A-Za-z0-9_\-]*)((\[\d+\])*)$"
+)
+
+
+@lru_cache(maxsize=JSON_PATH_CACHE_SIZE)
+def _parse_json_path(json_path):
+    """
+    Compile a JSON path expression once per distinct path.
+    """
+    from jsonpath_ng.ext import parse
+
+    return parse(json_path)
+
+
+@lru_cache(maxsize=JSON_PATH_CACHE_SIZE)
+def _split_plain_json_path(json_path):
+    """
+    Split a plain dotted and indexed JSON path, e.g. `spec.services[0].port`,
+    into its keys and list indexes. Any other path, including those the JSON
+    path grammar would reject or read differently, gives None.
+    """
+    if json_path.startswith("$."):
+        json_path = json_path[2:]
+
+    steps = []
+    for segment in json_path.split("."):
+        match = _PLAIN_JSON_PATH_SEGMENT.match(segment)
+        if not match:
+            return None
+
+        key = match.group(1)
+        if key == "where" or key.startswith(("true", "false")):
+            return None
+
+        steps.append(key)
+        steps.extend(int(i) for i in re.findall(r"\d+", match.group(2)))
+
+    return tuple(steps)
+
+
+def _update_json_path(config_object, json_path, value):
+    """
+    Set the value at every match of a JSON path in a single traversal. Plain
+    paths are resolved by walking the object directly, any other path with
+    its compiled expression.
+    :param config_object: The object to update in place.
+    :param json_path: The JSON path.
+    :param value: The new value.
+    :return: True if the path matched, False otherwise.
+    """
+    steps = _split_plain_json_path(json_path)
+    if steps is not None:
+        parent, key, node = None, None, config_object
+        for step in steps:
+            if isinstance(step, int):
+                if not isinstance(node, list):
+                    break
+                if step >= len(node):
+                    return False
+            elif not isinstance(node, dict) or step not in node:
+                return False
+            parent, key, node = node, step, node[step]
+        else:
+            parent[key] = value
+            return True
+
+    from jsonpath_ng.jsonpath import Fields, Index
+
+    expr = _parse_json_path(json_path)
+    matches = expr.find(config_object)
+    if not matches:
+        return False
+
+    # Update each match through its parent rather than traversing again
+    if ".." not in json_path and all(
+        isinstance(match.path, (Fields, Index)) and match.context is not None
+        for match in matches
+    ):
+        for match in matches:
+            match.path.update(match.context.value, value)
+    else:
+        expr.update(config_object, value)
+
+    return True
+
+
 # ---------------------------------------------------------------------------- #
 # ---------------------------------------------------------------------------- #
 # ---------------------------------------------------------------------------- #
@@ -931,6 +1232,8 @@ class DeploymentConfigUtil(object):
         :param force:
         :return:
         """
+        from humanfriendly.terminal.spinners import AutomaticSpinner
+
         if not os.path.isdir(path):
             os.makedirs(path)
 
@@ -970,6 +1273,8 @@ class DeploymentConfigUtil(object):
         :param config_object:
         :return:
         """
+        from humanfriendly.terminal.spinners import AutomaticSpinner
+
         # -- write config --
         if not is_windows():
             with AutomaticSpinner(
@@ -1025,14 +1330,16 @@ class DeploymentConfigUtil(object):
         :param patch_file:
         :return:
         """
+        from jsonpatch import JsonPatch
+
         config_object = FileUtil.read_json(config_file)
 
         if os.path.isfile(patch_file):
             patch_json = FileUtil.read_json(patch_file)
             patch = patch_json.get("patch")
             if patch:
-                patches = JsonPatch(patch)
-                for p in patches:
+                edits = []
+                for p in JsonPatch(patch):
                     path = p.get("path")
                     if not path:
                         raise ValueError(
@@ -1049,9 +1356,8 @@ class DeploymentConfigUtil(object):
                             "Please specify a 'value' for all patches other "
                             "than 'remove' ops"
                         )
-                    DeploymentConfigUtil.patch_value(
-                        config_object, path, value, op
-                    )
+                    edits.append((path, value, op))
+                DeploymentConfigUtil.patch_values(config_object, edits)
             else:
                 raise ValueError(
                     "The patch file must be json and start with a key of "
@@ -1075,6 +1381,7 @@ class DeploymentConfigUtil(object):
         :param op:
         :return:
         """
+        edits = []
         json_values = re.split(IO_DELIM, json_values)
         for param in json_values:
             var = re.split(KEY_VALUE_SPLIT, param.strip())
@@ -1093,9 +1400,30 @@ class DeploymentConfigUtil(object):
                     except Exception as e:
                         if value.startswith("{"):
                             raise ValueError(e)
-            DeploymentConfigUtil.patch_value(
-                config_object, json_path, value, op
-            )
+            edits.append((json_path, value, op))
+
+        DeploymentConfigUtil.patch_values(config_object, edits)
+
+    @staticmethod
+    def patch_values(config_object, edits):
+        """
+        Patch the config_object with a list of edits, in order. Consecutive
+        edits that do not need the json path library are applied as a single
+        json patch.
+        :param config_object:
+        :param edits: The (json_path, value, op) of each edit.
+        :return:
+        """
+        batch = []
+        for edit in edits:
+            if DeploymentConfigUtil._is_json_path_edit(*edit):
+                DeploymentConfigUtil._apply_json_patches(config_object, batch)
+                DeploymentConfigUtil.patch_value(config_object, *edit)
+                batch = []
+            else:
+                batch.append(edit)
+
+        DeploymentConfigUtil._apply_json_patches(config_object, batch)
 
     @staticmethod
     def patch_value(config_object, json_path, value, op):
@@ -1108,24 +1436,15 @@ class DeploymentConfigUtil(object):
         :param op:
         :return:
         """
-        msg = "'{op}' at '{json_path}' with value of \n{val}\n".format(
-            op=op, json_path=json_path, val=json.dumps(value, indent=4)
-        )
-
         # If doing a replace and using conditional subsetting, use the json
         # path library
-        if op == "replace" and ("$" in json_path or "@" in json_path):
+        if DeploymentConfigUtil._is_json_path_edit(json_path, value, op):
             try:
-                json_path = DeploymentConfigUtil.replace_path(
-                    json_path, ["/"], "."
-                )
-                expr = parse(json_path)
-                find_result = [
-                    match.value for match in expr.find(config_object)
-                ]
-                if len(find_result) > 0:
-                    expr.update(config_object, value)
-                else:
+                if not _update_json_path(
+                    config_object,
+                    DeploymentConfigUtil.replace_path(json_path, ["/"], "."),
+                    value,
+                ):
                     raise ValueError(
                         "Your given json path does not exist. Please give a "
                         "json path that exists."
@@ -1133,31 +1452,18 @@ class DeploymentConfigUtil(object):
             except Exception as e:
                 raise ValueError(
                     "{msg}\nDetails: {error}\n\nPlease consult: "
-                    "https://jsonpath.com/".format(msg=msg, error=e)
+                    "https://jsonpath.com/".format(
+                        msg=DeploymentConfigUtil._patch_message(
+                            json_path, value, op
+                        ),
+                        error=e,
+                    )
                 )
         # Otherwise, use the patch library
         else:
-            try:
-                # Replace jsonpath related characters from the path with json
-                # patch syntax
-                json_path = DeploymentConfigUtil.replace_path(
-                    json_path, [".", "[", "]", "//"], "/"
-                )
-                if json_path.startswith("$"):
-                    json_path = json_path[1:]
-                if not json_path.startswith("/"):
-                    json_path = "/" + json_path
-                if json_path.endswith("/"):
-                    json_path = json_path[:-1]
-                patch = JsonPatch(
-                    [{"op": op, "path": json_path, "value": value}]
-                )
-                patch.apply(config_object, True)
-            except Exception as e:
-                raise ValueError(
-                    "{msg}\nDetails: {error}\n\nPlease consult: "
-                    "http://jsonpatch.com/".format(msg=msg, error=e)
-                )
+            DeploymentConfigUtil._apply_json_patch(
+                config_object, json_path, value, op
+            )
 
     @staticmethod
     def set_config_value(config_object, json_path, value, op=None):
@@ -1168,13 +1474,12 @@ class DeploymentConfigUtil(object):
         :param value:
         :return:
         """
+        from jsonpatch import JsonPatch
+
         if not op or op == "replace":
             json_path = DeploymentConfigUtil.replace_path(json_path, ["/"], ".")
             # Attempt to update the path if it already exists
-            expr = parse(json_path)
-            find_result = [match.value for match in expr.find(config_object)]
-            if len(find_result) > 0:
-                expr.update(config_object, value)
+            if _update_json_path(config_object, json_path, value):
                 return
             elif "$" in json_path:
                 raise ValueError(json_path)
@@ -1204,6 +1509,106 @@ class DeploymentConfigUtil(object):
             patch = JsonPatch([{"op": op, "path": json_path, "value": value}])
             patch.apply(config_object, True)
 
+    @staticmethod
+    def _is_json_path_edit(json_path, value, op):
+        """
+        Whether an edit is a replace using conditional subsetting, which only
+        the json path library handles.
+        """
+        return op == "replace" and ("$" in json_path or "@" in json_path)
+
+    @staticmethod
+    def _to_json_patch_path(json_path):
+        """
+        Replace jsonpath related characters from the path with json patch
+        syntax
+        """
+        json_path = DeploymentConfigUtil.replace_path(
+            json_path, [".", "[", "]", "//"], "/"
+        )
+        if json_path.startswith("$"):
+            json_path = json_path[1:]
+        if not json_path.startswith("/"):
+            json_path = "/" + json_path
+        if json_path.endswith("/"):
+            json_path = json_path[:-1]
+        return json_path
+
+    @staticmethod
+    def _apply_json_patches(config_object, edits):
+        """
+        Apply edits to the config_object in place as a single json patch. When
+        the patch fails, the config_object is restored and the edits are
+        applied one at a time instead, so that the error names the failed
+        edit.
+        """
+        if len(edits) < 2:
+            for edit in edits:
+                DeploymentConfigUtil._apply_json_patch(config_object, *edit)
+            return
+
+        from copy import deepcopy
+        from jsonpatch import JsonPatch
+
+        # A failed patch leaves the edits before the failed one applied
+        #
+        original = deepcopy(config_object)
+        try:
+            JsonPatch(
+                [
+                    {
+                        "op": op,
+                        "path": DeploymentConfigUtil._to_json_patch_path(
+                            json_path
+                        ),
+                        "value": value,
+                    }
+                    for json_path, value, op in edits
+                ]
+            ).apply(config_object, in_place=True)
+        except Exception:
+            config_object.clear()
+            config_object.update(original)
+            for edit in edits:
+                DeploymentConfigUtil._apply_json_patch(config_object, *edit)
+            raise
+
+    @staticmethod
+    def _apply_json_patch(config_object, json_path, value, op):
+        """
+        Apply an edit to the config_object in place as a json patch.
+        """
+        from jsonpatch import JsonPatch
+
+        try:
+            JsonPatch(
+                [
+                    {
+                        "op": op,
+                        "path": DeploymentConfigUtil._to_json_patch_path(
+                            json_path
+                        ),
+                        "value": value,
+                    }
+                ]
+            ).apply(config_object, in_place=True)
+        except Exception as e:
+            raise ValueError(
+                "{msg}\nDetails: {error}\n\nPlease consult: "
+                "http://jsonpatch.com/".format(
+                    msg=DeploymentConfigUtil._patch_message(
+                        json_path, value, op
+                    ),
+                    error=e,
+                )
+            )
+
+    @staticmethod
+    def _patch_message(json_path, value, op):
+        return "'{op}' at '{json_path}' with value of \n{val}\n".format(
+            op=op, json_path=json_path, val=json.dumps(value, indent=4)
+        )
+
     @staticmethod
     def replace_path(json_path, old_sep, new_sep):
         """
@@ -1228,9 +1633,13 @@ def check_and_set_kubectl_context():
     """
     Check and set environment var for kubectl command context
     """
+    from kubernetes import config as kconfig
+
     try:
         if os.getenv("KUBERNETES_SERVICE_HOST"):
-            kconfig.load_incluster_config()
+            _load_cached_kube_config(
+                ("in-cluster",), kconfig.load_incluster_config
+            )
         elif os.getenv("KUBECTL_CONTEXT") is None:
             load_kube_config()
         else:
@@ -1242,6 +1651,103 @@ def check_and_set_kubectl_context():
 
 
 def load_kube_config(context=None):
+    """
+    Loads the kube config, once per process for the same kubeconfig files
+    and context. It is loaded again when one of the files changes or when
+    its bearer token expires.
+    :param context: The context to load, the current context if not set.
+    :return: The loaded context.
+    """
+    return _load_cached_kube_config(
+        _get_kube_config_key(context), lambda: _load_kube_config(context)
+    )
+
+
+def _load_cached_kube_config(key, load):
+    """
+    Run `load` unless a kube config was already loaded for `key` and its
+    credentials are still valid, in which case that configuration is set as
+    the default again.
+    """
+    from kubernetes.client import Configuration as k8sConfiguration
+
+    with _kube_config_lock:
+        entry = _kube_config_cache.get(key)
+        if entry and (
+            entry["expires"] is None or time.time() < entry["expires"]
+        ):
+            k8sConfiguration.set_default(entry["configuration"])
+            if entry["context_name"]:
+                os.environ["KUBECTL_CONTEXT"] = entry["context_name"]
+
+            _kube_config_stats["saved_seconds"] += entry["seconds"]
+            logger.debug(
+                "Reused kube config for context %s, %.2fs saved so far.",
+                entry["context_name"] or key[0],
+                _kube_config_stats["saved_seconds"],
+            )
+            return entry["result"]
+
+        start = time.monotonic()
+        result = load()
+        configuration = k8sConfiguration.get_default_copy()
+        _kube_config_cache[key] = {
+            "result": result,
+            "configuration": configuration,
+            "context_name": os.environ.get("KUBECTL_CONTEXT"),
+            "seconds": time.monotonic() - start,
+            "expires": _get_credential_expiry(configuration),
+        }
+        return result
+
+
+def _get_kube_config_key(context):
+    """
+    The kube config cache key: the kubeconfig files with their modification
+    times, and the context.
+    """
+    separator = ";" if platform.system() == "Windows" else ":"
+    kube_config_files = os.environ.get("KUBECONFIG")
+    if kube_config_files:
+        paths = [f for f in kube_config_files.split(separator) if f]
+    else:
+        paths = [os.path.join(str(Path.home()), ".kube", "config")]
+
+    files = []
+    for path in paths:
+        try:
+            files.append((path, os.stat(path).st_mtime_ns))
+        except OSError:
+            files.append((path, None))
+
+    return (context, tuple(files))
+
+
+def _get_credential_expiry(configuration):
+    """
+    When the loaded credentials need to be loaded again. Bearer tokens that
+    are JWTs expire with their `exp` claim, other bearer tokens, e.g. from
+    exec credential plugins, are reused for `KUBE_CONFIG_TOKEN_TTL_SECONDS`.
+    Client certificates do not expire while the kubeconfig is unchanged.
+    :return: The expiry as a timestamp, None if it does not expire.
+    """
+    token = (configuration.api_key or {}).get("authorization")
+    if not token:
+        return None
+
+    token = token.split(" ")[-1]
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return int(claims["exp"]) - KUBE_CONFIG_REFRESH_MARGIN_SECONDS
+    except Exception:
+        return time.time() + KUBE_CONFIG_TOKEN_TTL_SECONDS
+
+
+def _load_kube_config(context=None):
+    from kubernetes import config as kconfig
+
     #
     # Python Kubernetes Library does not handle cases where the KUBECONFIG
     # environment variable can have multiple
@@ -1333,6 +1839,8 @@ def get_config_from_template(template_file, cluster_object):
     """
     Get kubernetes config from template using environment variables.
     """
+    from jinja2 import Template as JinjaTemplate
+
     with open(template_file, "r") as f:
         template = f.read()
         return JinjaTemplate(template).render(model=cluster_object)
@@ -1353,6 +1861,8 @@ def parse_cert_files(
     """
     parses certificate and private key files and returns the values.
     """
+    import pem
+
     if not os.path.exists(certificate_public_key_file) or not os.path.isfile(
         certificate_public_key_file
     ):
@@ -616,6 +616,21 @@ def load_arguments(self, _):
             help="Whether or not to exclude system logs from collection. "
             "The default value is False which includes system logs.",
         )
+        arg_context.argument(
+            "concurrency",
+            options_list=["--concurrency"],
+            type=int,
+            help="The maximum number of pods and containers whose logs are "
+            "collected in parallel.",
+        )
+        arg_context.argument(
+            "pod_timeout",
+            options_list=["--pod-timeout"],
+            type=int,
+            default=0,
+            help="The number of seconds to wait for the logs of a single pod "
+            "to be collected. The default value is 0 which is unlimited",
+        )
         arg_context.argument(
             "use_k8s",
             options_list=["--use-k8s"],
@@ -679,6 +694,13 @@ def load_arguments(self, _):
             help="Force create output file. Overwrites any existing file at "
             "the same path.",
         )
+        arg_context.argument(
+            "concurrency",
+            options_list=["--concurrency"],
+            type=int,
+            help="The maximum number of log data files downloaded in "
+            "parallel.",
+        )
         arg_context.argument(
             "use_k8s",
             options_list=["--use-k8s"],
@@ -694,6 +716,13 @@ def load_arguments(self, _):
             help="The full or relative path including the file name of the "
             "file to be uploaded.",
         )
+        arg_context.argument(
+            "concurrency",
+            options_list=["--concurrency"],
+            type=int,
+            help="The maximum number of parallel uploads of metrics "
+            "resources or log batches.",
+        )
 
     with ArgumentsContext(self, "arcdata resource-kind get") as arg_context:
         arg_context.argument(
@@ -4,11 +4,13 @@
 # license information.
 # ------------------------------------------------------------------------------
 
-from azext_arcdata.core.cli_client import beget
+from azext_arcdata.core.client_factory import lazy_beget
 from azure.cli.core.commands import CliCommandType
 
 import azext_arcdata.dc.validators as validators
 
+beget = lazy_beget("azext_arcdata.core.cli_client#beget")
+
 
 def load_commands(self, _):
     operations = CliCommandType(operations_tmpl="azext_arcdata.dc.custom#{}")
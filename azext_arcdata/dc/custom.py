@@ -455,6 +455,8 @@ def dc_debug_copy_logs(
     skip_compress=False,
     exclude_dumps=False,
     exclude_system_logs=False,
+    concurrency=None,
+    pod_timeout=0,
     use_k8s=None,  # not used
 ):
     """
@@ -472,6 +474,8 @@ def dc_debug_copy_logs(
             skip_compress=skip_compress,
             exclude_dumps=exclude_dumps,
             exclude_system_logs=exclude_system_logs,
+            concurrency=concurrency,
+            pod_timeout=pod_timeout,
         )
     except Exception as e:
         raise CLIError(e)
@@ -496,7 +500,15 @@ def dc_debug_dump(
         raise CLIError(e)
 
 
-def dc_export(client, export_type, path, namespace, force=None, use_k8s=None):
+def dc_export(
+    client,
+    export_type,
+    path,
+    namespace,
+    force=None,
+    use_k8s=None,
+    concurrency=None,
+):
     """
     Export metrics, logs or usage to a file.
     """
@@ -511,7 +523,9 @@ def dc_export(client, export_type, path, namespace, force=None, use_k8s=None):
 
         path = check_prompt_export_output_file(path, force)
 
-        client.services.dc.export(namespace, export_type, path)
+        client.services.dc.export(
+            namespace, export_type, path, concurrency=concurrency
+        )
     except NoTTYException:
         raise CLIError("Please specify `--force` in non-interactive mode.")
     except Exception as e:
@@ -578,7 +592,7 @@ def arc_resource_kind_get(client, kind, dest="template"):
         raise CLIError(e)
 
 
-def dc_upload(client, path):
+def dc_upload(client, path, concurrency=None):
     """
     Upload data file exported from a data controller to Azure (indirect only).
     """
@@ -52,6 +52,10 @@ class HTTPCodes(object):
     def conflict(self):
         return 409
 
+    @property
+    def gone(self):
+        return 410
+
     # -- Server Errors --
     @property
     def bad_gateway(self):
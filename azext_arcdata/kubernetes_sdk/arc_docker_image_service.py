@@ -1,13 +1,19 @@
 import base64
 import json
+import os
 import re
 import sys
+import threading
 from typing import Tuple
+from urllib.parse import urljoin
 from azext_arcdata.core.constants import PUBLIC_DOCKER_REGISTRY
+from azext_arcdata.core.http_session import get_session
+from azext_arcdata.dc.util import get_config_file_path
 
 import pydash as _
 import requests
 from azext_arcdata.kubernetes_sdk.client import KubernetesClient
+from azext_arcdata.kubernetes_sdk.client_pool import get_api_client
 from knack.log import get_logger
 from requests.structures import CaseInsensitiveDict
 
@@ -19,8 +25,26 @@ VERSION_REGEX = (
 Regex defining the format of the version tag
 """
 
+VERSION_PATTERN = re.compile(VERSION_REGEX)
+"""
+Compiled `VERSION_REGEX`
+"""
+
+REGISTRY_TAGS_PAGE_SIZE = 1000
+"""
+Number of tags requested per page from the registry tags/list API
+"""
+
+IMAGE_VERSIONS_CACHE_FILENAME = "image-versions-cache.json"
+"""
+Name of the file caching the image versions of each registry/repository
+"""
+
 logger = get_logger(__name__)
 
+_versions_cache = None
+_versions_cache_lock = threading.Lock()
+
 
 class ArcDataImageService:
     @staticmethod
@@ -97,25 +121,131 @@ class ArcDataImageService:
     def get_available_image_versions_from_registry(
         registry, repository, auth_header=[]
     ):
-        response = requests.get(
-            "https://{0}/v2/{1}/arc-controller/tags/list?n=10000".format(
-                registry, repository
-            ),
-            headers=auth_header,
-        )
+        """
+        Returns the image versions of the registry/repository, latest version
+        first. The sorted versions are cached on disk per registry/repository
+        and, when the registry returned them in a single page, revalidated
+        with the ETag of that page. The cached versions are returned when the
+        registry cannot be reached or fails.
+        """
+        key = "{0}/{1}".format(registry, repository).lower()
+        cached = ArcDataImageService._load_versions_cache().get(key)
 
-        if response.status_code != 200:
-            raise Exception(response.raw)
+        try:
+            result = ArcDataImageService._get_registry_tags(
+                registry,
+                repository,
+                auth_header,
+                etag=cached.get("etag") if cached else None,
+            )
+        except requests.RequestException as e:
+            if not cached:
+                raise
+            logger.warning(
+                "Unable to get the image versions from the docker registry "
+                "{0}, using the cached image versions: {1}".format(registry, e)
+            )
+            return list(cached["versions"])
 
-        tags = _.chain(json.loads(response.text)["tags"]).value()
+        if result is None:
+            logger.debug("Image versions of %s are unchanged.", key)
+            return list(cached["versions"])
 
+        tags, etag = result
         if len(tags) == 0:
             raise Exception(
                 "Could not find any valid versions in {0}/{1}".format(
                     registry, repository
                 )
             )
-        return ArcDataImageService.resolve_valid_image_versions(tags)
+
+        versions = ArcDataImageService.resolve_valid_image_versions(tags)
+        ArcDataImageService._save_versions_cache(
+            key, {"etag": etag, "versions": versions}
+        )
+        return list(versions)
+
+    @staticmethod
+    def _get_registry_tags(registry, repository, auth_header, etag=None):
+        """
+        Get every tag of the arc-controller image, following the `Link`
+        pagination of the registry. A later page can change without the
+        first one changing, so only a single, partial page is revalidated.
+        :return: The tags and the ETag to revalidate them with, which is None
+        when the tags span several pages. None if the page still matches
+        `etag`.
+        """
+        url = "https://{0}/v2/{1}/arc-controller/tags/list?n={2}".format(
+            registry, repository, REGISTRY_TAGS_PAGE_SIZE
+        )
+        session = get_session(url)
+        headers = dict(auth_header or {})
+        if etag:
+            headers["If-None-Match"] = etag
+
+        tags = []
+        pages = 0
+        page_etag = None
+        while url:
+            response = session.get(url, headers=headers)
+
+            if response.status_code == 304:
+                return None
+
+            if response.status_code != 200:
+                raise requests.HTTPError(
+                    "{0} {1} from {2}".format(
+                        response.status_code, response.reason, url
+                    ),
+                    response=response,
+                )
+
+            headers.pop("If-None-Match", None)
+            pages += 1
+            page_etag = response.headers.get("ETag")
+            tags.extend(response.json().get("tags") or [])
+
+            next_link = response.links.get("next", {}).get("url")
+            url = urljoin(url, next_link) if next_link else None
+
+        if pages > 1 or len(tags) >= REGISTRY_TAGS_PAGE_SIZE:
+            page_etag = None
+
+        return tags, page_etag
+
+    @staticmethod
+    def _load_versions_cache():
+        global _versions_cache
+
+        with _versions_cache_lock:
+            if _versions_cache is None:
+                _versions_cache = {}
+                try:
+                    cache_file = get_config_file_path(
+                        IMAGE_VERSIONS_CACHE_FILENAME
+                    )
+                    if os.path.exists(cache_file):
+                        with open(cache_file, "r") as f:
+                            _versions_cache = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.debug("Ignoring unreadable image versions: %s", e)
+
+            return _versions_cache
+
+    @staticmethod
+    def _save_versions_cache(key, entry):
+        cache = ArcDataImageService._load_versions_cache()
+
+        with _versions_cache_lock:
+            cache[key] = entry
+            try:
+                cache_file = get_config_file_path(IMAGE_VERSIONS_CACHE_FILENAME)
+                temp_file = "{0}.{1}.tmp".format(cache_file, os.getpid())
+                with open(temp_file, "w") as f:
+                    json.dump(cache, f)
+                os.replace(temp_file, cache_file)
+            except OSError as e:
+                logger.debug("Unable to cache image versions: %s", e)
 
     @staticmethod
     def resolve_valid_image_versions(tags: list) -> list:
@@ -123,13 +253,25 @@ class ArcDataImageService:
         Removes image tags that do not represent versions, sorts by latest
         version first
         """
-        versions = (
-            _.chain(tags).filter(ArcDataImageService.validate_image_tag).value()
-        )
-        return _.sort(
-            versions,
-            comparator=ArcDataImageService.compare_version_tag,
-            reverse=True,
+        keys = {}
+        for tag in tags:
+            match = VERSION_PATTERN.match(tag)
+            if match is not None:
+                keys[tag] = ArcDataImageService._version_sort_key(match)
+
+        return sorted(keys, key=keys.get, reverse=True)
+
+    @staticmethod
+    def _version_sort_key(match):
+        """
+        Sortable key of a matched version tag, missing segments sort first.
+        """
+        patch = match.group("patch")
+        return (
+            int(match.group("major")),
+            int(match.group("minor")),
+            -1 if patch is None else int(patch),
+            match.group("label") or "",
         )
 
     @staticmethod
@@ -148,7 +290,7 @@ class ArcDataImageService:
 
     @staticmethod
     def validate_image_tag(tag) -> bool:
-        return re.match(VERSION_REGEX, tag) is not None
+        return VERSION_PATTERN.match(tag) is not None
 
     @staticmethod
     def parse_image_tag(tag) -> Tuple[int, int, int, str]:
@@ -167,7 +309,7 @@ class ArcDataImageService:
                 return None
 
         try:
-            version_groups = re.search(VERSION_REGEX, tag)
+            version_groups = VERSION_PATTERN.search(tag)
             return (
                 int_or_empty(version_groups.group("major")),
                 int_or_empty(version_groups.group("minor")),
@@ -197,7 +339,9 @@ class ArcDataImageService:
     @staticmethod
     def get_docker_secret(namespace, use_k8s=True):
         try:
-            client = KubernetesClient.resolve_k8s_client().CoreV1Api()
+            client = KubernetesClient.resolve_k8s_client().CoreV1Api(
+                get_api_client()
+            )
             secret = client.read_namespaced_secret(
                 "arc-private-registry", namespace
             )
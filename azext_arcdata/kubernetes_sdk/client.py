@@ -14,6 +14,8 @@ from azext_arcdata.kubernetes_sdk.models.custom_resource_definition import (
     CustomResourceDefinition,
 )
 from azext_arcdata.kubernetes_sdk.HttpCodes import http_status_codes
+from azext_arcdata.kubernetes_sdk.crd_cache import crd_discovery_cache
+from azext_arcdata.kubernetes_sdk.client_pool import get_api_client
 from azext_arcdata.core.util import (
     check_and_set_kubectl_context,
     retry,
@@ -34,7 +36,6 @@ from kubernetes.client.rest import ApiException as K8sApiException
 
 from knack.log import get_logger
 from functools import wraps
-from pydash.utilities import memoize
 from urllib3.exceptions import NewConnectionError, MaxRetryError
 
 import json
@@ -44,6 +45,7 @@ CONNECTION_RETRY_ATTEMPTS = 12
 DELETE_CLUSTER_TIMEOUT_SECONDS = 300
 RETRY_INTERVAL = 5
 UPDATE_INTERVAL = (15 * 60) / RETRY_INTERVAL
+CUSTOM_OBJECT_PAGE_SIZE = 500
 
 logger = get_logger(__name__)
 
@@ -90,9 +92,8 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            return k8sClient.CoreV1Api().read_namespaced_service(
-                service_name, ns
-            )
+            api = k8sClient.CoreV1Api(get_api_client())
+            return api.read_namespaced_service(service_name, ns)
         except K8sApiException as e:
             logger.debug(e.body)
             raise
@@ -106,9 +107,8 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            service = k8sClient.CoreV1Api().read_namespaced_service(
-                service_name, ns
-            )
+            api = k8sClient.CoreV1Api(get_api_client())
+            service = api.read_namespaced_service(service_name, ns)
             return service_name == service.metadata.name
         except K8sApiException as e:
             logger.debug(e.body)
@@ -124,24 +124,32 @@ class KubernetesClient(object):
         """
         try:
             service = KubernetesClient.get_service(ns, service_name)
-
-            if service.spec.type == "LoadBalancer":
-                # Make sure that the load balancer has at least one host listed
-                #
-                ingress = service.status.load_balancer.ingress
-                if ingress is not None and len(ingress) > 0:
-                    for svc in ingress:
-                        if svc.ip or svc.hostname:
-                            return True
-            elif service.spec.type == "NodePort":
-                # No additional checks are required for NodePorts
-                #
-                return True
-
-            return False
+            return KubernetesClient.is_service_ready(service)
         except K8sApiException as e:
             return False
 
+    @staticmethod
+    def is_service_ready(service):
+        """
+        Check if the given service is ready
+        :param service:
+        :return:
+        """
+        if service.spec.type == "LoadBalancer":
+            # Make sure that the load balancer has at least one host listed
+            #
+            ingress = service.status.load_balancer.ingress
+            if ingress is not None and len(ingress) > 0:
+                for svc in ingress:
+                    if svc.ip or svc.hostname:
+                        return True
+        elif service.spec.type == "NodePort":
+            # No additional checks are required for NodePorts
+            #
+            return True
+
+        return False
+
     @staticmethod
     def get_service_endpoint(
         ns: str, service: any, force_ip: bool = False, app: str = "controller"
@@ -205,7 +213,7 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            return k8sClient.CoreV1Api().list_namespaced_pod(
+            return k8sClient.CoreV1Api(get_api_client()).list_namespaced_pod(
                 ns, label_selector=label_selector
             )
         except K8sApiException as e:
@@ -220,7 +228,7 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            return k8sClient.CoreV1Api().list_node(
+            return k8sClient.CoreV1Api(get_api_client()).list_node(
                 label_selector=label_selector
             )
         except K8sApiException as e:
@@ -237,6 +245,15 @@ class KubernetesClient(object):
         """
         selector = "app=%s" % app_label
         pods = KubernetesClient.list_pods(ns, selector).items
+        return KubernetesClient.pods_are_running(pods)
+
+    @staticmethod
+    def pods_are_running(pods):
+        """
+        Returns true if there are pods and all of them are in a Running state
+        :param pods:
+        :return:
+        """
         return (
             pods
             and len(pods) > 0
@@ -256,7 +273,7 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            k8sClient.CoreV1Api().create_namespaced_secret(
+            k8sClient.CoreV1Api(get_api_client()).create_namespaced_secret(
                 namespace=ns, body=config
             )
         except K8sApiException as e:
@@ -272,9 +289,8 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            secret = k8sClient.CoreV1Api().read_namespaced_secret(
-                secret_name, ns
-            )
+            api = k8sClient.CoreV1Api(get_api_client())
+            secret = api.read_namespaced_secret(secret_name, ns)
             return secret_name == secret.metadata.name
         except K8sApiException as e:
             logger.debug(e.body)
@@ -289,7 +305,8 @@ class KubernetesClient(object):
         :return: V1Secret
         """
         try:
-            return k8sClient.CoreV1Api().read_namespaced_secret(secret_name, ns)
+            api = k8sClient.CoreV1Api(get_api_client())
+            return api.read_namespaced_secret(secret_name, ns)
         except K8sApiException as e:
             logger.debug(e.body)
             raise
@@ -303,9 +320,8 @@ class KubernetesClient(object):
         false otherwise
         """
         try:
-            storage_class = k8sClient.StorageV1Api().read_storage_class(
-                class_name
-            )
+            api = k8sClient.StorageV1Api(get_api_client())
+            storage_class = api.read_storage_class(class_name)
             return storage_class and storage_class.metadata.name == class_name
         except K8sApiException as e:
             logger.debug(e.body)
@@ -321,7 +337,8 @@ class KubernetesClient(object):
         :return: The patched secret
         """
         try:
-            return k8sClient.CoreV1Api().patch_namespaced_secret(
+            api = k8sClient.CoreV1Api(get_api_client())
+            return api.patch_namespaced_secret(
                 namespace=ns, name=secret_name, body=body
             )
         except K8sApiException as e:
@@ -337,7 +354,8 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            k8sClient.AppsV1Api().create_namespaced_replica_set(ns, spec)
+            api = k8sClient.AppsV1Api(get_api_client())
+            api.create_namespaced_replica_set(ns, spec)
         except K8sApiException as e:
             logger.debug(e.body)
             raise e
@@ -351,9 +369,8 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            replica_set = k8sClient.AppsV1Api().read_namespaced_replica_set(
-                replica_set_name, ns
-            )
+            api = k8sClient.AppsV1Api(get_api_client())
+            replica_set = api.read_namespaced_replica_set(replica_set_name, ns)
             return replica_set_name == replica_set.metadata.name
         except K8sApiException as e:
             logger.debug(e.body)
@@ -368,7 +385,8 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            k8sClient.CoreV1Api().create_namespaced_service_account(ns, spec)
+            api = k8sClient.CoreV1Api(get_api_client())
+            api.create_namespaced_service_account(ns, spec)
         except K8sApiException as e:
             logger.debug(e.body)
             raise e
@@ -382,10 +400,9 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            service_account = (
-                k8sClient.CoreV1Api().read_namespaced_service_account(
-                    service_account_name, ns
-                )
+            api = k8sClient.CoreV1Api(get_api_client())
+            service_account = api.read_namespaced_service_account(
+                service_account_name, ns
             )
             return service_account_name == service_account.metadata.name
         except K8sApiException as e:
@@ -401,7 +418,8 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            k8sClient.RbacAuthorizationV1Api().create_namespaced_role(ns, spec)
+            api = k8sClient.RbacAuthorizationV1Api(get_api_client())
+            api.create_namespaced_role(ns, spec)
         except K8sApiException as e:
             logger.debug(e.body)
             raise e
@@ -415,7 +433,8 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            k8sClient.BatchV1Api().create_namespaced_job(ns, spec)
+            api = k8sClient.BatchV1Api(get_api_client())
+            api.create_namespaced_job(ns, spec)
         except K8sApiException as e:
             logger.debug(e.body)
             raise e
@@ -429,9 +448,8 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            role = k8sClient.RbacAuthorizationV1Api().read_namespaced_role(
-                role_name, ns
-            )
+            api = k8sClient.RbacAuthorizationV1Api(get_api_client())
+            role = api.read_namespaced_role(role_name, ns)
             return role_name == role.metadata.name
         except K8sApiException as e:
             logger.debug(e.body)
@@ -446,9 +464,8 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            k8sClient.RbacAuthorizationV1Api().create_namespaced_role_binding(
-                ns, spec
-            )
+            api = k8sClient.RbacAuthorizationV1Api(get_api_client())
+            api.create_namespaced_role_binding(ns, spec)
         except K8sApiException as e:
             logger.debug(e.body)
             raise e
@@ -460,9 +477,8 @@ class KubernetesClient(object):
         :param spec: the mutating webhook configuration spec as a dict
         """
         try:
-            k8sClient.AdmissionregistrationV1beta1Api().create_mutating_webhook_configuration(
-                spec
-            )
+            api = k8sClient.AdmissionregistrationV1beta1Api(get_api_client())
+            api.create_mutating_webhook_configuration(spec)
         except K8sApiException as e:
             logger.debug(e.body)
             raise e
@@ -473,7 +489,8 @@ class KubernetesClient(object):
         Retrieve the requested config map
         """
         try:
-            config_map = k8sClient.CoreV1Api().read_namespaced_config_map(
+            api = k8sClient.CoreV1Api(get_api_client())
+            config_map = api.read_namespaced_config_map(
                 config_map_name, cluster_name
             )
             return config_map
@@ -490,10 +507,9 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            role_binding = (
-                k8sClient.RbacAuthorizationV1Api().read_namespaced_role_binding(
-                    role_binding_name, ns
-                )
+            api = k8sClient.RbacAuthorizationV1Api(get_api_client())
+            role_binding = api.read_namespaced_role_binding(
+                role_binding_name, ns
             )
             return role_binding_name == role_binding.metadata.name
         except K8sApiException as e:
@@ -514,7 +530,7 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            api = k8sClient.ApiextensionsV1Api()
+            api = k8sClient.ApiextensionsV1Api(get_api_client())
             crds = api.list_custom_resource_definition().to_dict()["items"]
             existing = list(
                 filter(
@@ -539,6 +555,11 @@ class KubernetesClient(object):
                 raise
             else:
                 raise KubernetesError(e)
+        finally:
+            # After the write, so that a concurrent read does not cache the
+            # CRD it replaces
+            #
+            KubernetesClient.invalidate_crd_cache(crd.name)
 
     @staticmethod
     def delete_custom_resource_definition(crd: CustomResourceDefinition):
@@ -548,7 +569,7 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            api = k8sClient.ApiextensionsV1Api()
+            api = k8sClient.ApiextensionsV1Api(get_api_client())
             current_crds = [
                 x["spec"]["names"]["kind"].lower()
                 for x in api.list_custom_resource_definition().to_dict()[
@@ -572,6 +593,8 @@ class KubernetesClient(object):
                 raise e
         except Exception as e:
             raise KubernetesError(e)
+        finally:
+            KubernetesClient.invalidate_crd_cache(crd.name)
 
     @staticmethod
     @catch_admission_responses
@@ -587,7 +610,7 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            api = k8sClient.CustomObjectsApi()
+            api = k8sClient.CustomObjectsApi(get_api_client())
             return api.create_namespaced_custom_object(
                 body=cr.encode(),
                 namespace=cr.metadata.namespace,
@@ -619,7 +642,7 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            api = k8sClient.CustomObjectsApi()
+            api = k8sClient.CustomObjectsApi(get_api_client())
             return api.create_namespaced_custom_object(
                 body=body,
                 namespace=cr.metadata.namespace,
@@ -651,7 +674,7 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            api = k8sClient.CustomObjectsApi()
+            api = k8sClient.CustomObjectsApi(get_api_client())
             return api.patch_namespaced_custom_object(
                 body=cr.encode(),
                 group=cr.group,
@@ -714,7 +737,7 @@ class KubernetesClient(object):
             version = cr.version
 
         try:
-            api = k8sClient.CustomObjectsApi()
+            api = k8sClient.CustomObjectsApi(get_api_client())
             return api.patch_namespaced_custom_object(
                 body=body,
                 name=name,
@@ -738,7 +761,7 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            api = k8sClient.CustomObjectsApi()
+            api = k8sClient.CustomObjectsApi(get_api_client())
             return api.replace_namespaced_custom_object(
                 body=cr.encode(),
                 namespace=cr.metadata.namespace,
@@ -760,7 +783,8 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            k8sClient.CoreV1Api().patch_namespace(name=ns_name, body=patch)
+            api = k8sClient.CoreV1Api(get_api_client())
+            api.patch_namespace(name=ns_name, body=patch)
         except Exception as e:
             raise KubernetesError(e)
 
@@ -796,7 +820,7 @@ class KubernetesClient(object):
             )
 
         try:
-            api = k8sClient.CustomObjectsApi()
+            api = k8sClient.CustomObjectsApi(get_api_client())
             return api.delete_namespaced_custom_object(
                 group=group,
                 version=version,
@@ -829,7 +853,7 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            api = k8sClient.CustomObjectsApi()
+            api = k8sClient.CustomObjectsApi(get_api_client())
 
             if crd:
                 group = crd.group
@@ -891,7 +915,8 @@ class KubernetesClient(object):
         :return: True if the volume exists in namespace, False otherwise
         """
         try:
-            k8sClient.CoreV1Api().read_namespaced_persistent_volume_claim(
+            api = k8sClient.CoreV1Api(get_api_client())
+            api.read_namespaced_persistent_volume_claim(
                 name=name, namespace=namespace
             )
             return True
@@ -919,7 +944,7 @@ class KubernetesClient(object):
         :return:
         """
         try:
-            api = k8sClient.CustomObjectsApi()
+            api = k8sClient.CustomObjectsApi(get_api_client())
 
             if crd:
                 group = crd.group
@@ -942,6 +967,66 @@ class KubernetesClient(object):
             logger.debug(e.body)
             raise e
 
+    @staticmethod
+    def list_custom_object_pages(
+        namespace: str = None,
+        crd: CustomResourceDefinition = None,
+        group: str = None,
+        version: str = None,
+        plural: str = None,
+        all_namespaces: bool = False,
+        limit: int = CUSTOM_OBJECT_PAGE_SIZE,
+    ):
+        """
+        Lists the custom resource objects one page at a time, so that large
+        lists are neither held in memory at once nor fetched in one request.
+        :param namespace: The namespace of the custom resources.
+        :param crd: The definition of the custom resource.
+        :param group: The API version group.
+        :param version: The kubernetes custom resource api version.
+        :param plural: The plural name of the custom resource definition.
+        :param all_namespaces: List the custom resources of every namespace
+        instead.
+        :param limit: The maximum number of objects per page.
+        :return: A generator of the raw `items` of each page.
+        """
+        if crd:
+            group = crd.group
+            version = crd.stored_version
+            plural = crd.plural
+        elif not group or not version or not plural:
+            raise ValueError(
+                "Please specify either a valid CRD or the group, version, "
+                "and plural."
+            )
+
+        api = k8sClient.CustomObjectsApi(get_api_client())
+        kwargs = {"group": group, "version": version, "plural": plural}
+        if limit:
+            kwargs["limit"] = limit
+
+        token = None
+        while True:
+            if token:
+                kwargs["_continue"] = token
+
+            try:
+                if all_namespaces:
+                    response = api.list_cluster_custom_object(**kwargs)
+                else:
+                    response = api.list_namespaced_custom_object(
+                        namespace=namespace, **kwargs
+                    )
+            except K8sApiException as e:
+                logger.debug(e.body)
+                raise e
+
+            yield response.get("items") or []
+
+            token = (response.get("metadata") or {}).get("continue")
+            if not token:
+                break
+
     @staticmethod
     def resolve_k8s_client() -> k8sClient:
         check_and_set_kubectl_context()
@@ -974,7 +1059,9 @@ class KubernetesClient(object):
         """
         try:
             # -- Check Kubectl Context --
-            client = KubernetesClient.resolve_k8s_client().CustomObjectsApi()
+            client = KubernetesClient.resolve_k8s_client().CustomObjectsApi(
+                get_api_client()
+            )
             namespace = namespace
 
             response = retry(
@@ -1012,23 +1099,29 @@ class KubernetesClient(object):
         except Exception:
             raise
 
-    @memoize
-    def _get_crd():
-        client = KubernetesClient.resolve_k8s_client().ApiextensionsV1Api()
-        crds = client.list_custom_resource_definition()
-        return crds
-
     @staticmethod
     def get_crd(
         crd_name="datacontrollers.arcdata.microsoft.com", reset_cache=False
     ):
+        """
+        Get the Custom Resource Definition with the given name, from the CRD
+        discovery cache when it holds a fresh copy.
+        :param crd_name: The full name of the CRD.
+        :param reset_cache: Read the CRD from the cluster even when cached.
+        :return: The CRD, None if it does not exist.
+        """
+        KubernetesClient.resolve_k8s_client()
 
-        if reset_cache is True:
-            KubernetesClient._get_crd.cache = {}
+        return crd_discovery_cache.get(crd_name, reset_cache=reset_cache)
 
-        crds = KubernetesClient._get_crd().items
-        crd = _.head(_.filter_(crds, lambda crd: crd.metadata.name == crd_name))
-        return crd
+    @staticmethod
+    def invalidate_crd_cache(crd_name=None):
+        """
+        Drop the cached copy of the given CRD, or of all CRDs of the current
+        cluster when no name is given.
+        :param crd_name: The full name of the CRD.
+        """
+        crd_discovery_cache.invalidate(crd_name)
 
     @staticmethod
     def get_crd_version(
@@ -0,0 +1,90 @@
+# ------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# ------------------------------------------------------------------------------
+
+"""
+Process wide, pooled Kubernetes `ApiClient` instances shared by every API
+object the CLI creates.
+"""
+
+from kubernetes import client as k8sClient
+from knack.log import get_logger
+
+import atexit
+import os
+import threading
+
+__all__ = ["get_api_client", "close_api_clients"]
+
+logger = get_logger(__name__)
+
+K8S_CONNECTION_POOL_MAXSIZE = 32
+"""
+Maximum number of keep-alive connections kept open to the API server.
+"""
+
+_api_clients = {}
+_lock = threading.Lock()
+
+
+def get_api_client(pool_maxsize=None):
+    """
+    Get the shared `ApiClient` for the kube configuration currently loaded as
+    the default. Pass it to the generated API classes, e.g.
+    `CoreV1Api(get_api_client())`, so that their calls reuse the same
+    connection pool instead of opening a new one per API object.
+
+    The client is keyed by kube context, API server and credentials, so that
+    loading another context or refreshed credentials gets a new client.
+    :param pool_maxsize: The maximum number of pooled connections, used when
+    the client is created.
+    :return: The shared `ApiClient`.
+    """
+    configuration = k8sClient.Configuration.get_default_copy()
+    key = _get_client_key(configuration)
+
+    with _lock:
+        api_client = _api_clients.get(key)
+        if api_client is None:
+            configuration.connection_pool_maxsize = (
+                pool_maxsize or K8S_CONNECTION_POOL_MAXSIZE
+            )
+            api_client = k8sClient.ApiClient(configuration)
+            _api_clients[key] = api_client
+            logger.debug(
+                "Created pooled Kubernetes client for %s", configuration.host
+            )
+
+    return api_client
+
+
+@atexit.register
+def close_api_clients():
+    """
+    Close every shared client and release their pooled connections.
+    """
+    with _lock:
+        for api_client in _api_clients.values():
+            api_client.close()
+            api_client.rest_client.pool_manager.clear()
+        _api_clients.clear()
+
+
+def _get_client_key(configuration):
+    context = os.environ.get("KUBECTL_CONTEXT") or ""
+    if os.getenv("KUBERNETES_SERVICE_HOST"):
+        context = "in-cluster"
+
+    return (
+        context,
+        configuration.host,
+        tuple(sorted((configuration.api_key or {}).items())),
+        tuple(sorted((configuration.api_key_prefix or {}).items())),
+        configuration.cert_file,
+        configuration.key_file,
+        configuration.ssl_ca_cert,
+        configuration.verify_ssl,
+        configuration.proxy,
+    )
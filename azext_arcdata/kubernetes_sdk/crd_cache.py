@@ -0,0 +1,253 @@
+# ------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# ------------------------------------------------------------------------------
+
+"""
+On-disk cache of the Custom Resource Definitions resolved by the CLI, shared
+between invocations against the same cluster.
+"""
+
+from azext_arcdata.dc.util import get_config_file_path
+from azext_arcdata.kubernetes_sdk.HttpCodes import http_status_codes
+from azext_arcdata.kubernetes_sdk.client_pool import get_api_client
+from kubernetes import client as k8sClient
+from kubernetes.client.rest import ApiException as K8sApiException
+from knack.log import get_logger
+
+import json
+import os
+import threading
+import time
+
+__all__ = ["CrdDiscoveryCache", "crd_discovery_cache"]
+
+logger = get_logger(__name__)
+
+CRD_CACHE_FILENAME = "crd-cache.json"
+"""
+Name of the CRD discovery cache file in the extension config directory.
+"""
+
+CRD_CACHE_TTL_SECONDS = 10 * 60
+"""
+Age after which a cached CRD is revalidated against the API server.
+"""
+
+
+_METADATA_ACCEPT = (
+    "application/json;as=PartialObjectMetadata;g=meta.k8s.io;v=v1,"
+    "application/json"
+)
+
+
+class _Response(object):
+    """
+    Minimal stand-in for a REST response so that `ApiClient.deserialize` can
+    build models from a cached body.
+    """
+
+    def __init__(self, body):
+        self.data = json.dumps(body)
+
+
+class CrdDiscoveryCache(object):
+    """
+    Caches Custom Resource Definitions by name, per kube context and API
+    server, in memory for the life of the process and on disk across
+    processes. Entries older than `ttl_seconds` are revalidated by reading
+    only the metadata of the CRD: the cached body is kept while its
+    `resourceVersion` is unchanged, the full CRD is read again otherwise.
+    """
+
+    def __init__(self, cache_file=None, ttl_seconds=CRD_CACHE_TTL_SECONDS):
+        self._cache_file = cache_file
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.RLock()
+        self._entries = None
+        self._models = {}
+        self._api_client = None
+
+    def get(self, crd_name, reset_cache=False):
+        """
+        Get the CRD with the given name.
+        :param crd_name: The full name of the CRD, e.g.
+        `datacontrollers.arcdata.microsoft.com`.
+        :param reset_cache: Ignore any cached copy and read the CRD again.
+        :return: The `V1CustomResourceDefinition`, None if it does not exist.
+        """
+        key = self._get_cluster_key()
+
+        with self._lock:
+            if reset_cache:
+                self.invalidate(crd_name)
+
+            model = self._models.get((key, crd_name))
+            if model is not None:
+                return model
+
+            entries = self._load().setdefault(key, {})
+            entry = entries.get(crd_name)
+
+            if entry and time.time() - entry["fetched"] < self._ttl_seconds:
+                body = entry["body"]
+            else:
+                body = self._revalidate(crd_name, entry)
+                if body is None:
+                    if entries.pop(crd_name, None):
+                        self._save()
+                    return None
+
+                entries[crd_name] = {"fetched": time.time(), "body": body}
+                self._save()
+
+            model = self._deserialize(body)
+            self._models[(key, crd_name)] = model
+            return model
+
+    def invalidate(self, crd_name=None):
+        """
+        Drop the cached copy of the given CRD, or of every CRD of the current
+        cluster when no name is given.
+        :param crd_name: The full name of the CRD.
+        """
+        key = self._get_cluster_key()
+
+        with self._lock:
+            entries = self._load().get(key, {})
+            names = [crd_name] if crd_name else list(entries.keys())
+            for name in names:
+                self._models.pop((key, name), None)
+                entries.pop(name, None)
+
+            if not crd_name:
+                self._models = {
+                    k: v for k, v in self._models.items() if k[0] != key
+                }
+
+            self._save()
+
+    @staticmethod
+    def _get_cluster_key():
+        """
+        The cache key of the cluster the default kube configuration points
+        to: the selected context and the API server.
+        """
+        config = k8sClient.Configuration.get_default_copy()
+        context = os.environ.get("KUBECTL_CONTEXT") or ""
+        if os.getenv("KUBERNETES_SERVICE_HOST"):
+            context = "in-cluster"
+
+        return "{}|{}".format(context, config.host)
+
+    @staticmethod
+    def _read(crd_name):
+        """
+        Read a single CRD from the API server as a raw dict.
+        """
+        try:
+            api = k8sClient.ApiextensionsV1Api(get_api_client())
+            response = api.read_custom_resource_definition(
+                crd_name, _preload_content=False
+            )
+            return json.loads(response.data)
+        except K8sApiException as e:
+            if e.status == http_status_codes.not_found:
+                return None
+            raise
+
+    def _revalidate(self, crd_name, entry):
+        """
+        Read the CRD from the API server, unless the cached entry still has
+        its `resourceVersion`.
+        :return: The CRD as a raw dict, None if it does not exist.
+        """
+        if not entry:
+            return self._read(crd_name)
+
+        version = self._read_resource_version(crd_name)
+        if version is None:
+            return None
+        if version == _resource_version(entry["body"]):
+            return entry["body"]
+
+        logger.debug("CRD %s changed since it was cached.", crd_name)
+        return self._read(crd_name)
+
+    @staticmethod
+    def _read_resource_version(crd_name):
+        """
+        Read the `resourceVersion` of a single CRD from the API server,
+        without its schemas. API servers that cannot return the metadata only
+        return the full CRD instead.
+        :return: The resource version, None if the CRD does not exist.
+        """
+        try:
+            api_client = get_api_client()
+            response = api_client.call_api(
+                "/apis/apiextensions.k8s.io/v1/customresourcedefinitions/"
+                "{name}",
+                "GET",
+                path_params={"name": crd_name},
+                header_params={"Accept": _METADATA_ACCEPT},
+                auth_settings=["BearerToken"],
+                _preload_content=False,
+                _return_http_data_only=True,
+            )
+            return _resource_version(json.loads(response.data)) or ""
+        except K8sApiException as e:
+            if e.status == http_status_codes.not_found:
+                return None
+            raise
+
+    def _deserialize(self, body):
+        if self._api_client is None:
+            self._api_client = k8sClient.ApiClient()
+
+        return self._api_client.deserialize(
+            _Response(body), "V1CustomResourceDefinition"
+        )
+
+    def _get_cache_file(self):
+        if self._cache_file is None:
+            self._cache_file = get_config_file_path(CRD_CACHE_FILENAME)
+
+        return self._cache_file
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {}
+            cache_file = self._get_cache_file()
+            try:
+                if os.path.exists(cache_file):
+                    with open(cache_file, "r") as f:
+                        self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.debug("Ignoring unreadable CRD cache: %s", e)
+
+        return self._entries
+
+    def _save(self):
+        """
+        Write the cache atomically so that concurrent invocations never read a
+        partial file.
+        """
+        cache_file = self._get_cache_file()
+        temp_file = "{}.{}.tmp".format(cache_file, os.getpid())
+        try:
+            with open(temp_file, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            logger.debug("Unable to write CRD cache: %s", e)
+
+
+def _resource_version(body):
+    return (body.get("metadata") or {}).get("resourceVersion")
+
+
+crd_discovery_cache = CrdDiscoveryCache()
+"""
+The CRD discovery cache shared by the process.
+"""
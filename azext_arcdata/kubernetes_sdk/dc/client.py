@@ -35,6 +35,7 @@ from azext_arcdata.core.constants import (
     DEFAULT_METRICSUI_CERT_SECRET_NAME,
 )
 from azext_arcdata.core.kubernetes import create_namespace_with_retry
+from azext_arcdata.core.task_graph import TaskGraph
 
 # TODO: Refactor out
 from azext_arcdata.core.prompt import prompt_for_choice, prompt, prompt_pass
@@ -48,9 +49,11 @@ from azext_arcdata.core.util import (
     parse_labels,
     read_config,
     env_vars_are_set,
+    format_retry_stats,
     is_set,
     is_windows,
     retry,
+    retry_deadline,
     retry_method,
     time_ns,
     validate_creds_from_env,
@@ -69,7 +72,6 @@ from azext_arcdata.kubernetes_sdk.dc.common_util import (
     get_kubernetes_infra,
     validate_dc_create_params,
     validate_infrastructure_value,
-    write_file,
     write_output_file,
 )
 from azext_arcdata.kubernetes_sdk.dc.constants import (
@@ -124,6 +126,10 @@ from azext_arcdata.kubernetes_sdk.dc.constants import (
     UPGRADE_BOOTSTRAPPER_TEMPLATES,
     INFRASTRUCTURE_AUTO,
     CRD_SUPPORTED_IMAGE_VERSIONS,
+    EXPORT_DOWNLOAD_CHUNK_SIZE,
+    EXPORT_DOWNLOAD_MAX_WORKERS,
+    DC_CREATE_MAX_WORKERS,
+    DC_CREATE_RETRY_DEADLINE_SECONDS,
 )
 from azext_arcdata.kubernetes_sdk.dc.dc_utilities import (
     patch_data_controller,
@@ -148,6 +154,11 @@ from azext_arcdata.kubernetes_sdk.models.data_controller_custom_resource import
 from azext_arcdata.kubernetes_sdk.models.export_task_custom_resource import (
     ExportTaskCustomResource,
 )
+from azext_arcdata.kubernetes_sdk.client_pool import get_api_client
+from azext_arcdata.kubernetes_sdk.waiter import (
+    CustomObjectWaiter,
+    wait_for_objects,
+)
 from azext_arcdata.kubernetes_sdk.arc_docker_image_service import (
     ArcDataImageService,
 )
@@ -174,7 +185,9 @@ __all__ = ["DataControllerClient"]
 
 CONNECTION_RETRY_ATTEMPTS = 12
 DELETE_CLUSTER_TIMEOUT_SECONDS = 300
+DELETE_CLUSTER_WAIT_SECONDS = 60
 RETRY_INTERVAL = 5
+EXPORT_TASK_FIRST_STATE_TIMEOUT_SECONDS = MAX_POLLING_ATTEMPTS * 20
 UPDATE_INTERVAL = (15 * 60) / RETRY_INTERVAL
 SCRIPT_PATH = os.path.dirname(os.path.realpath(__file__))
 logger = get_logger(__name__)
@@ -451,9 +464,31 @@ class DataControllerClient(object):
             "openshift.io/sa.scc.uid-range": "1000700001/10000",
         }
 
+        # -- attempt to create cluster --
+        stdout("")
+        stdout("Deploying data controller")
+        stdout("")
+        stdout(
+            "NOTE: Data controller creation can take a significant amount "
+            "of time depending on"
+        )
+        stdout(
+            "configuration, network speed, and the number of nodes in the "
+            "cluster."
+        )
+        stdout("")
+
+        # Independent steps run in parallel, each one as soon as the steps it
+        # depends on completed.
+        #
+        graph = TaskGraph(max_workers=DC_CREATE_MAX_WORKERS)
+
         # prepare the namespace
-        create_namespace_with_retry(
-            dc_cr.metadata.namespace, annotations=annotations
+        graph.add(
+            "namespace",
+            lambda: create_namespace_with_retry(
+                dc_cr.metadata.namespace, annotations=annotations
+            ),
         )
 
         crd_files = [
@@ -468,76 +503,135 @@ class DataControllerClient(object):
             DATA_CONTROLLER_CRD,
         ]
 
+        def create_crd(crd):
+            retry(
+                lambda: client.create_or_replace_custom_resource_definition(
+                    crd
+                ),
+                retry_count=CONNECTION_RETRY_ATTEMPTS,
+                retry_delay=RETRY_INTERVAL,
+                retry_method="create custom resource definition",
+                retry_on_exceptions=(
+                    NewConnectionError,
+                    MaxRetryError,
+                    K8sApiException,
+                ),
+            )
+
         # Create the control plane CRD if it doesn't already exist
+        crd_tasks = []
         for crd_file in crd_files:
             with open(crd_file, "r") as stream:
                 temp = yaml.safe_load(stream)
                 crd = CustomResourceDefinition(temp)
-                retry(
-                    lambda: client.create_or_replace_custom_resource_definition(
-                        crd
-                    ),
-                    retry_count=CONNECTION_RETRY_ATTEMPTS,
-                    retry_delay=RETRY_INTERVAL,
-                    retry_method="create custom resource definition",
-                    retry_on_exceptions=(
-                        NewConnectionError,
-                        MaxRetryError,
-                        K8sApiException,
-                    ),
+                crd_tasks.append(
+                    graph.add(
+                        "crd {}".format(crd.name),
+                        lambda crd=crd: create_crd(crd),
+                    )
                 )
 
         # Create cluster role for metricsdc
-        self.create_cluster_role_for_monitoring(dc_cr, namespace)
+        graph.add(
+            "monitoring cluster role",
+            lambda: self.create_cluster_role_for_monitoring(dc_cr, namespace),
+            depends_on=["namespace"],
+        )
 
         # Create cluster role for data controller
-        self.create_cluster_role_for_data_controller(namespace)
-
-        # -- attempt to create cluster --
-        stdout("")
-        stdout("Deploying data controller")
-        stdout("")
-        stdout(
-            "NOTE: Data controller creation can take a significant amount "
-            "of time depending on"
+        graph.add(
+            "data controller cluster role",
+            lambda: self.create_cluster_role_for_data_controller(namespace),
+            depends_on=["namespace"],
         )
-        stdout(
-            "configuration, network speed, and the number of nodes in the "
-            "cluster."
-        )
-        stdout("")
 
+        secret_tasks = []
         if logsui_public_key and logsui_private_key:
-            create_certificate_secret(
-                client,
-                dc_cr.metadata.namespace,
-                DEFAULT_LOGSUI_CERT_SECRET_NAME,
-                logsui_public_key,
-                logsui_private_key,
+            secret_tasks.append(
+                graph.add(
+                    "logsui certificate",
+                    lambda: create_certificate_secret(
+                        client,
+                        dc_cr.metadata.namespace,
+                        DEFAULT_LOGSUI_CERT_SECRET_NAME,
+                        logsui_public_key,
+                        logsui_private_key,
+                    ),
+                    depends_on=["namespace"],
+                )
             )
 
         if metricsui_public_key and metricsui_private_key:
-            create_certificate_secret(
-                client,
-                dc_cr.metadata.namespace,
-                DEFAULT_METRICSUI_CERT_SECRET_NAME,
-                metricsui_public_key,
-                metricsui_private_key,
+            secret_tasks.append(
+                graph.add(
+                    "metricsui certificate",
+                    lambda: create_certificate_secret(
+                        client,
+                        dc_cr.metadata.namespace,
+                        DEFAULT_METRICSUI_CERT_SECRET_NAME,
+                        metricsui_public_key,
+                        metricsui_private_key,
+                    ),
+                    depends_on=["namespace"],
+                )
             )
 
-        self._create_monitoring_secrets(dc_cr)
-        response, deployed_cr = self._dc_create(crd, dc_cr)
+        secret_tasks.append(
+            graph.add(
+                "monitoring secrets",
+                lambda: self._create_monitoring_secrets(dc_cr),
+                depends_on=["namespace"],
+            )
+        )
 
-        self._await_dc_ready(namespace)
+        self._dc_create(
+            graph,
+            crd,
+            dc_cr,
+            bootstrapper_depends_on=crd_tasks
+            + ["monitoring cluster role", "data controller cluster role"],
+            cr_depends_on=secret_tasks,
+        )
+
+        graph.add(
+            "data controller ready",
+            lambda: self._await_dc_ready(namespace, graph.stopped),
+            depends_on=["webhook job"],
+        )
+
+        try:
+            with retry_deadline(DC_CREATE_RETRY_DEADLINE_SECONDS):
+                results = graph.run()
+        finally:
+            logger.info("Data controller deployment phases:")
+            for line in graph.format_timings():
+                logger.info("    %s", line)
+
+            retried = format_retry_stats()
+            if retried:
+                logger.info("Retried calls:")
+                for line in retried:
+                    logger.info("    %s", line)
 
         stdout("Data controller successfully deployed.")
 
-        return deployed_cr
+        return results["data controller"]
 
-    def _dc_create(self, crd: dict, cr: DataControllerCustomResource):
+    def _dc_create(
+        self,
+        graph: TaskGraph,
+        crd: dict,
+        cr: DataControllerCustomResource,
+        bootstrapper_depends_on=None,
+        cr_depends_on=None,
+    ):
         """
-        Create a data controller
+        Add the steps creating a data controller to the deployment graph. The
+        deployed data controller is the result of the `data controller` task
+        and the `webhook job` task completes the deployment.
         """
+        depends_on = ["namespace"] + list(bootstrapper_depends_on or [])
+
         # Set up the private registry if the docker environment variables set
         #
         if (
@@ -546,98 +640,136 @@ class DataControllerClient(object):
             os.environ.get(REGISTRY_USERNAME)
             and os.environ.get(REGISTRY_PASSWORD)
         ):
-            retry(
-                lambda: kubernetes_util.setup_private_registry(
-                    cr.metadata.namespace,
-                    cr.spec.docker.registry,
-                    secret_name=cr.spec.credentials.dockerRegistry,
-                    ignore_conflict=True,
-                ),
-                retry_count=CONNECTION_RETRY_ATTEMPTS,
-                retry_delay=RETRY_INTERVAL,
-                retry_method="set up docker private registry",
-                retry_on_exceptions=(NewConnectionError, MaxRetryError),
+            depends_on.append(
+                graph.add(
+                    "private registry",
+                    lambda: retry(
+                        lambda: kubernetes_util.setup_private_registry(
+                            cr.metadata.namespace,
+                            cr.spec.docker.registry,
+                            secret_name=cr.spec.credentials.dockerRegistry,
+                            ignore_conflict=True,
+                        ),
+                        retry_count=CONNECTION_RETRY_ATTEMPTS,
+                        retry_delay=RETRY_INTERVAL,
+                        retry_method="set up docker private registry",
+                        retry_on_exceptions=(NewConnectionError, MaxRetryError),
+                    ),
+                    depends_on=["namespace"],
+                )
             )
 
         # Create the bootstrapper, if it needs to be created
         #
-        retry(
-            lambda: self.create_bootstrapper(cr),
-            retry_count=CONNECTION_RETRY_ATTEMPTS,
-            retry_delay=RETRY_INTERVAL,
-            retry_method="create bootstrapper",
-            retry_on_exceptions=(
-                NewConnectionError,
-                MaxRetryError,
-                KubernetesError,
+        graph.add(
+            "bootstrapper",
+            lambda: retry(
+                lambda: self.create_bootstrapper(cr),
+                retry_count=CONNECTION_RETRY_ATTEMPTS,
+                retry_delay=RETRY_INTERVAL,
+                retry_method="create bootstrapper",
+                retry_on_exceptions=(
+                    NewConnectionError,
+                    MaxRetryError,
+                    KubernetesError,
+                ),
             ),
+            depends_on=depends_on,
         )
 
-        retry(
-            lambda: self._client.create_namespaced_custom_object(
-                cr=cr, plural=crd.plural, ignore_conflict=True
-            ),
-            retry_count=CONNECTION_RETRY_ATTEMPTS,
-            retry_delay=RETRY_INTERVAL,
-            retry_method="create namespaced custom object",
-            retry_on_exceptions=(
-                NewConnectionError,
-                MaxRetryError,
-                KubernetesError,
+        graph.add(
+            "data controller custom resource",
+            lambda: retry(
+                lambda: self._client.create_namespaced_custom_object(
+                    cr=cr, plural=crd.plural, ignore_conflict=True
+                ),
+                retry_count=CONNECTION_RETRY_ATTEMPTS,
+                retry_delay=RETRY_INTERVAL,
+                retry_method="create namespaced custom object",
+                retry_on_exceptions=(
+                    NewConnectionError,
+                    MaxRetryError,
+                    KubernetesError,
+                ),
             ),
+            depends_on=["bootstrapper"] + list(cr_depends_on or []),
         )
 
-        i = 0
-
         # Check if the external controller service exists
         #
-        while not retry(
-            lambda: self._client.service_ready(
-                cr.metadata.namespace, CONTROLLER_SVC
+        graph.add(
+            "controller service",
+            lambda: wait_for_objects(
+                k8sClient.CoreV1Api(get_api_client()).list_namespaced_service,
+                lambda services: any(
+                    KubernetesClient.is_service_ready(svc) for svc in services
+                ),
+                description="data controller service to be ready",
+                stop_event=graph.stopped,
+                namespace=cr.metadata.namespace,
+                field_selector="metadata.name={}".format(CONTROLLER_SVC),
             ),
-            retry_count=CONNECTION_RETRY_ATTEMPTS,
-            retry_delay=RETRY_INTERVAL,
-            retry_method="service ready",
-            retry_on_exceptions=(NewConnectionError, MaxRetryError),
-        ):
-            # Log to console once every 5 minutes if controller service is
-            # not ready
-            #
-            if i != 0 and i % 60 == 0:
-                display(
-                    "Waiting for data controller service to be ready after %d "
-                    "minutes." % ((i * RETRY_INTERVAL) / 60)
-                )
-
-            time.sleep(RETRY_INTERVAL)
-            i = i + 1
+            depends_on=["data controller custom resource"],
+        )
 
         # Check if controller is running
         #
-        while not retry(
-            lambda: self._client.pod_is_running(
-                cr.metadata.namespace, CONTROLLER_LABEL
+        graph.add(
+            "controller pods",
+            lambda: wait_for_objects(
+                k8sClient.CoreV1Api(get_api_client()).list_namespaced_pod,
+                KubernetesClient.pods_are_running,
+                description="data controller to be running",
+                stop_event=graph.stopped,
+                namespace=cr.metadata.namespace,
+                label_selector="app={}".format(CONTROLLER_LABEL),
             ),
-            retry_count=CONNECTION_RETRY_ATTEMPTS,
-            retry_delay=RETRY_INTERVAL,
-            retry_method="pod is running",
-            retry_on_exceptions=(
-                NewConnectionError,
-                MaxRetryError,
-                K8sApiException,
+            depends_on=["data controller custom resource"],
+        )
+
+        graph.add(
+            "controller endpoint",
+            lambda: self._display_controller_endpoint(cr),
+            depends_on=["controller service", "controller pods"],
+        )
+
+        graph.add(
+            "data controller",
+            lambda: CustomResource.decode(
+                DataControllerCustomResource,
+                retry(
+                    lambda: self._client.get_namespaced_custom_object(
+                        cr.metadata.name,
+                        cr.metadata.namespace,
+                        group=ARC_GROUP,
+                        version=KubernetesClient.get_crd_version(
+                            DATA_CONTROLLER_CRD_NAME
+                        ),
+                        plural=DATA_CONTROLLER_PLURAL,
+                    ),
+                    retry_count=CONNECTION_RETRY_ATTEMPTS,
+                    retry_delay=RETRY_INTERVAL,
+                    retry_method="get namespaced custom object",
+                    retry_on_exceptions=(
+                        NewConnectionError,
+                        MaxRetryError,
+                        KubernetesError,
+                    ),
+                ),
             ),
-        ):
-            # Log to console once every 5 minutes if controller is not running
-            #
-            if i != 0 and i % 60 == 0:
-                display(
-                    "Waiting for data controller to be running after %d "
-                    "minutes." % ((i * RETRY_INTERVAL) / 60)
-                )
+            depends_on=["controller pods"],
+        )
 
-            time.sleep(RETRY_INTERVAL)
-            i = i + 1
+        graph.add(
+            "webhook job",
+            lambda: self._create_webhook_job(graph.results["data controller"]),
+            depends_on=["data controller"],
+        )
 
+    def _display_controller_endpoint(self, cr: DataControllerCustomResource):
+        """
+        Display the endpoint of the controller service.
+        """
         service = retry(
             lambda: self._client.get_service(
                 cr.metadata.namespace, CONTROLLER_SVC
@@ -689,38 +821,32 @@ class DataControllerClient(object):
             "Data controller endpoint is available at {}".format(endpoint_str)
         )
 
-        response = retry(
-            lambda: self._client.get_namespaced_custom_object(
-                cr.metadata.name,
-                cr.metadata.namespace,
-                group=ARC_GROUP,
-                version=KubernetesClient.get_crd_version(
-                    DATA_CONTROLLER_CRD_NAME
-                ),
-                plural=DATA_CONTROLLER_PLURAL,
+    def _await_dc_ready(self, namespace, stop_event=None):
+        (cr, config) = self._client.get_arc_datacontroller(namespace)
+
+        CustomObjectWaiter(
+            namespace,
+            ARC_GROUP,
+            KubernetesClient.get_crd_version(DATA_CONTROLLER_CRD_NAME),
+            DATA_CONTROLLER_PLURAL,
+            on_state=lambda name, state, obj: logger.info(
+                "Data controller is %s.", state
             ),
-            retry_count=CONNECTION_RETRY_ATTEMPTS,
-            retry_delay=RETRY_INTERVAL,
-            retry_method="get namespaced custom object",
-            retry_on_exceptions=(
-                NewConnectionError,
-                MaxRetryError,
-                KubernetesError,
+            stop_event=stop_event,
+        ).wait(
+            cr.metadata.name,
+            lambda obj: self._is_dc_cr_ready(
+                CustomResource.decode(DataControllerCustomResource, obj)
             ),
         )
 
-        deployed_cr = CustomResource.decode(
-            DataControllerCustomResource, response
-        )
-
-        self._create_webhook_job(deployed_cr)
-
-        return response, deployed_cr
+    @staticmethod
+    def _is_dc_cr_ready(cr):
+        if str(cr.metadata.generation) != str(cr.status.observed_generation):
+            return False
 
-    def _await_dc_ready(self, namespace):
-        while not self.is_dc_ready(namespace):
-            time.sleep(5)
-            logger.info("Data controller is not ready yet.")
+        state = cr.status.state
+        return bool(state) and state.lower().capitalize().strip() == "Ready"
 
     def _setup_env_vars(self) -> None:
         """
@@ -1059,9 +1185,11 @@ class DataControllerClient(object):
     # DC Export
     # ------------------------------------------------------------------------ #
 
-    def export(self, namespace, export_type, path):
+    def export(self, namespace, export_type, path, concurrency=None):
         """
         Export metrics, logs or usage to a file.
+        :param concurrency: The maximum number of log data files downloaded
+        in parallel.
         """
         from datetime import datetime, timedelta
 
@@ -1260,30 +1388,14 @@ class DataControllerClient(object):
                         "and the instances have metrics."
                     )
         elif export_type.lower() == ExportType.logs.value:
-            file_index = 0
-            data_files = []
-            for data_file_path in index_file_json["dataFilePathList"]:
-                file = retry(
-                    self.get_export_file_path,
-                    data_file_path,
-                    controller_endpoint,
-                    retry_count=CONNECTION_RETRY_ATTEMPTS,
-                    retry_delay=RETRY_INTERVAL,
-                    retry_method="download data file",
-                    retry_on_exceptions=(NewConnectionError, MaxRetryError),
-                )
-
-                if file:
-                    data = file
-                    file_path = generate_export_file_name(path, file_index)
-                    write_file(
-                        file_path,
-                        data,
-                        export_type,
-                        index_file_json["endTime"],
-                    )
-                    file_index += 1
-                    data_files.append(file_path)
+            data_files = self._download_export_data_files(
+                index_file_json["dataFilePathList"],
+                controller_endpoint,
+                path,
+                export_type,
+                index_file_json["endTime"],
+                max_workers=concurrency,
+            )
 
             if len(data_files) > 0:
                 content["data"] = data_files
@@ -1296,13 +1408,151 @@ class DataControllerClient(object):
     def get_export_file_path(file_path, controller_endpoint):
         import json
 
-        import requests
+        from azext_arcdata.core.http_session import get_session
 
         uri = "{endpoint}/api/v{version}/export/{file_path}".format(
             endpoint=controller_endpoint, version=1, file_path=file_path
         )
         logger.debug("EXPORT FILE PATH URI: %s", uri)
-        return json.loads(requests.get(uri, verify=False).text)
+        return json.loads(get_session(uri).get(uri, verify=False).text)
+
+    def _download_export_data_files(
+        self,
+        data_file_paths,
+        controller_endpoint,
+        path,
+        export_type,
+        data_timestamp,
+        max_workers=None,
+    ):
+        """
+        Download the data files of an export task concurrently. Each file is
+        streamed to disk next to `path`.
+        :return: The paths of the data files that have data, in index order.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from requests.exceptions import (
+            ChunkedEncodingError,
+            ConnectionError as RequestsConnectionError,
+        )
+
+        max_workers = max(1, max_workers or EXPORT_DOWNLOAD_MAX_WORKERS)
+
+        def download(file_index, data_file_path):
+            file_path = generate_export_file_name(path, file_index)
+            has_data = retry(
+                self.download_export_file,
+                data_file_path,
+                controller_endpoint,
+                file_path,
+                export_type,
+                data_timestamp,
+                retry_count=CONNECTION_RETRY_ATTEMPTS,
+                retry_delay=RETRY_INTERVAL,
+                retry_method="download data file",
+                retry_on_exceptions=(
+                    NewConnectionError,
+                    MaxRetryError,
+                    RequestsConnectionError,
+                    ChunkedEncodingError,
+                ),
+            )
+            return file_path if has_data else None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            data_files = executor.map(
+                download, range(len(data_file_paths)), data_file_paths
+            )
+            return [file_path for file_path in data_files if file_path]
+
+    @staticmethod
+    def download_export_file(
+        file_path,
+        controller_endpoint,
+        output_path,
+        export_type,
+        data_timestamp=None,
+    ):
+        """
+        Stream an export data file from the controller to `output_path` in
+        the layout written by `write_file`. The download goes to a partial
+        file first, so a retried download resumes where the previous attempt
+        stopped instead of starting over.
+        :return: True if the data file has data, False if it is empty in which
+        case nothing is written.
+        """
+        import hashlib
+        import json
+
+        from azext_arcdata.core.http_session import get_session
+
+        uri = "{endpoint}/api/v{version}/export/{file_path}".format(
+            endpoint=controller_endpoint, version=1, file_path=file_path
+        )
+        part_path = "{}.{}.part".format(
+            output_path,
+            hashlib.sha1(file_path.encode("utf-8")).hexdigest()[:12],
+        )
+        header = '{{"exportType": {}, "dataTimestamp": {}, "data": '.format(
+            json.dumps(export_type), json.dumps(data_timestamp)
+        ).encode("utf-8")
+
+        offset = 0
+        if os.path.exists(part_path):
+            offset = os.path.getsize(part_path) - len(header)
+
+        headers = {}
+        if offset > 0:
+            headers["Range"] = "bytes={}-".format(offset)
+            logger.debug("Resuming download of %s at %d", uri, offset)
+
+        logger.debug("EXPORT FILE PATH URI: %s", uri)
+        with get_session(uri).get(
+            uri, headers=headers, stream=True, verify=False
+        ) as response:
+            # A range past the end means the previous attempt got everything
+            #
+            if (
+                offset <= 0
+                or response.status_code
+                != HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+            ):
+                response.raise_for_status()
+                resumed = response.status_code == HTTPStatus.PARTIAL_CONTENT
+
+                with open(part_path, "ab" if resumed else "wb") as part_file:
+                    if not resumed:
+                        part_file.write(header)
+                    for chunk in response.iter_content(
+                        EXPORT_DOWNLOAD_CHUNK_SIZE
+                    ):
+                        part_file.write(chunk)
+
+        # Empty data files (no body, an empty list or null) are dropped
+        #
+        with open(part_path, "rb") as part_file:
+            part_file.seek(len(header))
+            start = b""
+            while len(start) < 4:
+                chunk = part_file.read(EXPORT_DOWNLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                start += chunk.translate(None, b" \t\r\n")[:4]
+
+        if start in (b"", b"[]", b"null"):
+            os.remove(part_path)
+            return False
+
+        with open(part_path, "ab") as part_file:
+            part_file.write(b"}")
+        os.replace(part_path, output_path)
+
+        display(
+            "\t\t{} are exported to {}.".format(
+                export_type.capitalize(), output_path
+            )
+        )
+        return True
 
     def list_all_custom_resource_instances(self, cluster_name):
         """
@@ -1357,42 +1607,38 @@ class DataControllerClient(object):
         return result
 
     def _get_export_task_file_path(self, name, namespace):
-        import time
-
-        retry_count = 0
+        """
+        Wait for the export task to complete.
+        :return: The path of the index file of the export.
+        """
 
-        while retry_count < MAX_POLLING_ATTEMPTS:
-            export_task = retry(
-                lambda: self._client.get_namespaced_custom_object(
-                    name=name,
-                    namespace=namespace,
-                    group=TASK_API_GROUP,
-                    version=EXPORT_TASK_CRD_VERSION,
-                    plural=EXPORT_TASK_RESOURCE_KIND_PLURAL,
-                ),
-                retry_count=CONNECTION_RETRY_ATTEMPTS,
-                retry_delay=RETRY_INTERVAL,
-                retry_method="get namespaced custom object",
-                retry_on_exceptions=(NewConnectionError, MaxRetryError),
+        def on_state(task_name, state, export_task):
+            self.stdout(
+                "Export custom resource: {0} state is {1}".format(
+                    task_name, state
+                )
             )
 
-            state = export_task.get("status", {}).get("state")
-            if state is None:
-                retry_count += 1
-                time.sleep(20)
-            else:
-                self.stdout(
-                    "Export custom resource: {0} state is {1}".format(
-                        name, state
-                    )
-                )
-                if state == EXPORT_COMPLETED_STATE:
-                    logger.debug(export_task)
-                    return export_task.get("status", {}).get("path")
-                else:
-                    time.sleep(20)
+        waiter = CustomObjectWaiter(
+            namespace,
+            group=TASK_API_GROUP,
+            version=EXPORT_TASK_CRD_VERSION,
+            plural=EXPORT_TASK_RESOURCE_KIND_PLURAL,
+            first_state_timeout_seconds=EXPORT_TASK_FIRST_STATE_TIMEOUT_SECONDS,
+            on_state=on_state,
+        )
+        export_task = waiter.wait(
+            name,
+            lambda task: _.get(task, "status.state") == EXPORT_COMPLETED_STATE,
+        ).get(name)
 
-        raise Exception("Export custom resource:{0} is not ready.".format(name))
+        if export_task is None:
+            raise Exception(
+                "Export custom resource:{0} is not ready.".format(name)
+            )
+
+        logger.debug(export_task)
+        return export_task.get("status", {}).get("path")
 
     def _create_monitoring_secrets(self, cr: CustomResource) -> None:
         """
@@ -1875,58 +2121,55 @@ class DataControllerClient(object):
 
         # Try to delete the cluster
         #
-        i = 1
-        resources_are_deleted = False
+        deadline = time.monotonic() + DELETE_CLUSTER_TIMEOUT_SECONDS
         cluster_is_empty = False
         while not cluster_is_empty:
-            time.sleep(RETRY_INTERVAL)
-
-            if not resources_are_deleted:
-                #  Try to delete the remaining resources in the cluster
-                #
-                (resources_are_deleted, http_status) = retry(
-                    kubernetes_util.delete_cluster_resources,
-                    namespace,
-                    retry_count=CONNECTION_RETRY_ATTEMPTS,
-                    retry_delay=RETRY_INTERVAL,
-                    retry_method="delete cluster resources",
-                    retry_on_exceptions=(NewConnectionError, MaxRetryError),
-                )
-                #  Try to delete the bootstrapper
-                #
-                retry(
-                    kubernetes_util.delete_cluster_resources,
-                    namespace,
-                    "app=bootstrapper",
-                    retry_count=CONNECTION_RETRY_ATTEMPTS,
-                    retry_delay=RETRY_INTERVAL,
-                    retry_method="delete cluster resources",
-                    retry_on_exceptions=(NewConnectionError, MaxRetryError),
-                )
-
-                if http_status == HTTPStatus.FORBIDDEN:
-                    break
-
-            # Check if the cluster is empty
+            #  Try to delete the remaining resources in the cluster
             #
-            cluster_is_empty = retry(
-                kubernetes_util.namespace_is_empty,
+            (resources_are_deleted, http_status) = retry(
+                kubernetes_util.delete_cluster_resources,
                 namespace,
                 retry_count=CONNECTION_RETRY_ATTEMPTS,
                 retry_delay=RETRY_INTERVAL,
-                retry_method="namespace is empty",
+                retry_method="delete cluster resources",
+                retry_on_exceptions=(NewConnectionError, MaxRetryError),
+            )
+            #  Try to delete the bootstrapper
+            #
+            retry(
+                kubernetes_util.delete_cluster_resources,
+                namespace,
+                "app=bootstrapper",
+                retry_count=CONNECTION_RETRY_ATTEMPTS,
+                retry_delay=RETRY_INTERVAL,
+                retry_method="delete cluster resources",
                 retry_on_exceptions=(NewConnectionError, MaxRetryError),
             )
 
-            if i * RETRY_INTERVAL > DELETE_CLUSTER_TIMEOUT_SECONDS:
+            if http_status == HTTPStatus.FORBIDDEN:
+                break
+
+            # Wait for the deleted resources to be finalized, deleting
+            # again whatever is left if that takes too long
+            #
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
                 logger.warn(
                     "Data controller is not empty after %d minutes."
                     % (DELETE_CLUSTER_TIMEOUT_SECONDS / 60)
                 )
                 break
 
-            i = i + 1
-            time.sleep(RETRY_INTERVAL)
+            cluster_is_empty = retry(
+                lambda: kubernetes_util.wait_for_namespace_empty(
+                    namespace,
+                    timeout_seconds=min(remaining, DELETE_CLUSTER_WAIT_SECONDS),
+                ),
+                retry_count=CONNECTION_RETRY_ATTEMPTS,
+                retry_delay=RETRY_INTERVAL,
+                retry_method="namespace is empty",
+                retry_on_exceptions=(NewConnectionError, MaxRetryError),
+            )
 
         if not cluster_is_empty:
             raise Exception("Failed to delete data controller.")
@@ -2110,7 +2353,7 @@ class DataControllerClient(object):
         self.await_bootstrapper_privileged_job_completion(namespace)
 
     def delete_bootstrapper_privileged_job(self, namespace):
-        api = k8sClient.BatchV1Api()
+        api = k8sClient.BatchV1Api(get_api_client())
         job_name = UPGRADE_BOOTSTRAPPER_TEMPLATES.get_job_name(namespace)
         try:
             api.delete_namespaced_job(name=job_name, namespace=namespace)
@@ -2138,7 +2381,7 @@ class DataControllerClient(object):
 
         try:
             jobList = (
-                k8sClient.BatchV1Api()
+                k8sClient.BatchV1Api(get_api_client())
                 .list_namespaced_job(
                     field_selector="metadata.name={0}".format(
                         UPGRADE_BOOTSTRAPPER_TEMPLATES.get_job_name(namespace)
@@ -2158,13 +2401,14 @@ class DataControllerClient(object):
 
     @staticmethod
     def read_namespaced_job_log(namespace, job_name, job_uid):
-        job_pods = k8sClient.CoreV1Api().list_namespaced_pod(
+        job_pods = k8sClient.CoreV1Api(get_api_client()).list_namespaced_pod(
             namespace=namespace,
             label_selector="job-name={},controller-uid={}".format(
                 job_name, job_uid
             ),
         )
-        job_pod_log = k8sClient.CoreV1Api().read_namespaced_pod_log(
+        api = k8sClient.CoreV1Api(get_api_client())
+        job_pod_log = api.read_namespaced_pod_log(
             name=job_pods.items[0].metadata.name, namespace=namespace
         )
         return job_pod_log
@@ -2176,7 +2420,7 @@ class DataControllerClient(object):
 
     def _dump_pre_upgrade_validation_job_log(self, namespace):
         jobs = (
-            k8sClient.BatchV1Api()
+            k8sClient.BatchV1Api(get_api_client())
             .list_namespaced_job(
                 field_selector="metadata.name=upgrade-validation-job",
                 namespace=namespace,
@@ -2202,7 +2446,7 @@ class DataControllerClient(object):
 
         try:
             job = (
-                k8sClient.BatchV1Api()
+                k8sClient.BatchV1Api(get_api_client())
                 .list_namespaced_job(
                     field_selector="metadata.name={0}".format(
                         UPGRADE_BOOTSTRAPPER_TEMPLATES.get_job_name(namespace)
@@ -2475,7 +2719,7 @@ class DataControllerClient(object):
         """
 
         try:
-            pods = k8sClient.CoreV1Api().list_namespaced_pod(
+            pods = k8sClient.CoreV1Api(get_api_client()).list_namespaced_pod(
                 label_selector="app=controller", namespace=namespace
             )
 
@@ -321,6 +321,27 @@ EXPORT_COMPLETED_STATE = "Completed"
 Export completed state
 """
 
+EXPORT_DOWNLOAD_MAX_WORKERS = 4
+"""
+Default maximum number of export data files downloaded concurrently
+"""
+
+EXPORT_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+"""
+Size of the chunks an export data file is streamed to disk in
+"""
+
+DC_CREATE_MAX_WORKERS = 8
+"""
+Maximum number of data controller deployment steps run concurrently
+"""
+
+DC_CREATE_RETRY_DEADLINE_SECONDS = 30 * 60
+"""
+Total time the retried calls of a data controller deployment may take,
+including the calls nested in other retried calls
+"""
+
 DEFAULT_METRIC_QUERY_WINDOW_IN_MINUTE = 28
 """
 Default metric query window in minute
@@ -4,6 +4,7 @@ from azext_arcdata.kubernetes_sdk.arc_docker_image_service import (
     ArcDataImageService,
 )
 from azext_arcdata.kubernetes_sdk.client import KubernetesClient
+from azext_arcdata.kubernetes_sdk.client_pool import get_api_client
 from knack.cli import CLIError
 
 # from azext_arcdata.kubernetes_sdk.dc.client import DataControllerClient
@@ -103,7 +104,9 @@ def patch_all_dc_replicaset_images(namespace, target):
     failure in
     """
     try:
-        client = KubernetesClient.resolve_k8s_client().AppsV1Api()
+        client = KubernetesClient.resolve_k8s_client().AppsV1Api(
+            get_api_client()
+        )
 
         controller_rs = client.list_namespaced_replica_set(
             namespace=namespace,
@@ -145,7 +148,9 @@ def get_bootstrapper_deployment(namespace: str, use_k8s: bool = True):
     KubernetesClient.assert_use_k8s(use_k8s)
 
     try:
-        client = KubernetesClient.resolve_k8s_client().AppsV1Api()
+        client = KubernetesClient.resolve_k8s_client().AppsV1Api(
+            get_api_client()
+        )
 
         response = client.list_namespaced_deployment(
             namespace=namespace,
@@ -166,7 +171,7 @@ def restart_owned_pods(namespace: str, replicaset_name: str, use_k8s=True):
 
     owned_pods = select_owned_pods(namespace, replicaset_name)
 
-    client = KubernetesClient.resolve_k8s_client().CoreV1Api()
+    client = KubernetesClient.resolve_k8s_client().CoreV1Api(get_api_client())
 
     for pod in owned_pods:
         client.delete_namespaced_pod(pod.metadata.name, namespace)
@@ -219,7 +224,7 @@ def select_owned_pods(namespace: str, owned_by: str) -> array.array:
     returns a list of pods which are owned by the owned_by name using the
     metadata.ownerReference.name property
     """
-    client = KubernetesClient.resolve_k8s_client().CoreV1Api()
+    client = KubernetesClient.resolve_k8s_client().CoreV1Api(get_api_client())
     pods = client.list_namespaced_pod(namespace).items
     return filter_owned_pods(pods, owned_by)
 
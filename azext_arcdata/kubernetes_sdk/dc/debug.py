@@ -3,7 +3,10 @@
 # Licensed under the MIT License. See License.txt in the project root for
 # license information.
 # ------------------------------------------------------------------------------
+import base64
 import codecs
+import io
+import math
 import os
 import pathlib
 import re
@@ -12,9 +15,10 @@ import shutil
 import sys
 import tarfile
 import tempfile
+import threading
 import time
 import traceback
-from subprocess import STDOUT, CalledProcessError, call, check_output
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from azext_arcdata.core.constants import (
     ARC_INSTANCE_LABEL,
@@ -27,6 +31,7 @@ from azext_arcdata.core.util import (
     retry,
     with_timeout,
 )
+from azext_arcdata.kubernetes_sdk.client_pool import get_api_client
 from azext_arcdata.kubernetes_sdk.models.custom_resource_definition import (
     CustomResourceDefinition,
 )
@@ -35,7 +40,11 @@ from knack.log import get_logger
 from kubernetes import client as k8sClient
 from kubernetes.client.rest import ApiException
 from kubernetes.stream import stream
-from urllib3.exceptions import MaxRetryError, NewConnectionError
+from urllib3.exceptions import (
+    MaxRetryError,
+    NewConnectionError,
+    ReadTimeoutError,
+)
 
 logger = get_logger(__name__)
 
@@ -62,6 +71,68 @@ CONSOLE_OUT_LIMIT_BYTES = 100 * 1000 * 1000
 CONNECTION_RETRY_ATTEMPTS = 10
 CONNECTION_RETRY_INTERVAL_SECONDS = 10
 
+# Default number of pod and container log collections run in parallel.
+#
+LOG_COLLECTION_MAX_WORKERS = 8
+
+
+class _Deadline(object):
+    """
+    Time budget of a log collection that can also be stopped early, e.g. when
+    the command times out or another collection fails.
+    """
+
+    def __init__(self, seconds, stopped):
+        """
+        :param seconds: seconds allowed for the collection, None for no limit
+        :param stopped: event that is set once the collection must stop
+        """
+        self._at = time.monotonic() + seconds if seconds else None
+        self._stopped = stopped
+
+    def time_left(self):
+        """
+        Returns the seconds left until the deadline, None if there is no
+        deadline. Raises TimeoutError once the deadline has passed or the
+        collection was stopped.
+        :return:
+        """
+        if self._stopped.is_set():
+            raise TimeoutError()
+        if self._at is None:
+            return None
+
+        remaining = self._at - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError()
+        return remaining
+
+
+def _time_left(deadline):
+    """
+    Returns the seconds left until the deadline, None if there is no deadline.
+    Raises TimeoutError once the deadline has passed or was stopped.
+    :param deadline: _Deadline or None
+    :return:
+    """
+    return deadline.time_left() if deadline is not None else None
+
+
+def _request_timeout(deadline):
+    """
+    Returns the deadline as a `_request_timeout` for the Kubernetes client,
+    which only honours whole seconds given as an int or a (connect, read)
+    tuple. Raises TimeoutError once the deadline has passed or was stopped.
+    :param deadline: _Deadline or None
+    :return:
+    """
+    remaining = _time_left(deadline)
+    if remaining is None:
+        return None
+
+    seconds = max(1, int(math.ceil(remaining)))
+    return seconds, seconds
+
 
 def validate_namespace(namespace):
     """
@@ -79,7 +150,8 @@ def validate_namespace(namespace):
         try:
             # Verify the given namespace is a SQL cluster
             #
-            namespace_response = k8sClient.CoreV1Api().read_namespace(namespace)
+            api = k8sClient.CoreV1Api(get_api_client())
+            namespace_response = api.read_namespace(namespace)
             if (
                 namespace_response.metadata.labels is None
                 or ARC_NAMESPACE_LABEL not in namespace_response.metadata.labels
@@ -115,6 +187,8 @@ def run_command_within_container(cluster_name, pod_name, container_name, cmd):
             % (cmd, container_name, pod_name)
         )
 
+        # stream() swaps the request method of the api client while it runs,
+        # so exec calls use a client of their own rather than the shared one.
         response = stream(
             k8sClient.CoreV1Api().connect_get_namespaced_pod_exec,
             name=pod_name,
@@ -137,42 +211,172 @@ def run_command_within_container(cluster_name, pod_name, container_name, cmd):
         raise e
 
 
-def copy_container_log_folder(
-    namespace, target, pod_name, container_name, log_path
+class _ExecStreamReader(io.RawIOBase):
+    """
+    Read-only file object over the chunks of bytes yielded by a generator.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def _exec_tar_stream(namespace, pod_name, container_name, paths, deadline):
+    """
+    Runs `tar` in the container and yields the archive of the given paths as
+    it is received. The exec channel only carries text, so the archive is
+    base64 encoded in the container and decoded here.
+    :param namespace: cluster name
+    :param pod_name: pod name
+    :param container_name: container name
+    :param paths: absolute paths in the container
+    :param deadline: _Deadline of the copy, None for no deadline
+    :return:
+    """
+    command = [
+        "sh",
+        "-c",
+        "tar cf - -C / %s 2>/dev/null | base64"
+        % " ".join(shlex.quote(path.strip("/")) for path in paths),
+    ]
+    # stream() swaps the request method of the api client while it runs, so
+    # exec calls use a client of their own rather than the shared one.
+    response = stream(
+        k8sClient.CoreV1Api().connect_get_namespaced_pod_exec,
+        name=pod_name,
+        namespace=namespace,
+        command=command,
+        container=container_name,
+        stderr=True,
+        stdin=False,
+        stdout=True,
+        tty=False,
+        _preload_content=False,
+    )
+
+    pending = ""
+    try:
+        while True:
+            is_open = response.is_open()
+            if is_open:
+                response.update(timeout=min(1, _time_left(deadline) or 1))
+
+            if response.peek_stdout():
+                pending += "".join(response.read_stdout().split())
+                size = len(pending) - len(pending) % 4
+                if size:
+                    yield base64.b64decode(pending[:size])
+                    pending = pending[size:]
+            elif not is_open:
+                break
+    finally:
+        response.close()
+
+
+def _copy_container_paths(
+    namespace,
+    target,
+    pod_name,
+    container_name,
+    paths,
+    keep_basename=False,
+    deadline=None,
 ):
     """
-    Copies the files inside a log folder from the given container to the target location.
-    Returns true if copy command completes successfully.
+    Copies the given paths from the container into the target folder over a
+    single exec stream. The content of each folder is copied into the target
+    folder, unless keep_basename is set in which case the files and folders
+    themselves are copied into it.
     :param namespace: cluster name
     :param target: target folder
     :param pod_name: pod name
     :param container_name: container name
-    :param log_path: the log folder path in the container
-    :return:
+    :param paths: absolute paths in the container
+    :param keep_basename: keep the last part of each path in the target
+    :param deadline: _Deadline of the copy, None for no deadline
+    :return: the paths that were found in the container
     """
+    logger.debug(
+        "Collecting logs from pod: %s container: %s path: %s to: %s"
+        % (pod_name, container_name, ", ".join(paths), target)
+    )
+
+    # Longest paths first so nested paths are matched with their own prefix
+    #
+    prefixes = {}
+    for path in sorted(paths, key=len, reverse=True):
+        name = path.strip("/")
+        prefixes[name] = os.path.dirname(name) if keep_basename else name
+
+    target_root = os.path.realpath(target)
+    found = set()
+
+    chunks = _exec_tar_stream(
+        namespace, pod_name, container_name, paths, deadline
+    )
     try:
-        command = "kubectl "
-        if "KUBECTL_CONTEXT" in os.environ:
-            command += "--context %s " % (os.environ["KUBECTL_CONTEXT"])
-        command += "cp -n %s -c %s %s ." % (
-            namespace,
-            container_name,
-            pod_name + ":" + log_path,
-        )
-        parts = shlex.split(command)
-        logger.debug(
-            "Collecting logs from pod: %s container: %s path: %s to: %s"
-            % (pod_name, container_name, log_path, target)
-        )
-        check_output(parts, stderr=STDOUT, cwd=target)
-        return True
+        with tarfile.open(
+            fileobj=_ExecStreamReader(chunks), mode="r|"
+        ) as archive:
+            for member in archive:
+                name = member.name.strip("/")
+                path = next(
+                    (
+                        p
+                        for p in prefixes
+                        if name == p or name.startswith(p + "/")
+                    ),
+                    None,
+                )
+                if path is None:
+                    continue
 
-    except CalledProcessError as e:
-        return False
+                found.add("/" + path)
+                relative = name[len(prefixes[path]) :].strip("/")
+                destination = os.path.realpath(
+                    os.path.join(target_root, relative)
+                )
+                if not relative or not destination.startswith(
+                    target_root + os.sep
+                ):
+                    continue
+
+                if member.isdir():
+                    os.makedirs(destination, exist_ok=True)
+                elif member.isfile():
+                    os.makedirs(os.path.dirname(destination), exist_ok=True)
+                    with open(destination, "wb") as output_file:
+                        shutil.copyfileobj(
+                            archive.extractfile(member), output_file
+                        )
+    except tarfile.ReadError:
+        # Nothing was archived, none of the paths exist in the container or
+        # the container has no tar
+        #
+        pass
+    finally:
+        chunks.close()
+
+    return {path for path in paths if "/" + path.strip("/") in found}
 
 
 def copy_container_logs(
-    namespace, target, pod_name, container_name, containers
+    namespace, target, pod_name, container_name, containers, deadline=None
 ):
     """
     Copies the container logs, bases on the log patterns configured for each
@@ -182,57 +386,77 @@ def copy_container_logs(
     :param pod_name: pod name
     :param container_name: container name
     :param containers:
+    :param deadline: _Deadline of the copy, None for no deadline
     :return:
     """
 
-    if container_name in LOG_PATTERNS:
-        # Get the log patterns for the container
-        #
-        container_log_patterns = LOG_PATTERNS[container_name]
-    else:
-        container_log_patterns = []
+    # Get the log patterns for the container, copied as containers are
+    # collected in parallel
+    #
+    container_log_patterns = list(LOG_PATTERNS.get(container_name, []))
 
     # Add default log location
     #
     if DEFAULT_LOG_FOLDER not in container_log_patterns:
         container_log_patterns.append(DEFAULT_LOG_FOLDER)
 
-    for logPath in container_log_patterns:
-        # Copy the logs to the target folder
+    # Copy the logs to the target folder
+    #
+    copied = _copy_container_paths(
+        namespace,
+        target,
+        pod_name,
+        container_name,
+        container_log_patterns,
+        deadline=deadline,
+    )
+    missing = [
+        log_path
+        for log_path in container_log_patterns
+        if log_path not in copied
+    ]
+
+    for otherContainer in containers or []:
+        if not missing:
+            break
+
+        # ignore the container already processed
         #
-        files_copied = copy_container_log_folder(
-            namespace, target, pod_name, container_name, logPath
-        )
-        if containers and not files_copied:
-            logger.debug(
-                "Couldn't copy the folder '%s' from container '%s'. Trying other containers"
-                % (logPath, container_name)
-            )
-            for otherContainer in containers:
-                # ignore the container already processed
-                #
-                if otherContainer.name == container_name:
-                    continue
+        if otherContainer.name == container_name:
+            continue
 
-                # Try copy the directory from another container in the same pod
-                #
-                files_copied = copy_container_log_folder(
-                    namespace, target, pod_name, otherContainer.name, logPath
-                )
+        logger.debug(
+            "Couldn't copy the folder(s) '%s' from container '%s'. Trying "
+            "container '%s'"
+            % (", ".join(missing), container_name, otherContainer.name)
+        )
 
-                if files_copied:
-                    logger.debug(
-                        "Found the folder '%s' in container '%s'"
-                        % (logPath, otherContainer.name)
-                    )
-                    break
-        if not files_copied:
+        # Try copy the directories from another container in the same pod
+        #
+        copied = _copy_container_paths(
+            namespace,
+            target,
+            pod_name,
+            otherContainer.name,
+            missing,
+            deadline=deadline,
+        )
+        for log_path in copied:
             logger.debug(
-                "Couldn't find the folder '%s' in any container" % (logPath)
+                "Found the folder '%s' in container '%s'"
+                % (log_path, otherContainer.name)
             )
+        missing = [log_path for log_path in missing if log_path not in copied]
+
+    for log_path in missing:
+        logger.debug(
+            "Couldn't find the folder '%s' in any container" % (log_path)
+        )
 
 
-def copy_consoleout_log(namespace, target, pod_name, container_name, previous):
+def copy_consoleout_log(
+    namespace, target, pod_name, container_name, previous, deadline=None
+):
     """
     Copies the STDOUT logs for each container to the target location
     Getting the kubernete "previous" logs If previous is True
@@ -240,6 +464,7 @@ def copy_consoleout_log(namespace, target, pod_name, container_name, previous):
     :param target: target folder
     :param pod_name: pod name
     :param container_name: container name
+    :param deadline: _Deadline of the copy, None for no deadline
     :return:
     """
     stdout_log = os.path.join(
@@ -249,25 +474,29 @@ def copy_consoleout_log(namespace, target, pod_name, container_name, previous):
         stdout_log = os.path.join(
             target, pod_name + "-" + container_name + "-previous-stdout.log"
         )
-    log = k8sClient.CoreV1Api().read_namespaced_pod_log(
+    log = k8sClient.CoreV1Api(get_api_client()).read_namespaced_pod_log(
         name=pod_name,
         namespace=namespace,
         container=container_name,
         previous=previous,
         limit_bytes=CONSOLE_OUT_LIMIT_BYTES,
+        _request_timeout=_request_timeout(deadline),
     )
     with codecs.open(stdout_log, "w", encoding="utf-8") as logFile:
         log = log + "\n[truncated]\n"
         logFile.write(log)
 
 
-def copy_kubernetes_logs(namespace, target, pod_name, container_name):
+def copy_kubernetes_logs(
+    namespace, target, pod_name, container_name, deadline=None
+):
     """
     Copies the STDOUT logs for each container to the target location
     :param namespace: cluster name
     :param target: target folder
     :param pod_name: pod name
     :param container_name: container name
+    :param deadline: _Deadline of the copy, None for no deadline
     :return:
     """
     # Create the STDOUT log file in the target folder
@@ -275,8 +504,12 @@ def copy_kubernetes_logs(namespace, target, pod_name, container_name):
     logger.debug("Collecting STDOUT logs to: " + target)
 
     try:
-        copy_consoleout_log(namespace, target, pod_name, container_name, False)
-        copy_consoleout_log(namespace, target, pod_name, container_name, True)
+        copy_consoleout_log(
+            namespace, target, pod_name, container_name, False, deadline
+        )
+        copy_consoleout_log(
+            namespace, target, pod_name, container_name, True, deadline
+        )
     except k8sClient.rest.ApiException as e:
         if e.status == 400:
             # Getting previous logs for container can fail if the container doesn't have
@@ -301,34 +534,32 @@ def copy_container_file(
     :param container_name:
     :param container_file:
     :param local_folder:
-    :return:
+    :return: the local path of the copied file
     """
     try:
         display(
             "Starting to copy %s of %s container into local: %s."
             % (container_file, container_name, local_folder)
         )
-        kubectl_cmd = ["kubectl"]
-        if "KUBECTL_CONTEXT" in os.environ:
-            kubectl_cmd.extend(["--context", os.environ["KUBECTL_CONTEXT"]])
-        kubectl_cmd.extend(
-            [
-                "cp",
-                "-n",
-                cluster_name,
-                "-c",
-                container_name,
-                pod_name + ":" + container_file,
-                os.path.join(local_folder, os.path.basename(container_file)),
-            ]
+        os.makedirs(local_folder, exist_ok=True)
+        copied = _copy_container_paths(
+            cluster_name,
+            local_folder,
+            pod_name,
+            container_name,
+            [container_file],
+            keep_basename=True,
         )
-        rt = check_output(kubectl_cmd, stderr=STDOUT).decode()
-        return rt
+        if not copied:
+            raise ClusterLogError(
+                "Couldn't copy '%s' from container '%s'"
+                % (container_file, container_name)
+            )
 
-    except CalledProcessError as e:
-        logger.debug(
-            "Command failed with the error:\n %s" % (e.output.decode())
-        )
+        return os.path.join(local_folder, os.path.basename(container_file))
+
+    except ClusterLogError as e:
+        logger.debug("Copy failed with the error:\n %s" % e)
         raise e
     except Exception as e:
         traceback.print_exc()
@@ -521,7 +752,7 @@ def _get_crd_by_kind(kind: str):
     :return:
     """
 
-    api = k8sClient.ApiextensionsV1Api()
+    api = k8sClient.ApiextensionsV1Api(get_api_client())
     crds = api.list_custom_resource_definition()
     for crd in crds.items:
         if crd.spec.names.kind == kind:
@@ -535,6 +766,8 @@ def collect_cluster_logs(
     container_filter=None,
     resource_kind=None,
     resource_name=None,
+    max_workers=None,
+    pod_timeout=None,
 ):
     """
     Collects cluster logs and copies to the target folder
@@ -544,9 +777,11 @@ def collect_cluster_logs(
     :param container_filter: name to use to filter containers
     :param resource_kind: resource kind
     :param resource_name: resource name (used in conjunction with resource_kind) for selecting related k8s resources
+    :param max_workers: number of pods and containers collected in parallel
+    :param pod_timeout: seconds allowed to collect the logs of a single pod
     :return:
     """
-    api = k8sClient.CustomObjectsApi()
+    api = k8sClient.CustomObjectsApi(get_api_client())
     cr, label_selector, stateful_sets = None, None, None
     if resource_kind and resource_name:
         crd = CustomResourceDefinition(
@@ -579,14 +814,14 @@ def collect_cluster_logs(
     #
     if label_selector:
         stateful_sets = (
-            k8sClient.AppsV1Api()
+            k8sClient.AppsV1Api(get_api_client())
             .list_namespaced_stateful_set(
                 namespace=namespace, label_selector=label_selector
             )
             .items
         )
         pods = (
-            k8sClient.CoreV1Api()
+            k8sClient.CoreV1Api(get_api_client())
             .list_namespaced_pod(
                 namespace=namespace, label_selector=label_selector
             )
@@ -594,7 +829,9 @@ def collect_cluster_logs(
         )
     else:
         pods = (
-            k8sClient.CoreV1Api().list_namespaced_pod(namespace=namespace).items
+            k8sClient.CoreV1Api(get_api_client())
+            .list_namespaced_pod(namespace=namespace)
+            .items
         )
 
     if stateful_sets and len(stateful_sets) > 0:
@@ -607,87 +844,194 @@ def collect_cluster_logs(
         ) as log_file:
             log_file.write(str(stateful_sets))
 
+    # Filter the pod if podFilter is specified and filter AKS omsagent
+    #
+    pods = [
+        pod
+        for pod in pods or []
+        if (pod_filter is None or pod_filter in pod.metadata.name)
+        and "omsagent" not in pod.metadata.name
+    ]
+
     if pods and len(pods) > 0:
         display("Collecting logs for containers...")
 
-        for pod in pods:
-            pod_name = pod.metadata.name
+        deadlines = {}
+        deadlines_lock = threading.Lock()
+        stopped = threading.Event()
 
-            # Filter the pod if podFilter is specified
+        def run(pod_name, task, *args):
+            # The time budget of a pod starts with its first collection
             #
-            if pod_filter is not None and pod_filter not in pod_name:
-                continue
+            with deadlines_lock:
+                if pod_name not in deadlines:
+                    deadlines[pod_name] = _Deadline(pod_timeout, stopped)
+            task(*args, deadlines[pod_name])
+
+        remaining = {}
+        timed_out = set()
+        # Not a `with` block: leaving one waits for every queued collection,
+        # which would outlast the timeout of the command.
+        #
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers or LOG_COLLECTION_MAX_WORKERS)
+        )
+        futures = {}
+        try:
+            for pod in pods:
+                pod_name = pod.metadata.name
+                pod_log_folder = os.path.join(target_log_folder, pod_name)
+                if not os.path.exists(pod_log_folder):
+                    os.makedirs(pod_log_folder)
+
+                futures[
+                    executor.submit(
+                        run,
+                        pod_name,
+                        _collect_pod_info,
+                        namespace,
+                        pod,
+                        pod_log_folder,
+                    )
+                ] = pod_name
 
-            # Filter AKS omsagent
+                # Get the containers for the pod
+                #
+                for container in pod.spec.containers:
+
+                    # Filter the container if containerFilter is specified
+                    #
+                    container_name = container.name
+                    if (
+                        container_filter is not None
+                        and container_filter not in container_name
+                    ):
+                        continue
+
+                    # Create the target folder
+                    #
+                    target = os.path.join(
+                        target_log_folder, pod_name, container_name
+                    )
+                    if not os.path.exists(target):
+                        os.makedirs(target)
+
+                    futures[
+                        executor.submit(
+                            run,
+                            pod_name,
+                            _collect_container_logs,
+                            namespace,
+                            target,
+                            pod,
+                            container_name,
+                        )
+                    ] = pod_name
+
+            for pod_name in futures.values():
+                remaining[pod_name] = remaining.get(pod_name, 0) + 1
+
+            # Report progress as pods complete
             #
-            if "omsagent" in pod_name:
-                continue
-
-            pod_log_folder = os.path.join(target_log_folder, pod_name)
-            if not os.path.exists(pod_log_folder):
-                os.makedirs(pod_log_folder)
-
-            with open(
-                os.path.join(pod_log_folder, "pod.json"), "w"
-            ) as log_file:
-                log_file.write(str(pod))
-
-            events = (
-                k8sClient.CoreV1Api()
-                .list_namespaced_event(
-                    namespace=namespace,
-                    field_selector="involvedObject.kind=Pod,involvedObject.uid=%s,involvedObject.namespace=%s"
-                    % (pod.metadata.uid, pod.metadata.namespace),
-                    pretty="true",
-                )
-                .items
+            collected = 0
+            for future in as_completed(futures):
+                pod_name = futures[future]
+                try:
+                    future.result()
+                except (TimeoutError, ReadTimeoutError):
+                    timed_out.add(pod_name)
+                except MaxRetryError as e:
+                    # urllib3 retries a read that timed out before giving up
+                    #
+                    if not isinstance(e.reason, ReadTimeoutError):
+                        raise
+                    timed_out.add(pod_name)
+
+                remaining[pod_name] -= 1
+                if remaining[pod_name] == 0:
+                    collected += 1
+                    display(
+                        "\t[%d/%d] %s%s"
+                        % (
+                            collected,
+                            len(pods),
+                            pod_name,
+                            " (timed out)" if pod_name in timed_out else "",
+                        )
+                    )
+        except BaseException:
+            # Stop the running collections and drop the queued ones
+            #
+            stopped.set()
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=not stopped.is_set())
+
+        if timed_out:
+            logger.warning(
+                "Couldn't finish collecting logs for pod(s) %s after %s "
+                "seconds" % (", ".join(sorted(timed_out)), pod_timeout)
             )
-            if events and len(events) > 0:
-                with open(
-                    os.path.join(pod_log_folder, "events.json"), "w"
-                ) as log_file:
-                    log_file.write(str(events))
+    else:
+        logger.warn("No pod found in the given namespace.")
 
-            # Get the containers for the pod
-            #
-            spec = pod.spec
-            for container in spec.containers:
 
-                # Filter the container if containerFilter is specified
-                #
-                container_name = container.name
-                if (
-                    container_filter is not None
-                    and container_filter not in container_name
-                ):
-                    continue
+def _collect_pod_info(namespace, pod, pod_log_folder, deadline=None):
+    """
+    Writes the pod description and its events to the pod log folder
+    :param namespace: cluster name
+    :param pod: pod
+    :param pod_log_folder: pod log folder
+    :param deadline: _Deadline of the collection, None for no deadline
+    :return:
+    """
+    with open(os.path.join(pod_log_folder, "pod.json"), "w") as log_file:
+        log_file.write(str(pod))
 
-                # Create the target folder
-                #
-                target = os.path.join(
-                    target_log_folder, pod_name, container_name
-                )
-                if not os.path.exists(target):
-                    os.makedirs(target)
+    events = (
+        k8sClient.CoreV1Api(get_api_client())
+        .list_namespaced_event(
+            namespace=namespace,
+            field_selector="involvedObject.kind=Pod,involvedObject.uid=%s,involvedObject.namespace=%s"
+            % (pod.metadata.uid, pod.metadata.namespace),
+            pretty="true",
+            _request_timeout=_request_timeout(deadline),
+        )
+        .items
+    )
+    if events and len(events) > 0:
+        with open(os.path.join(pod_log_folder, "events.json"), "w") as log_file:
+            log_file.write(str(events))
 
-                logger.debug(
-                    "\x1b[0;32;40m"
-                    + pod_name
-                    + "/"
-                    + container_name
-                    + "\x1b[0m"
-                )
 
-                # Copy logs
-                #
-                copy_kubernetes_logs(
-                    namespace, target, pod_name, container_name
-                )
-                copy_container_logs(
-                    namespace, target, pod_name, container_name, spec.containers
-                )
-    else:
-        logger.warn("No pod found in the given namespace.")
+def _collect_container_logs(
+    namespace, target, pod, container_name, deadline=None
+):
+    """
+    Copies the STDOUT logs and log folders of a container to the target folder
+    :param namespace: cluster name
+    :param target: target folder
+    :param pod: pod
+    :param container_name: container name
+    :param deadline: _Deadline of the collection, None for no deadline
+    :return:
+    """
+    pod_name = pod.metadata.name
+    logger.debug("\x1b[0;32;40m" + pod_name + "/" + container_name + "\x1b[0m")
+
+    # Copy logs
+    #
+    copy_kubernetes_logs(namespace, target, pod_name, container_name, deadline)
+    copy_container_logs(
+        namespace,
+        target,
+        pod_name,
+        container_name,
+        pod.spec.containers,
+        deadline,
+    )
 
 
 def collect_cluster_info(
@@ -703,56 +1047,55 @@ def collect_cluster_info(
     """
     display("Collecting cluster info...")
 
+    core = k8sClient.CoreV1Api(get_api_client())
+    apps = k8sClient.AppsV1Api(get_api_client())
+
     try:
-        events = k8sClient.CoreV1Api().list_namespaced_event(
-            namespace=namespace, pretty="true"
-        )
+        events = core.list_namespaced_event(namespace=namespace, pretty="true")
         with open(
             os.path.join(target_log_folder, "events.json"), "w"
         ) as logFile:
             logFile.write(str(events))
 
-        stateful_sets = k8sClient.AppsV1Api().list_namespaced_stateful_set(
+        stateful_sets = apps.list_namespaced_stateful_set(
             namespace=namespace, pretty="true"
         )
         with open(os.path.join(target_log_folder, "ss.json"), "w") as logFile:
             logFile.write(str(stateful_sets))
 
-        replica_sets = k8sClient.AppsV1Api().list_namespaced_replica_set(
+        replica_sets = apps.list_namespaced_replica_set(
             namespace=namespace, pretty="true"
         )
         with open(os.path.join(target_log_folder, "rs.json"), "w") as logFile:
             logFile.write(str(replica_sets))
 
-        deployments = k8sClient.AppsV1Api().list_namespaced_replica_set(
+        deployments = apps.list_namespaced_replica_set(
             namespace=namespace, pretty="true"
         )
         with open(os.path.join(target_log_folder, "dpl.json"), "w") as logFile:
             logFile.write(str(deployments))
 
-        daemon_sets = k8sClient.AppsV1Api().list_namespaced_daemon_set(
+        daemon_sets = apps.list_namespaced_daemon_set(
             namespace=namespace, pretty="true"
         )
         with open(os.path.join(target_log_folder, "ds.json"), "w") as logFile:
             logFile.write(str(daemon_sets))
 
-        services = k8sClient.CoreV1Api().list_namespaced_service(
+        services = core.list_namespaced_service(
             namespace=namespace, pretty="true"
         )
         with open(os.path.join(target_log_folder, "svc.json"), "w") as logFile:
             logFile.write(str(services))
 
-        pods = k8sClient.CoreV1Api().list_namespaced_pod(
-            namespace=namespace, pretty="true"
-        )
+        pods = core.list_namespaced_pod(namespace=namespace, pretty="true")
         with open(os.path.join(target_log_folder, "pods.json"), "w") as logFile:
             logFile.write(str(pods))
 
-        pv = k8sClient.CoreV1Api().list_persistent_volume(pretty="true")
+        pv = core.list_persistent_volume(pretty="true")
         with open(os.path.join(target_log_folder, "pv.json"), "w") as logFile:
             logFile.write(str(pv))
 
-        pvc = k8sClient.CoreV1Api().list_namespaced_persistent_volume_claim(
+        pvc = core.list_namespaced_persistent_volume_claim(
             namespace=namespace, pretty="true"
         )
         with open(os.path.join(target_log_folder, "pvc.json"), "w") as logFile:
@@ -782,6 +1125,8 @@ def copy_logs(
     resource_name=None,
     skip_compress=False,
     exclude_dumps=False,
+    concurrency=None,
+    pod_timeout=None,
 ):
     """
     Copies the log files for each container to the target location
@@ -795,6 +1140,8 @@ def copy_logs(
     :param resource_name: resource name (used in conjunction with resource_kind) for selecting related k8s resources
     :param skip_compress: skips compressing the result if set to True
     :param exclude_dumps: exclude dumps if set to True
+    :param concurrency: number of pods and containers collected in parallel
+    :param pod_timeout: seconds allowed to collect the logs of a single pod
     :return:
     """
     display("Collecting the logs for cluster '%s'." % namespace)
@@ -820,6 +1167,8 @@ def copy_logs(
             container_filter,
             resource_kind,
             resource_name,
+            max_workers=concurrency,
+            pod_timeout=pod_timeout,
         ),
         namespace,
         skip_compress,
@@ -855,6 +1204,8 @@ def copy_cluster_and_system_logs(
     skip_compress=False,
     exclude_dumps=False,
     exclude_system_logs=False,
+    concurrency=None,
+    pod_timeout=None,
 ):
     """
     Copy Logs for the given cluster and system cluster
@@ -866,6 +1217,8 @@ def copy_cluster_and_system_logs(
     :param skip_compress: skips compressing the result if set to True
     :param exclude_dumps: exclude dumps if set to True
     :param exclude_system_logs: exclude system logs if set to True
+    :param concurrency: number of pods and containers collected in parallel
+    :param pod_timeout: seconds allowed to collect the logs of a single pod
     :return:
     """
     if target_folder is None:
@@ -886,6 +1239,8 @@ def copy_cluster_and_system_logs(
             resource_name=resource_name,
             skip_compress=skip_compress,
             exclude_dumps=exclude_dumps,
+            concurrency=concurrency,
+            pod_timeout=pod_timeout,
         )
 
         # Copy logs for the system cluster if requested. Not filtering any system pod or system container.
@@ -893,7 +1248,8 @@ def copy_cluster_and_system_logs(
         if not exclude_system_logs and name != SYSTEM_NAMESPACE:
 
             try:
-                n = k8sClient.CoreV1Api().read_namespace(SYSTEM_NAMESPACE)
+                api = k8sClient.CoreV1Api(get_api_client())
+                n = api.read_namespace(SYSTEM_NAMESPACE)
             except k8sClient.rest.ApiException as e:
                 # If a 403 Forbidden is returned by K8s
                 #
@@ -911,6 +1267,8 @@ def copy_cluster_and_system_logs(
                 container_filter=None,
                 skip_compress=skip_compress,
                 exclude_dumps=exclude_dumps,
+                concurrency=concurrency,
+                pod_timeout=pod_timeout,
             )
 
     except ClusterLogError as e:
@@ -934,6 +1292,8 @@ def copy_debug_logs(
     skip_compress=False,
     exclude_dumps=False,
     exclude_system_logs=False,
+    concurrency=None,
+    pod_timeout=None,
 ):
     """
     Wrapper to collect cluster and system logs with timeout as an optional parameter
@@ -945,6 +1305,8 @@ def copy_debug_logs(
     :param skip_compress: skips compressing the result if set to True
     :param exclude_dumps: exclude dumps if set to True
     :param exclude_system_logs: exclude system logs if set to True
+    :param concurrency: number of pods and containers collected in parallel
+    :param pod_timeout: seconds allowed to collect the logs of a single pod
     :return:
     """
     if timeout and timeout > 0:
@@ -961,6 +1323,8 @@ def copy_debug_logs(
             skip_compress,
             exclude_dumps,
             exclude_system_logs,
+            concurrency,
+            pod_timeout,
         )
     else:
         copy_cluster_and_system_logs(
@@ -974,6 +1338,8 @@ def copy_debug_logs(
             skip_compress,
             exclude_dumps,
             exclude_system_logs,
+            concurrency,
+            pod_timeout,
         )
 
 
@@ -999,7 +1365,7 @@ def take_controller_dump(cluster_name, target_folder):
     # trigger dump
     #
     items = (
-        k8sClient.CoreV1Api()
+        k8sClient.CoreV1Api(get_api_client())
         .list_namespaced_pod(namespace=cluster_name, label_selector=app_label)
         .items
     )
@@ -13,13 +13,14 @@ import os
 from enum import Enum
 from http import HTTPStatus
 
-import ndjson
-import requests
-from azext_arcdata.core.http_codes import http_status_codes
+from azext_arcdata.core.http_session import get_session
 from azext_arcdata.core.prompt import prompt_for_input, prompt_y_n
-from azext_arcdata.core.util import display, retry
+from azext_arcdata.core.util import display
 from azext_arcdata.arm_sdk.azure import constants as azure_constants
-from azext_arcdata.arm_sdk.azure.ad_auth_util import acquire_token
+from azext_arcdata.arm_sdk.azure.export_util import (  # noqa: F401
+    METRICS_UPLOAD_MAX_WORKERS,
+    metrics_upload,
+)
 from azext_arcdata.dc.constants import (
     DEFAULT_LOG_QUERY_WINDOW_IN_MINUTE,
     DEFAULT_METRIC_QUERY_WINDOW_IN_MINUTE,
@@ -30,7 +31,6 @@ from azext_arcdata.dc.constants import (
     LAST_USAGE_UPLOAD_FLAG,
     NAMESPACE,
 )
-from azext_arcdata.dc.exceptions import RequestTimeoutError, ServerError
 
 #######################
 # TODO: refactor to this package
@@ -52,12 +52,9 @@ from azext_arcdata.sqlmi.constants import (
     SQLMI_TIER_GENERAL_PURPOSE_AZURE,
 )
 from jsonschema import validate
-from knack.cli import CLIError
 from knack.log import get_logger
 from knack.prompting import NoTTYException, prompt
 from requests.adapters import HTTPAdapter
-from requests.exceptions import HTTPError
-from urllib3.exceptions import MaxRetryError, NewConnectionError, TimeoutError
 from urllib3.util.retry import Retry
 
 ###################
@@ -138,93 +135,6 @@ Metric error msg could be ignored
 """
 
 
-def _post_metrics(url, body, headers):
-    response = requests.post(url, data=body, headers=headers)
-
-    log.info("Metrics upload reponse header: {}".format(response.headers))
-    try:
-        response.raise_for_status()
-    except HTTPError as ex:
-        if response.status_code == http_status_codes.request_timeout:
-            raise RequestTimeoutError(ex)
-        elif response.status_code >= 500:
-            raise ServerError(ex)
-        else:
-            raise
-
-    return response
-
-
-def metrics_upload(metrics):
-
-    if metrics is None:
-        display("No metrics need to upload.")
-    else:
-        display("\n")
-        for data in metrics:
-            resource_id_value = data[MetricsDataStructure.resource_id_key.value]
-            region_value = data[MetricsDataStructure.region_key.value]
-            metrics = data["metrics"]
-            if not resource_id_value or not metrics or not region_value:
-                CLIError(
-                    "{} is not valid. Please check the file contains {} and "
-                    "metrics fields. Or export the data to file and try again."
-                )
-
-            current_time = datetime.datetime.utcnow()
-
-            filtered_metrics = list(
-                filter(
-                    lambda metric: (
-                        current_time
-                        - datetime.datetime.strptime(
-                            metric["time"], "%Y-%m-%dT%H:%M:%SZ"
-                        )
-                    ).total_seconds()
-                    / 60
-                    <= 30,
-                    metrics,
-                )
-            )
-            if filtered_metrics is None or not filtered_metrics:
-                print(
-                    "The metrics data are older than 30 minutes for {}, please"
-                    " export and upload again.".format(resource_id_value)
-                )
-                continue
-            log.info(
-                "Metrics data in file has {} records. {} are in last 30 mins".format(
-                    len(metrics), len(filtered_metrics)
-                )
-            )
-            display("Azure resource_id: {}".format(resource_id_value))
-
-            # Setup request header and url
-            headers = _set_header()
-            url = _set_url(region_value, resource_id_value)
-            retry(
-                lambda: _post_metrics(
-                    url, body=ndjson.dumps(filtered_metrics), headers=headers
-                ),
-                retry_count=CONNECTION_RETRY_ATTEMPTS,
-                retry_delay=RETRY_INTERVAL,
-                retry_method="post metrics data",
-                retry_on_exceptions=(
-                    NewConnectionError,
-                    MaxRetryError,
-                    TimeoutError,
-                    RequestTimeoutError,
-                    ServerError,
-                ),
-            )
-
-            display(
-                "Metrics upload pushed {} data points successfully.\n".format(
-                    len(filtered_metrics)
-                )
-            )
-
-
 """
 # Given a resource registered in Azure, returns the k8s namespace and name.
 def _parse_resource(resource):
@@ -245,26 +155,6 @@ def _parse_resource(resource):
 """
 
 
-def _set_header():
-    """
-    Authenticate using service principal w/ key.
-    """
-
-    headers = {
-        "Authorization": "Bearer "
-        + acquire_token(azure_constants.AZURE_METRICS_SCOPE),
-        "Content-Type": "application/x-ndjson",
-    }
-    return headers
-
-
-def _set_url(location, resource_id):
-    url = "https://{}.monitoring.azure.com{}/metrics".format(
-        location, resource_id
-    )
-    return url
-
-
 # ##############################################################################
 # Log export/upload functions
 # ##############################################################################
@@ -294,6 +184,16 @@ LOGS_MAXIMUM_POST_SIZE = 25 * 1024 * 1024
 Maximum post size to logs analytics workspace is 30M bytes. 5M for buffer
 """
 
+LOGS_DECOMPRESS_CHUNK_SIZE = 1024 * 1024
+"""
+Size of the compressed log chunks decompressed at a time during upload
+"""
+
+LOGS_UPLOAD_MAX_WORKERS = 4
+"""
+Default number of log batches posted concurrently
+"""
+
 LOGS_FILE_SIZE = 512 * 1024 * 1024
 """
 Maximum log export file size
@@ -353,25 +253,149 @@ def _write_logs(data_controller, logs, file_name, resource, timestamp):
 """
 
 
-def logs_upload(logs, customer_id, shared_key):
-    import base64
+def logs_upload(logs, customer_id, shared_key, max_workers=None):
+    """
+    Upload the exported logs of every instance to Log Analytics. Each
+    instance's records are streamed out of the compressed payload and cut into
+    batches under `LOGS_MAXIMUM_POST_SIZE`, which are posted concurrently over
+    a shared retry session.
+    :param logs: The `data` entries of a logs export data file.
+    :param customer_id: The Log Analytics workspace id.
+    :param shared_key: The Log Analytics workspace shared key.
+    :param max_workers: The maximum number of concurrent posts.
+    """
+    from concurrent.futures import (
+        FIRST_COMPLETED,
+        ThreadPoolExecutor,
+        wait,
+    )
+
+    max_workers = max(1, max_workers or LOGS_UPLOAD_MAX_WORKERS)
+    session = _requests_retry_session(_build_log_request_uri(customer_id))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for log in logs:
+            log_table_name = log["instance_type"] + "_logs"
+            pending = set()
+
+            # Only keep a bounded number of batches in flight so the
+            # decompressed log is never fully held in memory
+            #
+            for body, record_count in _split_log_records(log["logs"]):
+                if len(pending) >= max_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+
+                pending.add(
+                    executor.submit(
+                        _post_logs_to_logs_analytics,
+                        customer_id,
+                        shared_key,
+                        log["instance_name"],
+                        body,
+                        log_table_name,
+                        log["instance_type"],
+                        log["resource_id"],
+                        record_count=record_count,
+                        session=session,
+                    )
+                )
+
+            for future in pending:
+                future.result()
+
+
+def _iter_log_records(compressed_logs):
+    """
+    Incrementally decompress a base64 encoded, deflated JSON array of log
+    records and yield the raw JSON text of each record.
+    """
+    import codecs
     import zlib
 
-    for log in logs:
-        unzip = str(
-            zlib.decompress(base64.b64decode(log["logs"]), -zlib.MAX_WBITS),
-            "utf-8",
-        )
-        log_table_name = log["instance_type"] + "_logs"
-        _post_logs_to_logs_analytics(
-            customer_id,
-            shared_key,
-            log["instance_name"],
-            unzip,
-            log_table_name,
-            log["instance_type"],
-            log["resource_id"],
-        )
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    json_decoder = json.JSONDecoder()
+    raw = base64.b64decode(compressed_logs)
+
+    def chunks():
+        for offset in range(0, len(raw), LOGS_DECOMPRESS_CHUNK_SIZE):
+            yield text_decoder.decode(
+                decompressor.decompress(
+                    raw[offset : offset + LOGS_DECOMPRESS_CHUNK_SIZE]
+                )
+            )
+        yield text_decoder.decode(decompressor.flush(), final=True)
+
+    source = chunks()
+    buffer = ""
+    index = 0
+    started = False
+    exhausted = False
+
+    while True:
+        # Skip the array delimiters and whitespace between records
+        #
+        while index < len(buffer) and buffer[index] in " \t\r\n,[":
+            if buffer[index] == "[":
+                if started:
+                    break
+                started = True
+            index += 1
+
+        if index < len(buffer) and buffer[index] == "]":
+            return
+
+        if index < len(buffer):
+            try:
+                _, end = json_decoder.raw_decode(buffer, index)
+                yield buffer[index:end]
+                index = end
+                continue
+            except ValueError:
+                if exhausted:
+                    raise
+
+        if exhausted:
+            return
+
+        try:
+            buffer = buffer[index:] + next(source)
+            index = 0
+        except StopIteration:
+            exhausted = True
+
+
+def _split_log_records(compressed_logs, max_size=LOGS_MAXIMUM_POST_SIZE):
+    """
+    Group the records of a compressed log payload into JSON array post bodies
+    no larger than `max_size` bytes.
+    :return: A generator of (utf-8 encoded body, record count) tuples.
+    """
+    batch = []
+    batch_size = 2
+
+    for record in _iter_log_records(compressed_logs):
+        record = record.encode("utf-8")
+        record_size = len(record) + 1
+
+        if batch and batch_size + record_size > max_size:
+            yield b"[" + b",".join(batch) + b"]", len(batch)
+            batch = []
+            batch_size = 2
+
+        if record_size + 2 > max_size:
+            log.warning(
+                "A log record of %d bytes exceeds the maximum post size.",
+                record_size,
+            )
+
+        batch.append(record)
+        batch_size += record_size
+
+    if batch:
+        yield b"[" + b",".join(batch) + b"]", len(batch)
 
 
 def _convert_to_logs_format(logs, instance, instance_type, resource_uri):
@@ -524,7 +548,9 @@ def _test_log_workspace_key(customer_id, shared_key):
     )
     succeed = False
     try:
-        response = requests.post(uri, data=body, headers=headers)
+        response = _requests_retry_session(uri).post(
+            uri, data=body, headers=headers
+        )
         if 200 <= response.status_code <= 299:
             succeed = True
     finally:
@@ -539,18 +565,25 @@ def _post_logs_to_logs_analytics(
     log_type,
     instance_type,
     resource_uri,
+    record_count=None,
+    session=None,
 ):
     uri = _build_log_request_uri(customer_id)
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if record_count is None:
+        record_count = len(json.loads(body))
     headers = _build_log_request_header(
         customer_id, shared_key, len(body), log_type, resource_uri
     )
 
-    response = _requests_retry_session().post(uri, data=body, headers=headers)
+    session = session or _requests_retry_session(uri)
+    response = session.post(uri, data=body, headers=headers)
     if 200 <= response.status_code <= 299:
         display(
             '\tSuccessfully upload "{}" records for resource type "{}", '
             'instance: "{}\'s" log to table: "{}" '.format(
-                len(json.loads(body)), instance_type, instance_name, log_type
+                record_count, instance_type, instance_name, log_type
             )
         )
     else:
@@ -565,6 +598,7 @@ def _post_logs_to_logs_analytics(
 # https://urllib3.readthedocs.io/en/latest/reference/urllib3.util.html
 # Explains how retry works
 def _requests_retry_session(
+    uri,
     retries=LOGS_POST_RETRY_CAP,
     backoff_factor=LOGS_BACKOFF_FACTOR,
     session=None,
@@ -572,16 +606,17 @@ def _requests_retry_session(
     """
     Get a retry request session
     :arg:
+      - uri: the log analytics uri the session is used for
       - retries: number of retries
       - backoff_factor: for exponential backoff
       - status_forcelist: server error code list
         Now retry on three cases based on the following doc:
         https://docs.microsoft.com/en-us/azure/azure-monitor/platform/
         data-collector-api#return-codes
-      - session: https request retry session
+      - session: https request retry session, the shared pooled session
+        for the uri's host is used if not given
     :return: retry session
     """
-    session = session or requests.Session()
     max_retries = Retry(
         total=retries,
         read=retries,
@@ -594,6 +629,9 @@ def _requests_retry_session(
         ),
         method_whitelist=frozenset(["POST"]),
     )
+    if session is None:
+        return get_session(uri, max_retries=max_retries)
+
     adapter = HTTPAdapter(max_retries=max_retries)
     session.mount("https://", adapter)
     return session
@@ -0,0 +1,490 @@
+# ------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# ------------------------------------------------------------------------------
+
+"""
+Event driven waiters for Kubernetes objects.
+"""
+
+from azext_arcdata.core.util import display, is_windows
+from azext_arcdata.kubernetes_sdk.HttpCodes import http_status_codes
+from azext_arcdata.kubernetes_sdk.client_pool import get_api_client
+from azext_arcdata.kubernetes_sdk.models.custom_resource import CustomResource
+from humanfriendly.terminal.spinners import AutomaticSpinner
+from kubernetes import client as k8sClient
+from kubernetes import watch as k8sWatch
+from kubernetes.client.rest import ApiException as K8sApiException
+from knack.log import get_logger
+from urllib3.exceptions import HTTPError
+
+import pydash as _
+import time
+
+__all__ = [
+    "CustomObjectWaiter",
+    "wait_for_custom_resources",
+    "wait_for_objects",
+]
+
+logger = get_logger(__name__)
+
+WATCH_TIMEOUT_SECONDS = 60
+"""
+Server side timeout of a single watch request, the watch is resumed from the
+last seen resourceVersion when it expires.
+"""
+
+POLL_INTERVAL_SECONDS = 1
+"""
+Initial interval of the polling fallback.
+"""
+
+MAX_POLL_INTERVAL_SECONDS = 20
+"""
+Longest interval the polling fallback backs off to.
+"""
+
+WAIT_REPORT_INTERVAL_SECONDS = 5 * 60
+"""
+Interval at which a long wait is reported to the console.
+"""
+
+STOP_CHECK_INTERVAL_SECONDS = 5
+"""
+Longest a waiter given a stop event blocks in a single watch or sleep before
+checking the event again.
+"""
+
+
+def _sleep(seconds, stop_event):
+    """
+    Sleep for the given seconds, or until the stop event is set.
+    """
+    if stop_event is None:
+        time.sleep(seconds)
+    else:
+        stop_event.wait(seconds)
+
+
+def _is_stopped(stop_event):
+    return stop_event is not None and stop_event.is_set()
+
+
+class CustomObjectWaiter(object):
+    """
+    Waits for one or more namespaced custom objects to reach a final state.
+
+    The objects are listed once and then watched from the listed
+    resourceVersion, so the wait ends as soon as the API server reports the
+    change. An expired resourceVersion triggers a new list. If the watch API
+    cannot be used the waiter falls back to polling, backing off while
+    nothing changes.
+    """
+
+    def __init__(
+        self,
+        namespace,
+        group,
+        version,
+        plural,
+        timeout_seconds=None,
+        on_state=None,
+        state_path="status.state",
+        first_state_timeout_seconds=None,
+        stop_event=None,
+    ):
+        """
+        :param namespace: The namespace of the custom objects.
+        :param group: The API group of the custom objects.
+        :param version: The API version of the custom objects.
+        :param plural: The plural name of the custom resource definition.
+        :param timeout_seconds: How long to wait at most, None to wait
+        until every object is done.
+        :param on_state: Optional callback `(name, state, obj)` called each
+        time the state of an object changes.
+        :param state_path: The path of the state in the object.
+        :param first_state_timeout_seconds: How long to wait at most for
+        every object to report a state, None for no limit. Once they all
+        have, only `timeout_seconds` applies.
+        :param stop_event: Optional `threading.Event` that ends the wait
+        early once it is set.
+        """
+        self._namespace = namespace
+        self._group = group
+        self._version = version
+        self._plural = plural
+        self._timeout_seconds = timeout_seconds
+        self._on_state = on_state
+        self._state_path = state_path
+        self._first_state_timeout_seconds = first_state_timeout_seconds
+        self._stop_event = stop_event
+        self._objects = {}
+        self._states = {}
+
+    def wait(self, names, is_done):
+        """
+        Wait for the named custom objects until `is_done` holds for each of
+        them or the timeout expires.
+        :param names: The name, or list of names, of the custom objects.
+        :param is_done: Predicate called with an object (as a dict) that
+        returns True once the object reached a final state, e.g. ready or
+        error.
+        :return: The last seen object for each name that is done, keyed by
+        name. Names that are missing timed out.
+        """
+        names = [names] if isinstance(names, str) else list(names)
+        pending = set(names)
+        start = time.monotonic()
+        timeout_deadline = (
+            None
+            if self._timeout_seconds is None
+            else start + self._timeout_seconds
+        )
+        first_state_deadline = (
+            None
+            if self._first_state_timeout_seconds is None
+            else start + self._first_state_timeout_seconds
+        )
+
+        # Narrow the watch server side when a single object is tracked
+        #
+        field_selector = (
+            "metadata.name={}".format(names[0]) if len(names) == 1 else None
+        )
+
+        resource_version = None
+        use_watch = True
+        interval = POLL_INTERVAL_SECONDS
+
+        while pending:
+            deadline = timeout_deadline
+            if first_state_deadline is not None and any(
+                self._states.get(name) is None for name in names
+            ):
+                deadline = (
+                    first_state_deadline
+                    if deadline is None
+                    else min(deadline, first_state_deadline)
+                )
+            if self._expired(deadline) or _is_stopped(self._stop_event):
+                break
+
+            if use_watch:
+                try:
+                    if resource_version is None:
+                        resource_version = self._list(
+                            pending, is_done, field_selector
+                        )
+                    else:
+                        resource_version = self._watch(
+                            pending,
+                            is_done,
+                            field_selector,
+                            resource_version,
+                            deadline,
+                        )
+                except K8sApiException as e:
+                    if e.status == http_status_codes.gone:
+                        logger.debug("Watch expired, listing again.")
+                        resource_version = None
+                    else:
+                        logger.debug("Watch failed, polling instead: %s", e)
+                        use_watch = False
+                except HTTPError as e:
+                    logger.debug("Watch failed, polling instead: %s", e)
+                    use_watch = False
+                continue
+
+            changed = self._poll(pending, is_done)
+            if pending:
+                interval = (
+                    POLL_INTERVAL_SECONDS
+                    if changed
+                    else min(interval * 2, MAX_POLL_INTERVAL_SECONDS)
+                )
+                _sleep(self._remaining(deadline, interval), self._stop_event)
+
+        return {
+            name: self._objects[name] for name in names if name not in pending
+        }
+
+    @staticmethod
+    def _expired(deadline):
+        return deadline is not None and time.monotonic() >= deadline
+
+    @staticmethod
+    def _remaining(deadline, seconds):
+        if deadline is None:
+            return seconds
+        return max(0, min(seconds, deadline - time.monotonic()))
+
+    def _observe(self, obj, pending, is_done):
+        """
+        Record the latest version of an object.
+        :return: True if the state of a pending object changed.
+        """
+        name = _.get(obj, "metadata.name")
+        if name not in pending:
+            return False
+
+        self._objects[name] = obj
+        state = _.get(obj, self._state_path)
+        changed = name not in self._states or state != self._states[name]
+        self._states[name] = state
+
+        if changed and state is not None and self._on_state:
+            self._on_state(name, state, obj)
+
+        if is_done(obj):
+            pending.discard(name)
+
+        return changed
+
+    def _list(self, pending, is_done, field_selector):
+        api = k8sClient.CustomObjectsApi(get_api_client())
+        response = api.list_namespaced_custom_object(
+            self._group,
+            self._version,
+            self._namespace,
+            self._plural,
+            field_selector=field_selector,
+        )
+        for item in response.get("items", []):
+            self._observe(item, pending, is_done)
+
+        return _.get(response, "metadata.resourceVersion")
+
+    def _watch(
+        self, pending, is_done, field_selector, resource_version, deadline
+    ):
+        api = k8sClient.CustomObjectsApi(get_api_client())
+        watch = k8sWatch.Watch()
+        timeout = WATCH_TIMEOUT_SECONDS
+        if self._stop_event is not None:
+            timeout = STOP_CHECK_INTERVAL_SECONDS
+        timeout = max(1, int(self._remaining(deadline, timeout)))
+
+        for event in watch.stream(
+            api.list_namespaced_custom_object,
+            self._group,
+            self._version,
+            self._namespace,
+            self._plural,
+            field_selector=field_selector,
+            resource_version=resource_version,
+            timeout_seconds=timeout,
+        ):
+            if event["type"] in ("ADDED", "MODIFIED"):
+                self._observe(event["raw_object"], pending, is_done)
+            if not pending or _is_stopped(self._stop_event):
+                watch.stop()
+                break
+
+        return watch.resource_version or resource_version
+
+    def _poll(self, pending, is_done):
+        api = k8sClient.CustomObjectsApi(get_api_client())
+        changed = False
+
+        for name in list(pending):
+            try:
+                obj = api.get_namespaced_custom_object(
+                    self._group,
+                    self._version,
+                    self._namespace,
+                    self._plural,
+                    name,
+                )
+            except K8sApiException as e:
+                if e.status == http_status_codes.not_found:
+                    continue
+                raise
+            except HTTPError as e:
+                logger.debug("Failed to get %s: %s", name, e)
+                continue
+
+            changed = self._observe(obj, pending, is_done) or changed
+
+        return changed
+
+
+def wait_for_custom_resources(
+    client,
+    names,
+    namespace,
+    group,
+    version,
+    plural,
+    cr_type,
+    is_ready,
+    is_in_error,
+    activity="Deploying",
+):
+    """
+    Wait until each of the named custom resources is ready or in error. The
+    resources are tracked together with a single watch while a spinner is
+    shown, and the outcome of each one is reported once the wait ends.
+    :param client: The CLI client used to report progress.
+    :param names: The name, or list of names, of the custom resources.
+    :param namespace: The namespace of the custom resources.
+    :param group: The API group of the custom resources.
+    :param version: The API version of the custom resources.
+    :param plural: The plural name of the custom resource definition.
+    :param cr_type: The `CustomResource` class the resources decode to.
+    :param is_ready: Predicate telling whether a decoded resource is ready.
+    :param is_in_error: Predicate telling whether a decoded resource failed.
+    :param activity: The activity shown while waiting, e.g. "Updating".
+    :return: The last seen state of each resource, decoded, keyed by name.
+    """
+    names = [names] if isinstance(names, str) else list(names)
+
+    def is_done(obj):
+        cr = CustomResource.decode(cr_type, obj)
+        return is_ready(cr) or is_in_error(cr)
+
+    def on_state(name, state, obj):
+        # Only surface transitions when several resources share the spinner
+        #
+        if len(names) > 1:
+            client.stdout("{0} is {1}".format(name, state))
+        else:
+            logger.debug("%s is %s", name, state)
+
+    waiter = CustomObjectWaiter(
+        namespace, group, version, plural, on_state=on_state
+    )
+    description = "{0} {1} in namespace `{2}`".format(
+        activity, ", ".join(names), namespace
+    )
+
+    if not is_windows():
+        with AutomaticSpinner(description, show_time=True):
+            objects = waiter.wait(names, is_done)
+    else:
+        client.stdout(description)
+        objects = waiter.wait(names, is_done)
+
+    result = {}
+    for name in names:
+        cr = CustomResource.decode(cr_type, objects[name])
+        if is_in_error(cr):
+            client.stdout(
+                "{0} is in error state:{1}".format(name, cr.status.message)
+            )
+        elif is_ready(cr):
+            client.stdout("{0} is Ready".format(name))
+        result[name] = cr
+
+    return result
+
+
+def wait_for_objects(
+    list_func,
+    is_done,
+    description=None,
+    timeout_seconds=None,
+    stop_event=None,
+    **kwargs
+):
+    """
+    Wait until `is_done` holds for the objects returned by a Kubernetes list
+    call, e.g. `CoreV1Api().list_namespaced_pod`. The objects are listed once
+    and then watched, an expired resourceVersion triggers a new list and the
+    wait falls back to polling if the watch API cannot be used.
+    :param list_func: The list function of the objects.
+    :param is_done: Predicate called with the list of current objects.
+    :param description: What is waited for, reported every few minutes.
+    :param timeout_seconds: How long to wait at most, None to wait until
+    `is_done` holds.
+    :param stop_event: Optional `threading.Event` that ends the wait early
+    once it is set.
+    :param kwargs: The arguments of `list_func`, e.g. the namespace and a
+    label or field selector.
+    :return: The current objects, None if the wait timed out or was stopped.
+    """
+    start = time.monotonic()
+    deadline = None if timeout_seconds is None else start + timeout_seconds
+    reported = start
+    objects = {}
+    resource_version = None
+    use_watch = True
+    interval = POLL_INTERVAL_SECONDS
+
+    while not _is_stopped(stop_event) and (
+        deadline is None or time.monotonic() < deadline
+    ):
+        if description and time.monotonic() - reported >= (
+            WAIT_REPORT_INTERVAL_SECONDS
+        ):
+            reported = time.monotonic()
+            display(
+                "Waiting for {0} after {1} minutes.".format(
+                    description, int((reported - start) / 60)
+                )
+            )
+
+        try:
+            if not use_watch or resource_version is None:
+                response = list_func(**kwargs)
+                objects = {o.metadata.name: o for o in response.items}
+                if is_done(list(objects.values())):
+                    return list(objects.values())
+
+                if not use_watch:
+                    delay = interval
+                    if deadline is not None:
+                        delay = max(0, min(delay, deadline - time.monotonic()))
+                    _sleep(delay, stop_event)
+                    interval = min(interval * 2, MAX_POLL_INTERVAL_SECONDS)
+                    continue
+
+                resource_version = response.metadata.resource_version
+
+            watch = k8sWatch.Watch()
+            timeout = WATCH_TIMEOUT_SECONDS
+            if stop_event is not None:
+                timeout = STOP_CHECK_INTERVAL_SECONDS
+            if deadline is not None:
+                timeout = max(1, min(timeout, int(deadline - time.monotonic())))
+
+            for event in watch.stream(
+                list_func,
+                resource_version=resource_version,
+                timeout_seconds=timeout,
+                **kwargs
+            ):
+                obj = event["object"]
+                if event["type"] == "DELETED":
+                    objects.pop(obj.metadata.name, None)
+                elif event["type"] in ("ADDED", "MODIFIED"):
+                    objects[obj.metadata.name] = obj
+
+                if is_done(list(objects.values())):
+                    watch.stop()
+                    return list(objects.values())
+                if _is_stopped(stop_event):
+                    watch.stop()
+                    return None
+
+            resource_version = watch.resource_version or resource_version
+        except K8sApiException as e:
+            if use_watch and e.status == http_status_codes.gone:
+                logger.debug("Watch expired, listing again.")
+                resource_version = None
+            elif use_watch:
+                logger.debug("Watch failed, polling instead: %s", e)
+                use_watch = False
+            else:
+                logger.debug("Failed to list objects: %s", e)
+                _sleep(interval, stop_event)
+        except HTTPError as e:
+            if use_watch:
+                logger.debug("Watch failed, polling instead: %s", e)
+                use_watch = False
+            else:
+                logger.debug("Failed to list objects: %s", e)
+                _sleep(interval, stop_event)
+
+    return None
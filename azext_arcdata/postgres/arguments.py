@@ -345,6 +345,13 @@ def load_arguments(self, _):
             help="The Kubernetes namespace where the Azure Arc enabled PostgreSQL Hyperscale server groups are deployed. "
             "If no namespace is specified, then the namespace defined in the kubeconfig will be used.",
         )
+        arg_context.argument(
+            "all_namespaces",
+            options_list=["--all-namespaces", "-A"],
+            action="store_true",
+            help="List the Azure Arc enabled PostgreSQL Hyperscale server "
+            "groups of every namespace.",
+        )
         arg_context.argument(
             "use_k8s",
             options_list=["--use-k8s"],
@@ -5,7 +5,9 @@
 # -----------------------------------------------------------------------------
 
 from azure.cli.core.commands import CliCommandType
-from azext_arcdata.postgres.client import beget
+from azext_arcdata.core.client_factory import lazy_beget
+
+beget = lazy_beget("azext_arcdata.postgres.client#beget")
 
 
 def load_commands(self, _):
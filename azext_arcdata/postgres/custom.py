@@ -7,10 +7,10 @@
 from knack.cli import CLIError
 from azext_arcdata.core.util import (
     FileUtil,
-    is_windows,
     retry,
     check_and_set_kubectl_context,
     get_config_from_template,
+    trim_dict_entries,
 )
 from azext_arcdata.kubernetes_sdk.client import (
     KubernetesClient,
@@ -25,6 +25,8 @@ from azext_arcdata.kubernetes_sdk.models.custom_resource_definition import (
     CustomResourceDefinition,
 )
 from azext_arcdata.kubernetes_sdk.models.custom_resource import CustomResource
+from azext_arcdata.kubernetes_sdk.waiter import wait_for_custom_resources
+from azext_arcdata.kubernetes_sdk.client_pool import get_api_client
 from azext_arcdata.core.constants import (
     AZDATA_PASSWORD,
     MGMT_PROXY,
@@ -49,7 +51,6 @@ from azext_arcdata.core.util import DeploymentConfigUtil
 from collections import OrderedDict
 from dateutil import parser, tz
 from enum import Enum
-from humanfriendly.terminal.spinners import AutomaticSpinner
 from knack.prompting import NoTTYException
 from kubernetes import client as k8sClient
 
@@ -363,101 +364,18 @@ def postgres_server_arc_create(
                 )
             )
         else:
-            response = client.apis.kubernetes.get_namespaced_custom_object(
+            wait_for_custom_resources(
+                client,
                 cr.metadata.name,
                 cr.metadata.namespace,
                 group=API_GROUP,
                 version=KubernetesClient.get_crd_version(POSTGRES_CRD_NAME),
                 plural=resource_kind_plural,
+                cr_type=PostgresqlCustomResource,
+                is_ready=_is_instance_ready,
+                is_in_error=_is_instance_in_error,
+                activity="Deploying",
             )
-            deployed_cr = CustomResource.decode(
-                PostgresqlCustomResource, response
-            )
-
-            if not is_windows():
-                with AutomaticSpinner(
-                    "Deploying {0} in namespace `{1}`".format(
-                        cr.metadata.name, cr.metadata.namespace
-                    ),
-                    show_time=True,
-                ):
-                    while not _is_instance_ready(deployed_cr):
-                        if _is_instance_in_error(deployed_cr):
-                            client.stdout(
-                                "{0} is in error state:{1}".format(
-                                    cr.metadata.name,
-                                    _get_error_message(deployed_cr),
-                                )
-                            )
-                            break
-
-                        time.sleep(5)
-                        response = retry(
-                            lambda: client.apis.kubernetes.get_namespaced_custom_object(
-                                cr.metadata.name,
-                                cr.metadata.namespace,
-                                group=API_GROUP,
-                                version=KubernetesClient.get_crd_version(POSTGRES_CRD_NAME),
-                                plural=resource_kind_plural,
-                            ),
-                            retry_count=CONNECTION_RETRY_ATTEMPTS,
-                            retry_delay=RETRY_INTERVAL,
-                            retry_method="get namespaced custom object",
-                            retry_on_exceptions=(
-                                NewConnectionError,
-                                MaxRetryError,
-                                KubernetesError,
-                            ),
-                        )
-
-                        deployed_cr = CustomResource.decode(
-                            PostgresqlCustomResource, response
-                        )
-                        state = deployed_cr.status.state
-                        if state is not None:
-                            state = state.lower()
-            else:
-                client.stdout(
-                    "Deploying {0} in namespace `{1}`".format(name, namespace)
-                )
-                while not _is_instance_ready(deployed_cr):
-                    if _is_instance_in_error(deployed_cr):
-                        client.stdout(
-                            "{0} is in error state:{1}".format(
-                                cr.metadata.name,
-                                _get_error_message(deployed_cr),
-                            )
-                        )
-                        break
-
-                    time.sleep(5)
-                    response = retry(
-                        lambda: client.apis.kubernetes.get_namespaced_custom_object(
-                            cr.metadata.name,
-                            cr.metadata.namespace,
-                            group=API_GROUP,
-                            version=KubernetesClient.get_crd_version(POSTGRES_CRD_NAME),
-                            plural=resource_kind_plural,
-                        ),
-                        retry_count=CONNECTION_RETRY_ATTEMPTS,
-                        retry_delay=RETRY_INTERVAL,
-                        retry_method="get namespaced custom object",
-                        retry_on_exceptions=(
-                            NewConnectionError,
-                            MaxRetryError,
-                            KubernetesError,
-                        ),
-                    )
-
-                    deployed_cr = CustomResource.decode(
-                        PostgresqlCustomResource, response
-                    )
-                    state = deployed_cr.status.state
-                    if state is not None:
-                        state = state.lower()
-
-            if _is_instance_ready(deployed_cr):
-                client.stdout("{0} is Ready".format(cr.metadata.name))
 
     except KubernetesError as e:
         raise CLIError(e.message)
@@ -600,79 +518,19 @@ def postgres_server_arc_edit(
                 )
             )
         else:
-            response = client.apis.kubernetes.get_namespaced_custom_object(
+            wait_for_custom_resources(
+                client,
                 cr.metadata.name,
                 cr.metadata.namespace,
                 group=API_GROUP,
                 version=KubernetesClient.get_crd_version(POSTGRES_CRD_NAME),
                 plural=crd.plural,
-            )
-            deployed_cr = CustomResource.decode(
-                PostgresqlCustomResource, response
+                cr_type=PostgresqlCustomResource,
+                is_ready=_is_instance_ready,
+                is_in_error=_is_instance_in_error,
+                activity="Updating",
             )
 
-            if not is_windows():
-                with AutomaticSpinner(
-                    "Updating {0} in namespace `{1}`".format(
-                        cr.metadata.name, cr.metadata.namespace
-                    ),
-                    show_time=True,
-                ):
-                    while not _is_instance_ready(deployed_cr):
-                        if _is_instance_in_error(deployed_cr):
-                            client.stdout(
-                                "{0} is in error state:{1}".format(
-                                    cr.metadata.name,
-                                    _get_error_message(deployed_cr),
-                                )
-                            )
-                            break
-
-                        time.sleep(5)
-                        response = (
-                            client.apis.kubernetes.get_namespaced_custom_object(
-                                cr.metadata.name,
-                                cr.metadata.namespace,
-                                group=API_GROUP,
-                                version=KubernetesClient.get_crd_version(POSTGRES_CRD_NAME),
-                                plural=crd.plural,
-                            )
-                        )
-                        deployed_cr = CustomResource.decode(
-                            PostgresqlCustomResource, response
-                        )
-
-            else:
-                client.stdout(
-                    "Updating {0} in namespace `{1}`".format(name, namespace)
-                )
-                while not _is_instance_ready(deployed_cr):
-                    if _is_instance_in_error(deployed_cr):
-                        client.stdout(
-                            "{0} is in error state:{1}".format(
-                                cr.metadata.name,
-                                _get_error_message(deployed_cr),
-                            )
-                        )
-                        break
-
-                    time.sleep(5)
-                    response = (
-                        client.apis.kubernetes.get_namespaced_custom_object(
-                            cr.metadata.name,
-                            cr.metadata.namespace,
-                            group=API_GROUP,
-                            version=KubernetesClient.get_crd_version(POSTGRES_CRD_NAME),
-                            plural=crd.plural,
-                        )
-                    )
-                    deployed_cr = CustomResource.decode(
-                        PostgresqlCustomResource, response
-                    )
-
-            if _is_instance_ready(deployed_cr):
-                client.stdout("{0} is Ready".format(cr.metadata.name))
-
     except KubernetesError as e:
         raise CLIError(e.message)
     except Exception as e:
@@ -788,10 +646,14 @@ def postgres_server_arc_show(
         raise CLIError(e)
 
 
-def postgres_server_arc_list(client, namespace=None, use_k8s=None):
+def postgres_server_arc_list(
+    client, namespace=None, all_namespaces=None, use_k8s=None
+):
     """
     List Azure Arc enabled PostgreSQL Hyperscale server groups.
     :param client:
+    :param namespace: The Kubernetes namespace of the server groups.
+    :param all_namespaces: List the server groups of every namespace.
     :return:
     """
     try:
@@ -799,34 +661,37 @@ def postgres_server_arc_list(client, namespace=None, use_k8s=None):
             raise ValueError(USE_K8S_EXCEPTION_TEXT)
         check_and_set_kubectl_context()
 
+        if all_namespaces and namespace:
+            raise ValueError(
+                "Cannot specify both '--k8s-namespace/-k' and "
+                "'--all-namespaces/-A'."
+            )
+
         crd = _get_postgres_crd()
 
         # TODO: Support user supplied namespace when the backend supports it
         namespace = namespace or client.namespace
 
-        response = client.apis.kubernetes.list_namespaced_custom_object(
+        pages = client.apis.kubernetes.list_custom_object_pages(
             namespace,
             group=API_GROUP,
             version=KubernetesClient.get_crd_version(POSTGRES_CRD_NAME),
             plural=crd.spec.names.plural,
+            all_namespaces=all_namespaces,
         )
         # Temporary, need to discuss with PMs what standardized output we"d like for all partners
-        items = response.get("items")
-
-        result = []
-        items.sort(key=lambda i: i["kind"] + "\n" + i["metadata"]["name"])
-        for item in items:
-            cr = CustomResource.decode(PostgresqlCustomResource, item)
-            result.append(
-                {
-                    "name": cr.metadata.name,
-                    "workers": cr.spec.scale.shards,  # defaults to 0
-                    "replicas": cr.spec.scale.replicas,  # defaults to 1
-                    "state": cr.status.state,
-                }
-            )
+        entries = []
+        for items in pages:
+            for item in items:
+                entries.append(
+                    (
+                        item["kind"] + "\n" + item["metadata"]["name"],
+                        _postgres_list_entry(item, all_namespaces),
+                    )
+                )
 
-        return result
+        entries.sort(key=lambda e: e[0])
+        return [entry for _, entry in entries]
 
     except KubernetesError as e:
         raise CLIError(e.message)
@@ -834,6 +699,25 @@ def postgres_server_arc_list(client, namespace=None, use_k8s=None):
         raise CLIError(e)
 
 
+def _postgres_list_entry(item, include_namespace=False):
+    """
+    Project the listed fields of a server group straight from its raw custom
+    resource, the same way `PostgresqlCustomResource` would decode them.
+    """
+    metadata = item.get("metadata") or {}
+    scale = (item.get("spec") or {}).get("scale") or {}
+    status = item.get("status") or {}
+
+    entry = {"name": metadata.get("name")}
+    if include_namespace:
+        entry["namespace"] = metadata.get("namespace")
+    entry["workers"] = int(scale["workers"]) if "workers" in scale else None
+    entry["replicas"] = int(scale["replicas"]) if "replicas" in scale else 1
+    entry["state"] = status.get("state")
+
+    return trim_dict_entries(entry)
+
+
 def arc_postgres_endpoint_list(client, name=None, namespace=None, use_k8s=None):
     """
     List Azure Arc enabled PostgreSQL Hyperscale server groups.
@@ -1038,7 +922,7 @@ def _get_postgres_crd():
     Returns the postgresql CRD.
     :return:
     """
-    api = k8sClient.ApiextensionsV1Api()
+    api = k8sClient.ApiextensionsV1Api(get_api_client())
     crds = api.list_custom_resource_definition()
     for crd in crds.items:
         if crd.spec.names.kind == RESOURCE_KIND:
@@ -1124,11 +1008,3 @@ def _is_instance_in_error(cr):
     :return: True if the instance is in error, False otherwise
     """
     return cr.status.state is not None and cr.status.state.lower() == "error"
-
-
-def _get_error_message(cr):
-    """
-    Get error message from the status of custom resource
-    :param cr: Instance to get error message.
-    """
-    return cr.status.message
@@ -111,9 +111,13 @@ helps[
         - name: {ex1}
           text: >            
             az postgres arc-server list --k8s-namespace namespace --use-k8s
+        - name: {ex2}
+          text: >
+            az postgres arc-server list --all-namespaces --use-k8s
 """.format(
     short="List Azure Arc enabled PostgreSQL Hyperscale server groups.",
     ex1="List Azure Arc enabled PostgreSQL Hyperscale server groups.",
+    ex2="List the server groups of every namespace.",
 )
 
 helps[
@@ -4,6 +4,6 @@
 # license information.
 # ------------------------------------------------------------------------------
 
-import pkg_resources
+from pkgutil import extend_path
 
-pkg_resources.declare_namespace(__name__)
+__path__ = extend_path(__path__, __name__)
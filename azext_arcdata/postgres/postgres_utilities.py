@@ -5,6 +5,7 @@ import pydash as _
 from azext_arcdata.kubernetes_sdk.models.custom_resource import CustomResource
 from azext_arcdata.postgres.models.postgres_cr_model import PostgresqlCustomResource
 from azext_arcdata.kubernetes_sdk.client import KubernetesClient
+from azext_arcdata.kubernetes_sdk.client_pool import get_api_client
 from azext_arcdata.kubernetes_sdk.dc.constants import POSTGRES_CRD_NAME
 
 
@@ -16,7 +17,9 @@ def resolve_postgres_instances(
     desired_version=None
 ) -> list:
     
-    client = KubernetesClient .resolve_k8s_client().CustomObjectsApi()
+    client = KubernetesClient .resolve_k8s_client().CustomObjectsApi(
+        get_api_client()
+    )
 
     response = client.list_namespaced_custom_object(
         namespace=namespace,
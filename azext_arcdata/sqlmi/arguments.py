@@ -763,6 +763,39 @@ def load_arguments(self, _):
             help="The tag value of the SQL managed instance.",
         )
 
+    with ArgumentsContext(self, "sql mi-arc create-batch") as c:
+        c.argument(
+            "manifest",
+            options_list=["--manifest"],
+            help="The path to a json file with the list of SQL managed "
+            "instances to create. Each instance is an object of `sql mi-arc "
+            "create` arguments, e.g. "
+            '[{"name": "sqlmi1", "replicas": 3}, {"name": "sqlmi2"}].',
+        )
+        c.argument(
+            "concurrency",
+            options_list=["--concurrency"],
+            type=int,
+            help="The maximum number of SQL managed instances submitted in "
+            "parallel.",
+        )
+        # -- indirect --
+        c.argument(
+            "namespace",
+            options_list=["--k8s-namespace", "-k"],
+            arg_group=CLI_ARG_GROUP_INDIRECT_TEXT,
+            help="Namespace where the SQL managed instances are to be "
+            "deployed. If no namespace is specified, then the namespace "
+            "defined in the kubeconfig will be used.",
+        )
+        c.argument(
+            "use_k8s",
+            options_list=["--use-k8s"],
+            arg_group=CLI_ARG_GROUP_INDIRECT_TEXT,
+            action="store_true",
+            help="Create SQL managed instances using local Kubernetes APIs.",
+        )
+
     with ArgumentsContext(self, "sql mi-arc delete") as c:
         c.argument(
             "name",
@@ -842,6 +875,13 @@ def load_arguments(self, _):
             "If no namespace is specified, then the namespace defined "
             "in the kubeconfig will be used.",
         )
+        c.argument(
+            "all_namespaces",
+            options_list=["--all-namespaces", "-A"],
+            arg_group=CLI_ARG_GROUP_INDIRECT_TEXT,
+            action="store_true",
+            help="List the SQL managed instances of every namespace.",
+        )
         c.argument(
             "use_k8s",
             options_list=["--use-k8s"],
@@ -5,9 +5,12 @@
 # ------------------------------------------------------------------------------
 
 from azure.cli.core.commands import CliCommandType
-from azext_arcdata.sqlmi.client import beget, beget_no_namespace
+from azext_arcdata.core.client_factory import lazy_beget
 import azext_arcdata.sqlmi.validators as validators
 
+beget = lazy_beget("azext_arcdata.sqlmi.client#beget")
+beget_no_namespace = lazy_beget("azext_arcdata.sqlmi.client#beget_no_namespace")
+
 
 def load_commands(self, _):
     operations = CliCommandType(operations_tmpl="azext_arcdata.sqlmi.custom#{}")
@@ -21,6 +24,12 @@ def load_commands(self, _):
             supports_no_wait=True,
             validator=validators.validate_create,
         )
+        g.command(
+            "create-batch",
+            "arc_sql_mi_create_batch",
+            supports_no_wait=True,
+            validator=validators.validate_create_batch,
+        )
         g.command(
             "upgrade",
             "arc_sql_mi_upgrade",
@@ -249,3 +249,18 @@ DAG_ROLES_ALLOWED_VALUES_MSG_UPDATE = (
         DAG_ROLE_FORCE_SECONDARY,
     )
 )
+
+SQLMI_BATCH_CREATE_MAX_WORKERS = 8
+"""
+Default number of SQL managed instances submitted in parallel by
+`sql mi-arc create-batch`.
+"""
+
+SQLMI_BATCH_CREATE_DIRECT_ARGS = [
+    "location",
+    "custom_location",
+    "resource_group",
+]
+"""
+Direct mode arguments of `sql mi-arc create` that a batch manifest may not set.
+"""
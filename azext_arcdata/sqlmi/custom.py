@@ -11,6 +11,7 @@ import re
 import shutil
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 import azext_arcdata.core.kubernetes as kubernetes_util
@@ -35,6 +36,7 @@ from azext_arcdata.core.util import (
     is_windows,
     retry,
     parse_cert_files,
+    trim_dict_entries,
 )
 from azext_arcdata.kubernetes_sdk.util import (
     validate_certificate_secret,
@@ -54,6 +56,7 @@ from azext_arcdata.kubernetes_sdk.client import (
     http_status_codes,
 )
 from azext_arcdata.kubernetes_sdk.models.custom_resource import CustomResource
+from azext_arcdata.kubernetes_sdk.waiter import wait_for_custom_resources
 from azext_arcdata.kubernetes_sdk.models.data_controller_custom_resource import (
     DataControllerCustomResource,
 )
@@ -72,6 +75,8 @@ from azext_arcdata.sqlmi.constants import (
     SQLMI_TIER_BUSINESS_CRITICAL_SHORT,
     SQLMI_TIER_DEFAULT,
     SQLMI_TIER_GENERAL_PURPOSE,
+    SQLMI_BATCH_CREATE_DIRECT_ARGS,
+    SQLMI_BATCH_CREATE_MAX_WORKERS,
     DAG_ROLES_ALLOWED_VALUES_MSG_CREATE,
     DAG_ROLES_ALLOWED_VALUES_MSG_UPDATE,
 )
@@ -93,6 +98,7 @@ from azext_arcdata.sqlmi.util import (
 from humanfriendly.terminal.spinners import AutomaticSpinner
 from knack.cli import CLIError
 from knack.log import get_logger
+from tabulate import tabulate
 from urllib3.exceptions import MaxRetryError, NewConnectionError
 
 logger = get_logger(__name__)
@@ -229,93 +235,69 @@ def arc_sql_mi_create(
         check_and_set_kubectl_context()
         namespace = client.namespace
 
-        rd = 7 if retention_days is None else retention_days
-        # Determine source for the resource spec preferring path first
-        #
-        if not path:
-            # TODO: Use mutating web hooks to set these default values
-            #
-            spec_object = {
-                "apiVersion": API_GROUP
-                + "/"
-                + KubernetesClient.get_crd_version(SQLMI_CRD_NAME),
-                "kind": RESOURCE_KIND,
-                "metadata": {},
-                "spec": {
-                    "backup": {
-                        "retentionPeriodInDays": rd,
-                    },
-                    "tier": SQLMI_TIER_DEFAULT,
-                    "licenseType": SQLMI_LICENSE_TYPE_DEFAULT,
-                    "storage": {
-                        "data": {"volumes": [{"size": "5Gi"}]},
-                        "logs": {"volumes": [{"size": "5Gi"}]},
-                    },
-                },
-            }
+        cr, mssql_secret = _build_sql_mi_cr(client, namespace, args)
+        _submit_sql_mi_cr(client, cr, mssql_secret, args)
 
-        # Otherwise, use the provided azext_arcdata file.
-        #
+        if no_wait:
+            client.stdout(
+                "Deployed {0} in namespace `{1}`. Please use `az sql mi-arc "
+                "show -n {0} --k8s-namespace {1} --use-k8s` to check its "
+                "status.".format(cr.metadata.name, cr.metadata.namespace)
+            )
         else:
-            spec_object = FileUtil.read_json(path)
+            wait_for_custom_resources(
+                client,
+                cr.metadata.name,
+                cr.metadata.namespace,
+                group=API_GROUP,
+                version=KubernetesClient.get_crd_version(SQLMI_CRD_NAME),
+                plural=RESOURCE_KIND_PLURAL,
+                cr_type=SqlmiCustomResource,
+                is_ready=_is_instance_ready,
+                is_in_error=_is_instance_in_error,
+                activity="Deploying",
+            )
 
-        # Decode base spec and apply args. Must patch namespace in separately
-        # since it's not parameterized in this func
-        cr = CustomResource.decode(SqlmiCustomResource, spec_object)
-        cr.metadata.namespace = namespace
-        cr.apply_args(**args)
-        cr.validate(client.apis.kubernetes)
+    except KubernetesError as e:
+        raise SqlmiError(e.message)
+    except ValueError as e:
+        raise CLIError(e)
+    except Exception as e:
+        raise CLIError(e)
 
-        logger.debug("Using --dev == '%s'", cr.spec.dev)
 
-        # If tier is provided and not replicas, then default replicas based on
-        #  given tier value
-        #
-        if tier:
-            if not replicas:
-                if (tier == SQLMI_TIER_BUSINESS_CRITICAL) or (
-                    tier == SQLMI_TIER_BUSINESS_CRITICAL_SHORT
-                ):
-                    cr.spec.replicas = 3
-
-        if replicas:
-            try:
-                cr.spec.replicas = int(replicas)
+def arc_sql_mi_create_batch(
+    client,
+    manifest,
+    concurrency=None,
+    no_wait=False,
+    # -- indirect --
+    namespace=None,
+    use_k8s=None,
+):
+    """
+    Create a batch of SQL managed instances from a manifest.
+    """
+    start = time.time()
 
-                # Set the tier based on specfied replicas. With fail safe
-                # validation enabled, it will go in error if user specifies
-                # incorrect value.
-                #
-                if not tier:
-                    if cr.spec.replicas == 1:
-                        cr.spec.tier = SQLMI_TIER_GENERAL_PURPOSE
-                    else:
-                        cr.spec.tier = SQLMI_TIER_BUSINESS_CRITICAL
-            except ValueError as e:
-                raise CLIError(e)
+    try:
+        if not use_k8s:
+            raise ValueError(USE_K8S_EXCEPTION_TEXT)
 
-        if storage_class_backups is not None:
-            kubernetes_util.validate_rwx_storage_class(
-                name=storage_class_backups, type="backup", instanceType="SQLMI"
-            )
+        check_and_set_kubectl_context()
+        namespace = client.namespace
+        instances = _read_sql_mi_batch_manifest(manifest)
 
-        # if readable_secondaries is not set. use default value
+        # -- Validate every instance before anything is created --
         #
-        if readable_secondaries is None:
-            cr.spec.readableSecondaries = min(cr.spec.replicas - 1, 1)
-
-        validate_labels_and_annotations(
-            labels,
-            annotations,
-            service_labels,
-            service_annotations,
-            storage_labels,
-            storage_annotations,
-        )
+        dcs = None
+        if not all(args["noexternal_endpoint"] for args in instances):
+            dcs = _list_data_controllers(client, namespace)
+            if dcs and not os.environ.get(FEATURE_FLAG_RESOURCE_SYNC):
+                is_valid_connectivity_mode(client)
 
-        custom_object_exists = retry(
-            lambda: client.apis.kubernetes.namespaced_custom_object_exists(
-                name,
+        response = retry(
+            lambda: client.apis.kubernetes.list_namespaced_custom_object(
                 namespace,
                 group=API_GROUP,
                 version=KubernetesClient.get_crd_version(SQLMI_CRD_NAME),
@@ -323,281 +305,486 @@ def arc_sql_mi_create(
             ),
             retry_count=CONNECTION_RETRY_ATTEMPTS,
             retry_delay=RETRY_INTERVAL,
-            retry_method="get namespaced custom object",
+            retry_method="list namespaced custom object",
             retry_on_exceptions=(
                 NewConnectionError,
                 MaxRetryError,
-                KubernetesError,
+                K8sApiException,
             ),
         )
-        if custom_object_exists:
+        existing = set(
+            item["metadata"]["name"] for item in response.get("items", [])
+        )
+
+        builds = []
+        errors = []
+        for args in instances:
+            name = args["name"]
+            try:
+                if name in existing:
+                    raise ValueError(
+                        "Arc SQL managed instance `{}` already exists in "
+                        "namespace `{}`.".format(name, namespace)
+                    )
+
+                cr, mssql_secret = _build_sql_mi_cr(
+                    client, namespace, args, dcs=dcs, check_exists=False
+                )
+                builds.append((cr, mssql_secret, args))
+            except Exception as e:
+                errors.append("{0}: {1}".format(name, e))
+
+        if errors:
             raise ValueError(
-                "Arc SQL managed instance `{}` already exists in namespace "
-                "`{}`.".format(name, namespace)
+                "No SQL managed instance was created, the manifest has "
+                "invalid instances:\n" + "\n".join(errors)
             )
 
-        # Validate Active Directory args if enabling AD auth
+        # -- Submit every instance in parallel --
         #
-        if ad_connector_name:
-
-            # Note: might not be equal in a cross-namespace scenario
-            #
-            ad_connector_namespace = namespace
+        results = {
+            args["name"]: {"state": "Pending", "message": ""}
+            for args in instances
+        }
 
-            validate_ad_connector(
-                client.apis.kubernetes,
-                ad_connector_name,
-                ad_connector_namespace,
+        with ThreadPoolExecutor(
+            max_workers=max(1, concurrency or SQLMI_BATCH_CREATE_MAX_WORKERS)
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _submit_sql_mi_cr, client, cr, mssql_secret, args
+                ): cr.metadata.name
+                for cr, mssql_secret, args in builds
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    future.result()
+                    results[name]["state"] = "Submitted"
+                except Exception as e:
+                    results[name]["state"] = "Failed"
+                    results[name]["message"] = str(e)
+
+        # -- Wait for all submitted instances at once --
+        #
+        submitted = [
+            name
+            for name, result in results.items()
+            if result["state"] == "Submitted"
+        ]
+        if submitted and not no_wait:
+            crs = wait_for_custom_resources(
+                client,
+                submitted,
                 namespace,
-                keytab_secret,
+                group=API_GROUP,
+                version=KubernetesClient.get_crd_version(SQLMI_CRD_NAME),
+                plural=RESOURCE_KIND_PLURAL,
+                cr_type=SqlmiCustomResource,
+                is_ready=_is_instance_ready,
+                is_in_error=_is_instance_in_error,
+                activity="Deploying",
             )
-
-        if not noexternal_endpoint:
-            response = retry(
-                lambda: client.apis.kubernetes.list_namespaced_custom_object(
-                    namespace,
-                    group=ARC_GROUP,
-                    version=KubernetesClient.get_crd_version(
-                        DATA_CONTROLLER_CRD_NAME
-                    ),
-                    plural=DATA_CONTROLLER_PLURAL,
-                ),
-                retry_count=CONNECTION_RETRY_ATTEMPTS,
-                retry_delay=RETRY_INTERVAL,
-                retry_method="list namespaced custom object",
-                retry_on_exceptions=(
-                    NewConnectionError,
-                    MaxRetryError,
-                    K8sApiException,
-                ),
+            for name, cr in crs.items():
+                results[name]["state"] = cr.status.state or "Unknown"
+                if _is_instance_in_error(cr):
+                    results[name]["message"] = cr.status.message or ""
+
+        failed = [
+            name
+            for name, result in results.items()
+            if result["state"].lower() in ["failed", "error"]
+        ]
+
+        client.stdout("")
+        client.stdout(
+            tabulate(
+                [
+                    [name, result["state"], result["message"]]
+                    for name, result in results.items()
+                ],
+                ["Name", "State", "Message"],
+            )
+        )
+        client.stdout("")
+        client.stdout(
+            "{0} of {1} SQL managed instances {2} in namespace `{3}` in "
+            "{4:.1f}s.".format(
+                len(results) - len(failed),
+                len(results),
+                "submitted" if no_wait else "created",
+                namespace,
+                time.time() - start,
             )
+        )
 
-            dcs = response.get("items")
-            if not dcs:
-                raise CLIError(
-                    "No data controller exists in namespace `{}`. Cannot set "
-                    "external endpoint argument.".format(namespace)
+        if failed:
+            raise CLIError(
+                "Failed to create SQL managed instances: {}".format(
+                    ", ".join(failed)
                 )
-            else:
-                if not os.environ.get(FEATURE_FLAG_RESOURCE_SYNC):
-                    is_valid_connectivity_mode(client)
+            )
 
-                dc_cr = CustomResource.decode(
-                    DataControllerCustomResource, dcs[0]
-                )
-                cr.spec.services.primary.serviceType = (
-                    dc_cr.get_controller_service().serviceType
-                )
+    except KubernetesError as e:
+        raise SqlmiError(e.message)
+    except ValueError as e:
+        raise CLIError(e)
+    except Exception as e:
+        raise CLIError(e)
 
-        # Create admin login secret
-        #
-        if not admin_login_secret:
-            # Use default secret name when the user does not provide one.
-            #
-            admin_login_secret = name + "-login-secret"
 
-        # Stamp the secret name on the custom resource.
-        #
-        cr.spec.security.adminLoginSecret = admin_login_secret
+def _read_sql_mi_batch_manifest(manifest):
+    """
+    Read the instances of a `sql mi-arc create-batch` manifest. The manifest
+    is a json list, or an object with an `instances` list, of the
+    `sql mi-arc create` arguments of each instance, e.g.
+    `[{"name": "sqlmi1", "replicas": 3}, {"name": "sqlmi2"}]`.
+    :param manifest: The path to the manifest file.
+    :return: The complete `arc_sql_mi_create` arguments of each instance.
+    """
+    import inspect
+
+    instances = FileUtil.read_json(manifest)
+    if isinstance(instances, dict):
+        instances = instances.get("instances")
 
-        login_secret_exists = check_secret_exists_with_retries(
-            client.apis.kubernetes, cr.metadata.namespace, admin_login_secret
+    if not isinstance(instances, list) or not instances:
+        raise ValueError(
+            "The manifest `{}` must contain a list of SQL managed "
+            "instances.".format(manifest)
         )
 
-        if login_secret_exists:
-            # Validate that the existing login secret has correct format.
-            #
-            validate_admin_login_secret(
-                client, cr.metadata.namespace, admin_login_secret
+    parameters = inspect.signature(arc_sql_mi_create).parameters
+    defaults = {
+        key: parameter.default
+        for key, parameter in parameters.items()
+        if parameter.default is not inspect.Parameter.empty
+    }
+    allowed = set(defaults.keys()) - set(
+        SQLMI_BATCH_CREATE_DIRECT_ARGS + ["namespace", "use_k8s", "no_wait"]
+    )
+    allowed.add("name")
+
+    result = []
+    names = set()
+    for i, instance in enumerate(instances):
+        if not isinstance(instance, dict) or not instance.get("name"):
+            raise ValueError(
+                "Instance {} of the manifest has no name.".format(i)
             )
-        else:
-            username, pw = _get_user_pass(client, name)
-
-            secrets = dict()
-            encoding = "utf-8"
-            secrets["secretName"] = admin_login_secret
-            secrets["base64Username"] = base64.b64encode(
-                bytes(username, encoding)
-            ).decode(encoding)
-            secrets["base64Password"] = base64.b64encode(
-                bytes(pw, encoding)
-            ).decode(encoding)
-            temp = get_config_from_template(
-                os.path.join(
-                    os.path.dirname(os.path.realpath(__file__)),
-                    "templates",
-                    "useradmin-login.yaml.tmpl",
-                ),
-                secrets,
+
+        unknown = sorted(set(instance.keys()) - allowed)
+        if unknown:
+            raise ValueError(
+                "Instance `{0}` of the manifest has unsupported arguments: "
+                "{1}".format(instance["name"], ", ".join(unknown))
             )
-            mssql_secret = yaml.safe_load(temp)
 
-            try:
-                retry(
-                    lambda: client.apis.kubernetes.create_secret(
-                        cr.metadata.namespace,
-                        mssql_secret,
-                        ignore_conflict=True,
-                    ),
-                    retry_count=CONNECTION_RETRY_ATTEMPTS,
-                    retry_delay=RETRY_INTERVAL,
-                    retry_method="create secret",
-                    retry_on_exceptions=(
-                        NewConnectionError,
-                        MaxRetryError,
-                        K8sApiException,
-                    ),
+        if instance["name"] in names:
+            raise ValueError(
+                "Instance `{}` appears more than once in the manifest.".format(
+                    instance["name"]
                 )
+            )
+        names.add(instance["name"])
 
-            except K8sApiException as e:
-                if e.status != http_status_codes.conflict:
-                    raise
+        args = dict(defaults)
+        args.update(instance)
+        result.append(args)
 
-        # Create service certificate based on parameters
+    return result
+
+
+def _build_sql_mi_cr(client, namespace, args, dcs=None, check_exists=True):
+    """
+    Build and validate the custom resource of a SQL managed instance to be
+    created in `namespace`, without changing anything in the cluster.
+    :param client: The CLI client.
+    :param namespace: The namespace the instance is created in.
+    :param args: The `arc_sql_mi_create` arguments of the instance.
+    :param dcs: The data controllers of the namespace when already listed, in
+    which case the connectivity mode is expected to be validated already.
+    :param check_exists: Whether to check that the instance does not exist.
+    :return: The custom resource and the admin login secret to create, None
+    when the secret already exists.
+    """
+    name = args["name"]
+    path = args["path"]
+    replicas = args["replicas"]
+    tier = args["tier"]
+    admin_login_secret = args["admin_login_secret"]
+
+    rd = 7 if args["retention_days"] is None else args["retention_days"]
+    # Determine source for the resource spec preferring path first
+    #
+    if not path:
+        # TODO: Use mutating web hooks to set these default values
         #
-        _create_service_certificate(
-            client,
-            cr,
-            name,
-            certificate_public_key_file,
-            certificate_private_key_file,
-            service_certificate_secret,
+        spec_object = {
+            "apiVersion": API_GROUP
+            + "/"
+            + KubernetesClient.get_crd_version(SQLMI_CRD_NAME),
+            "kind": RESOURCE_KIND,
+            "metadata": {},
+            "spec": {
+                "backup": {
+                    "retentionPeriodInDays": rd,
+                },
+                "tier": SQLMI_TIER_DEFAULT,
+                "licenseType": SQLMI_LICENSE_TYPE_DEFAULT,
+                "storage": {
+                    "data": {"volumes": [{"size": "5Gi"}]},
+                    "logs": {"volumes": [{"size": "5Gi"}]},
+                },
+            },
+        }
+
+    # Otherwise, use the provided azext_arcdata file.
+    #
+    else:
+        spec_object = FileUtil.read_json(path)
+
+    # Decode base spec and apply args. Must patch namespace in separately
+    # since it's not parameterized in this func
+    cr = CustomResource.decode(SqlmiCustomResource, spec_object)
+    cr.metadata.namespace = namespace
+    cr.apply_args(**args)
+    cr.validate(client.apis.kubernetes)
+
+    logger.debug("Using --dev == '%s'", cr.spec.dev)
+
+    # If tier is provided and not replicas, then default replicas based on
+    #  given tier value
+    #
+    if tier:
+        if not replicas:
+            if (tier == SQLMI_TIER_BUSINESS_CRITICAL) or (
+                tier == SQLMI_TIER_BUSINESS_CRITICAL_SHORT
+            ):
+                cr.spec.replicas = 3
+
+    if replicas:
+        try:
+            cr.spec.replicas = int(replicas)
+
+            # Set the tier based on specfied replicas. With fail safe
+            # validation enabled, it will go in error if user specifies
+            # incorrect value.
+            #
+            if not tier:
+                if cr.spec.replicas == 1:
+                    cr.spec.tier = SQLMI_TIER_GENERAL_PURPOSE
+                else:
+                    cr.spec.tier = SQLMI_TIER_BUSINESS_CRITICAL
+        except ValueError as e:
+            raise CLIError(e)
+
+    if args["storage_class_backups"] is not None:
+        kubernetes_util.validate_rwx_storage_class(
+            name=args["storage_class_backups"],
+            type="backup",
+            instanceType="SQLMI",
         )
 
-        # Create custom resource.
-        #
-        retry(
-            lambda: client.apis.kubernetes.create_namespaced_custom_object(
-                cr=cr, plural=RESOURCE_KIND_PLURAL, ignore_conflict=True
+    # if readable_secondaries is not set. use default value
+    #
+    if args["readable_secondaries"] is None:
+        cr.spec.readableSecondaries = min(cr.spec.replicas - 1, 1)
+
+    validate_labels_and_annotations(
+        args["labels"],
+        args["annotations"],
+        args["service_labels"],
+        args["service_annotations"],
+        args["storage_labels"],
+        args["storage_annotations"],
+    )
+
+    if check_exists:
+        custom_object_exists = retry(
+            lambda: client.apis.kubernetes.namespaced_custom_object_exists(
+                name,
+                namespace,
+                group=API_GROUP,
+                version=KubernetesClient.get_crd_version(SQLMI_CRD_NAME),
+                plural=RESOURCE_KIND_PLURAL,
             ),
             retry_count=CONNECTION_RETRY_ATTEMPTS,
             retry_delay=RETRY_INTERVAL,
-            retry_method="create namespaced custom object",
+            retry_method="get namespaced custom object",
             retry_on_exceptions=(
                 NewConnectionError,
                 MaxRetryError,
                 KubernetesError,
             ),
         )
+        if custom_object_exists:
+            raise ValueError(
+                "Arc SQL managed instance `{}` already exists in namespace "
+                "`{}`.".format(name, namespace)
+            )
 
-        if no_wait:
-            client.stdout(
-                "Deployed {0} in namespace `{1}`. Please use `az sql mi-arc "
-                "show -n {0} --k8s-namespace {1} --use-k8s` to check its "
-                "status.".format(cr.metadata.name, cr.metadata.namespace)
+    # Validate Active Directory args if enabling AD auth
+    #
+    if args["ad_connector_name"]:
+
+        # Note: might not be equal in a cross-namespace scenario
+        #
+        ad_connector_namespace = namespace
+
+        validate_ad_connector(
+            client.apis.kubernetes,
+            args["ad_connector_name"],
+            ad_connector_namespace,
+            namespace,
+            args["keytab_secret"],
+        )
+
+    if not args["noexternal_endpoint"]:
+        validate_connectivity_mode = dcs is None
+        if dcs is None:
+            dcs = _list_data_controllers(client, namespace)
+
+        if not dcs:
+            raise CLIError(
+                "No data controller exists in namespace `{}`. Cannot set "
+                "external endpoint argument.".format(namespace)
             )
         else:
-            response = retry(
-                lambda: client.apis.kubernetes.get_namespaced_custom_object(
-                    cr.metadata.name,
+            if validate_connectivity_mode and not os.environ.get(
+                FEATURE_FLAG_RESOURCE_SYNC
+            ):
+                is_valid_connectivity_mode(client)
+
+            dc_cr = CustomResource.decode(DataControllerCustomResource, dcs[0])
+            cr.spec.services.primary.serviceType = (
+                dc_cr.get_controller_service().serviceType
+            )
+
+    # Create admin login secret
+    #
+    if not admin_login_secret:
+        # Use default secret name when the user does not provide one.
+        #
+        admin_login_secret = name + "-login-secret"
+
+    # Stamp the secret name on the custom resource.
+    #
+    cr.spec.security.adminLoginSecret = admin_login_secret
+
+    login_secret_exists = check_secret_exists_with_retries(
+        client.apis.kubernetes, cr.metadata.namespace, admin_login_secret
+    )
+
+    if login_secret_exists:
+        # Validate that the existing login secret has correct format.
+        #
+        validate_admin_login_secret(
+            client, cr.metadata.namespace, admin_login_secret
+        )
+        return cr, None
+
+    username, pw = _get_user_pass(client, name)
+
+    secrets = dict()
+    encoding = "utf-8"
+    secrets["secretName"] = admin_login_secret
+    secrets["base64Username"] = base64.b64encode(
+        bytes(username, encoding)
+    ).decode(encoding)
+    secrets["base64Password"] = base64.b64encode(bytes(pw, encoding)).decode(
+        encoding
+    )
+    temp = get_config_from_template(
+        os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "templates",
+            "useradmin-login.yaml.tmpl",
+        ),
+        secrets,
+    )
+
+    return cr, yaml.safe_load(temp)
+
+
+def _submit_sql_mi_cr(client, cr, mssql_secret, args):
+    """
+    Create the admin login secret, the service certificate and the custom
+    resource of a SQL managed instance built by `_build_sql_mi_cr`.
+    :param client: The CLI client.
+    :param cr: The custom resource of the instance.
+    :param mssql_secret: The admin login secret to create, if any.
+    :param args: The `arc_sql_mi_create` arguments of the instance.
+    """
+    if mssql_secret:
+        try:
+            retry(
+                lambda: client.apis.kubernetes.create_secret(
                     cr.metadata.namespace,
-                    group=API_GROUP,
-                    version=KubernetesClient.get_crd_version(SQLMI_CRD_NAME),
-                    plural=RESOURCE_KIND_PLURAL,
+                    mssql_secret,
+                    ignore_conflict=True,
                 ),
                 retry_count=CONNECTION_RETRY_ATTEMPTS,
                 retry_delay=RETRY_INTERVAL,
-                retry_method="get namespaced custom object",
+                retry_method="create secret",
                 retry_on_exceptions=(
                     NewConnectionError,
                     MaxRetryError,
-                    KubernetesError,
+                    K8sApiException,
                 ),
             )
-            deployed_cr = CustomResource.decode(SqlmiCustomResource, response)
-            get_namespaced_custom_object = (
-                client.apis.kubernetes.get_namespaced_custom_object
-            )
 
-            if not is_windows():
-                with AutomaticSpinner(
-                    "Deploying {0} in namespace `{1}`".format(
-                        cr.metadata.name, cr.metadata.namespace
-                    ),
-                    show_time=True,
-                ):
-                    while not _is_instance_ready(deployed_cr):
-                        if _is_instance_in_error(deployed_cr):
-                            client.stdout(
-                                "{0} is in error state: {1}".format(
-                                    cr.metadata.name,
-                                    _get_error_message(deployed_cr),
-                                )
-                            )
-                            break
+        except K8sApiException as e:
+            if e.status != http_status_codes.conflict:
+                raise
 
-                        time.sleep(5)
-                        response = retry(
-                            lambda: get_namespaced_custom_object(
-                                cr.metadata.name,
-                                cr.metadata.namespace,
-                                group=API_GROUP,
-                                version=KubernetesClient.get_crd_version(
-                                    SQLMI_CRD_NAME
-                                ),
-                                plural=RESOURCE_KIND_PLURAL,
-                            ),
-                            retry_count=CONNECTION_RETRY_ATTEMPTS,
-                            retry_delay=RETRY_INTERVAL,
-                            retry_method="get namespaced custom object",
-                            retry_on_exceptions=(
-                                NewConnectionError,
-                                MaxRetryError,
-                                KubernetesError,
-                            ),
-                        )
-
-                        deployed_cr = CustomResource.decode(
-                            SqlmiCustomResource, response
-                        )
-            else:
-                client.stdout(
-                    "Deploying {0} in namespace `{1}`".format(name, namespace)
-                )
-                while not _is_instance_ready(deployed_cr):
-                    if _is_instance_in_error(deployed_cr):
-                        client.stdout(
-                            "{0} is in error state: {1}".format(
-                                cr.metadata.name,
-                                _get_error_message(deployed_cr),
-                            )
-                        )
-                        break
-
-                    time.sleep(5)
-                    response = retry(
-                        lambda: get_namespaced_custom_object(
-                            cr.metadata.name,
-                            cr.metadata.namespace,
-                            group=API_GROUP,
-                            version=KubernetesClient.get_crd_version(
-                                SQLMI_CRD_NAME
-                            ),
-                            plural=RESOURCE_KIND_PLURAL,
-                        ),
-                        retry_count=CONNECTION_RETRY_ATTEMPTS,
-                        retry_delay=RETRY_INTERVAL,
-                        retry_method="get namespaced custom object",
-                        retry_on_exceptions=(
-                            NewConnectionError,
-                            MaxRetryError,
-                            KubernetesError,
-                        ),
-                    )
+    # Create service certificate based on parameters
+    #
+    _create_service_certificate(
+        client,
+        cr,
+        cr.metadata.name,
+        args["certificate_public_key_file"],
+        args["certificate_private_key_file"],
+        args["service_certificate_secret"],
+    )
 
-                    deployed_cr = CustomResource.decode(
-                        SqlmiCustomResource, response
-                    )
+    # Create custom resource.
+    #
+    retry(
+        lambda: client.apis.kubernetes.create_namespaced_custom_object(
+            cr=cr, plural=RESOURCE_KIND_PLURAL, ignore_conflict=True
+        ),
+        retry_count=CONNECTION_RETRY_ATTEMPTS,
+        retry_delay=RETRY_INTERVAL,
+        retry_method="create namespaced custom object",
+        retry_on_exceptions=(
+            NewConnectionError,
+            MaxRetryError,
+            KubernetesError,
+        ),
+    )
 
-            if _is_instance_ready(deployed_cr):
-                client.stdout("{0} is Ready".format(cr.metadata.name))
 
-    except KubernetesError as e:
-        raise SqlmiError(e.message)
-    except ValueError as e:
-        raise CLIError(e)
-    except Exception as e:
-        raise CLIError(e)
+def _list_data_controllers(client, namespace):
+    response = retry(
+        lambda: client.apis.kubernetes.list_namespaced_custom_object(
+            namespace,
+            group=ARC_GROUP,
+            version=KubernetesClient.get_crd_version(DATA_CONTROLLER_CRD_NAME),
+            plural=DATA_CONTROLLER_PLURAL,
+        ),
+        retry_count=CONNECTION_RETRY_ATTEMPTS,
+        retry_delay=RETRY_INTERVAL,
+        retry_method="list namespaced custom object",
+        retry_on_exceptions=(
+            NewConnectionError,
+            MaxRetryError,
+            K8sApiException,
+        ),
+    )
+
+    return response.get("items")
 
 
 def arc_sql_mi_upgrade(
@@ -916,79 +1103,18 @@ def arc_sql_mi_update(
                 "its status.".format(cr.metadata.name, cr.metadata.namespace)
             )
         else:
-            response = client.apis.kubernetes.get_namespaced_custom_object(
+            wait_for_custom_resources(
+                client,
                 cr.metadata.name,
                 cr.metadata.namespace,
                 group=API_GROUP,
                 version=KubernetesClient.get_crd_version(SQLMI_CRD_NAME),
                 plural=RESOURCE_KIND_PLURAL,
+                cr_type=SqlmiCustomResource,
+                is_ready=_is_instance_ready,
+                is_in_error=_is_instance_in_error,
+                activity="Updating",
             )
-            deployed_cr = CustomResource.decode(SqlmiCustomResource, response)
-
-            if not is_windows():
-                with AutomaticSpinner(
-                    "Updating {0} in namespace `{1}`".format(
-                        cr.metadata.name, cr.metadata.namespace
-                    ),
-                    show_time=True,
-                ):
-                    while not _is_instance_ready(deployed_cr):
-                        if _is_instance_in_error(deployed_cr):
-                            client.stdout(
-                                "{0} is in error state:{1}".format(
-                                    cr.metadata.name,
-                                    _get_error_message(deployed_cr),
-                                )
-                            )
-                            break
-
-                        time.sleep(5)
-                        response = (
-                            client.apis.kubernetes.get_namespaced_custom_object(
-                                cr.metadata.name,
-                                cr.metadata.namespace,
-                                group=API_GROUP,
-                                version=KubernetesClient.get_crd_version(
-                                    SQLMI_CRD_NAME
-                                ),
-                                plural=RESOURCE_KIND_PLURAL,
-                            )
-                        )
-                        deployed_cr = CustomResource.decode(
-                            SqlmiCustomResource, response
-                        )
-            else:
-                client.stdout(
-                    "Updating {0} in namespace `{1}`".format(name, namespace)
-                )
-                while not _is_instance_ready(deployed_cr):
-                    if _is_instance_in_error(deployed_cr):
-                        client.stdout(
-                            "{0} is in error state:{1}".format(
-                                cr.metadata.name,
-                                _get_error_message(deployed_cr),
-                            )
-                        )
-                        break
-
-                    time.sleep(5)
-                    response = (
-                        client.apis.kubernetes.get_namespaced_custom_object(
-                            cr.metadata.name,
-                            cr.metadata.namespace,
-                            group=API_GROUP,
-                            version=KubernetesClient.get_crd_version(
-                                SQLMI_CRD_NAME
-                            ),
-                            plural=RESOURCE_KIND_PLURAL,
-                        )
-                    )
-                    deployed_cr = CustomResource.decode(
-                        SqlmiCustomResource, response
-                    )
-
-            if _is_instance_ready(deployed_cr):
-                client.stdout("{0} is Ready".format(cr.metadata.name))
 
     except KubernetesError as e:
         raise SqlmiError(e.message)
@@ -1140,7 +1266,13 @@ def arc_sql_mi_getmirroringcert(
         raise CLIError(e)
 
 
-def arc_sql_mi_list(client, resource_group=None, namespace=None, use_k8s=None):
+def arc_sql_mi_list(
+    client,
+    resource_group=None,
+    namespace=None,
+    all_namespaces=None,
+    use_k8s=None,
+):
     """
     List SQL managed instances.
     """
@@ -1159,27 +1291,18 @@ def arc_sql_mi_list(client, resource_group=None, namespace=None, use_k8s=None):
             check_and_set_kubectl_context()
             namespace = namespace or client.namespace
 
-            response = client.apis.kubernetes.list_namespaced_custom_object(
+            pages = client.apis.kubernetes.list_custom_object_pages(
                 namespace,
                 group=API_GROUP,
                 version=KubernetesClient.get_crd_version(SQLMI_CRD_NAME),
                 plural=RESOURCE_KIND_PLURAL,
+                all_namespaces=all_namespaces,
             )
-            items = response.get("items")
             # Temporary, need to discuss what the intended structure is across
             # partners
-            for item in items:
-                cr = CustomResource.decode(SqlmiCustomResource, item)
-                result.append(
-                    {
-                        "name": cr.metadata.name,
-                        "primaryEndpoint": cr.status.endpoints.primary
-                        if cr.status.endpoints
-                        else cr.status.primaryEndpoint,
-                        "replicas": cr.status.readyReplicas,
-                        "state": cr.status.state,
-                    }
-                )
+            for items in pages:
+                for item in items:
+                    result.append(_sqlmi_list_entry(item, all_namespaces))
 
         return result
 
@@ -1189,6 +1312,29 @@ def arc_sql_mi_list(client, resource_group=None, namespace=None, use_k8s=None):
         raise CLIError(e)
 
 
+def _sqlmi_list_entry(item, include_namespace=False):
+    """
+    Project the listed fields of a SQL managed instance straight from its raw
+    custom resource, the same way `SqlmiCustomResource` would decode them.
+    """
+    metadata = item.get("metadata") or {}
+    status = item.get("status") or {}
+
+    if "endpoints" in status:
+        primary_endpoint = (status["endpoints"] or {}).get("primary")
+    else:
+        primary_endpoint = status.get("primaryEndpoint")
+
+    entry = {"name": metadata.get("name")}
+    if include_namespace:
+        entry["namespace"] = metadata.get("namespace")
+    entry["primaryEndpoint"] = primary_endpoint
+    entry["replicas"] = status.get("readyReplicas")
+    entry["state"] = status.get("state")
+
+    return trim_dict_entries(entry)
+
+
 def arc_sql_endpoint_list(client, name=None, namespace=None, use_k8s=None):
     """
     List endpoints for the given SQL managed instance(s).
@@ -1510,69 +1656,18 @@ def arc_sql_mi_fog_update(
 
         time.sleep(5)
 
-        response = client.apis.kubernetes.get_namespaced_custom_object(
+        wait_for_custom_resources(
+            client,
             name,
             namespace,
             group=FOG_API_GROUP,
             version=FOG_API_VERSION,
             plural=FOG_RESOURCE_KIND_PLURAL,
+            cr_type=FogCustomResource,
+            is_ready=_is_dag_ready,
+            is_in_error=_is_dag_in_error,
+            activity="Updating",
         )
-        deployed_cr = CustomResource.decode(FogCustomResource, response)
-
-        if not is_windows():
-            with AutomaticSpinner(
-                "Updating {0} in namespace `{1}`".format(name, namespace),
-                show_time=True,
-            ):
-                while not _is_dag_ready(deployed_cr):
-                    if _is_dag_in_error(deployed_cr):
-                        client.stdout(
-                            "{0} is in error state:{1}".format(
-                                name,
-                                _get_error_message(deployed_cr),
-                            )
-                        )
-                        break
-
-                    time.sleep(5)
-                    response = (
-                        client.apis.kubernetes.get_namespaced_custom_object(
-                            name,
-                            namespace,
-                            group=FOG_API_GROUP,
-                            version=FOG_API_VERSION,
-                            plural=FOG_RESOURCE_KIND_PLURAL,
-                        )
-                    )
-                    deployed_cr = CustomResource.decode(
-                        FogCustomResource, response
-                    )
-        else:
-            client.stdout(
-                "Updating {0} in namespace `{1}`".format(name, namespace)
-            )
-            while not _is_dag_ready(deployed_cr):
-                if _is_dag_in_error(deployed_cr):
-                    client.stdout(
-                        "{0} is in error state:{1}".format(
-                            name,
-                            _get_error_message(deployed_cr),
-                        )
-                    )
-                    break
-
-                time.sleep(5)
-                response = client.apis.kubernetes.get_namespaced_custom_object(
-                    name,
-                    namespace,
-                    group=FOG_API_GROUP,
-                    version=FOG_API_VERSION,
-                    plural=FOG_RESOURCE_KIND_PLURAL,
-                )
-                deployed_cr = CustomResource.decode(FogCustomResource, response)
-
-        if _is_dag_ready(deployed_cr):
-            client.stdout("{0} is Ready".format(name))
 
     except Exception as e:
         raise CLIError(e)
@@ -1651,14 +1746,6 @@ def _is_instance_in_error(cr):
     return cr.status.state is not None and cr.status.state.lower() == "error"
 
 
-def _get_error_message(cr):
-    """
-    Get error message from the status of custom resource
-    :param cr: Instance to get error message.
-    """
-    return cr.status.message
-
-
 def _get_user_pass(client, name):
     # Username
     username = os.environ.get(AZDATA_USERNAME)
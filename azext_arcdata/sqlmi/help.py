@@ -78,6 +78,28 @@ helps[
     ex4="Create an indirectly connected SQL managed instance with Active Directory authentication.",
 )
 
+# pylint: disable=line-too-long
+helps[
+    "sql mi-arc create-batch"
+] = """
+    type: command
+    short-summary: {short}
+    long-summary: {long}
+    examples:
+        - name: {ex1}
+          text: >
+            az sql mi-arc create-batch --manifest ./instances.json
+            --k8s-namespace namespace --use-k8s
+""".format(
+    short="Create a batch of SQL managed instances.",
+    long="All instances of the manifest are validated before any of them is "
+    "created, then they are submitted in parallel and waited on together. "
+    "To set the password of the SQL managed instances, set the environment "
+    "variable AZDATA_PASSWORD",
+    ex1="Create the indirectly connected SQL managed instances listed in a "
+    "manifest.",
+)
+
 # pylint: disable=line-too-long
 helps[
     "sql mi-arc update"
@@ -178,8 +200,13 @@ helps[
         - name: {ex1}
           text: >
             az sql mi-arc list --use-k8s
+        - name: {ex2}
+          text: >
+            az sql mi-arc list --all-namespaces --use-k8s
 """.format(
-    short="List SQL managed instances.", ex1="List SQL managed instances."
+    short="List SQL managed instances.",
+    ex1="List SQL managed instances.",
+    ex2="List the SQL managed instances of every namespace.",
 )
 
 # pylint: disable=line-too-long
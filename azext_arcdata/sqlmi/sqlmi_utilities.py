@@ -9,6 +9,7 @@ import pydash as _
 from azext_arcdata.kubernetes_sdk.models.custom_resource import CustomResource
 from azext_arcdata.sqlmi.models.sqlmi_cr_model import SqlmiCustomResource
 from azext_arcdata.kubernetes_sdk.client import KubernetesClient
+from azext_arcdata.kubernetes_sdk.client_pool import get_api_client
 from azext_arcdata.kubernetes_sdk.dc.constants import SQLMI_CRD_NAME
 
 
@@ -75,7 +76,9 @@ def resolve_sqlmi_instances(
     desired_version=None,
 ) -> list:
 
-    client = KubernetesClient.resolve_k8s_client().CustomObjectsApi()
+    client = KubernetesClient.resolve_k8s_client().CustomObjectsApi(
+        get_api_client()
+    )
 
     response = client.list_namespaced_custom_object(
         namespace=namespace,
@@ -15,6 +15,7 @@ from azext_arcdata.kubernetes_sdk.dc.constants import (
 )
 from azext_arcdata.kubernetes_sdk.models.custom_resource import CustomResource
 from azext_arcdata.kubernetes_sdk.util import check_secret_exists_with_retries
+from azext_arcdata.kubernetes_sdk.client_pool import get_api_client
 from azext_arcdata.kubernetes_sdk.dc.constants import DATA_CONTROLLER_CRD_NAME
 from azext_arcdata.core.constants import ARC_API_V1BETA2
 from azext_arcdata.core.constants import (
@@ -472,7 +473,9 @@ def resolve_old_dag_items(
     namespace,
 ) -> list:
 
-    client = KubernetesClient.resolve_k8s_client().CustomObjectsApi()
+    client = KubernetesClient.resolve_k8s_client().CustomObjectsApi(
+        get_api_client()
+    )
 
     try:
         response = client.list_namespaced_custom_object(
@@ -62,6 +62,11 @@ def validate_create(namespace):
         )
 
 
+def validate_create_batch(namespace):
+    if namespace.concurrency is not None and namespace.concurrency < 1:
+        raise ValueError("The '--concurrency' must be at least 1.")
+
+
 def validate_delete(namespace):
     validators.validate_mutually_exclusive_direct_indirect(namespace)
 
@@ -73,6 +78,18 @@ def validate_show(namespace):
 def validate_list(namespace):
     validators.validate_mutually_exclusive_direct_indirect(namespace)
 
+    if namespace.all_namespaces:
+        if not namespace.use_k8s:
+            raise ValueError(
+                "Cannot specify '--all-namespaces/-A' without '--use-k8s'. "
+                "The '--all-namespaces/-A' is only available for indirect mode."
+            )
+        if namespace.namespace:
+            raise ValueError(
+                "Cannot specify both '--k8s-namespace/-k' and "
+                "'--all-namespaces/-A'."
+            )
+
 
 def validate_upgrade(namespace):
     validators.validate_mutually_exclusive_direct_indirect(namespace)
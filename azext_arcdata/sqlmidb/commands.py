@@ -4,9 +4,11 @@
 # license information.
 # ------------------------------------------------------------------------------
 
-from azext_arcdata.sqlmidb.client import beget, beget_no_namespace
+from azext_arcdata.core.client_factory import lazy_beget
 from azure.cli.core.commands import CliCommandType
 
+beget = lazy_beget("azext_arcdata.sqlmidb.client#beget")
+
 
 def load_commands(self, _):
     operations = CliCommandType(
@@ -0,0 +1,10 @@
+# ------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# ------------------------------------------------------------------------------
+
+"""
+Development tools of the extension, run from the root of the repository. They
+are not part of the extension package.
+"""
@@ -0,0 +1,384 @@
+# ------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# ------------------------------------------------------------------------------
+
+"""
+Micro-benchmarks of the hot paths of the extension.
+
+`python -m tools.benchmark [name ...]` runs every benchmark, or
+the named ones, and reports the best time per call over a few runs so that a
+change can be compared before and after on the same machine. With
+`--connections` it instead counts the connections opened to a local stub of
+the Kubernetes API server, with a new `ApiClient` per call and with the
+shared one. None of them needs a cluster or an Azure subscription.
+"""
+
+from collections import OrderedDict
+
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import timeit
+
+__all__ = ["benchmark", "count_api_server_connections", "run_benchmarks"]
+
+BENCHMARK_REPEAT = 5
+"""
+Number of timed runs of each benchmark, the fastest one is reported.
+"""
+
+CONNECTION_COUNT_READS = 50
+"""
+Number of reads made by each way of creating clients when counting the
+connections opened to the API server.
+"""
+
+_benchmarks = OrderedDict()
+
+
+def benchmark(name):
+    """
+    Decorator registering a benchmark. The decorated function sets the
+    benchmark up and returns the callable, without arguments, that is timed.
+    :param name: The name of the benchmark.
+    """
+
+    def register(setup):
+        _benchmarks[name] = setup
+        return setup
+
+    return register
+
+
+def run_benchmarks(names=None, repeat=BENCHMARK_REPEAT):
+    """
+    Run the named benchmarks, every benchmark if no name is given. The number
+    of calls per run is calibrated so that a run takes at least 0.2 seconds.
+    :param names: The names of the benchmarks to run.
+    :param repeat: The number of timed runs of each benchmark.
+    :return: The seconds per call of the fastest run, keyed by benchmark.
+    """
+    names = list(names or _benchmarks)
+    unknown = [name for name in names if name not in _benchmarks]
+    if unknown:
+        raise ValueError(
+            "Unknown benchmark(s) {0}, choose from {1}.".format(
+                ", ".join(unknown), ", ".join(_benchmarks)
+            )
+        )
+
+    results = OrderedDict()
+    for name in names:
+        timer = timeit.Timer(_benchmarks[name]())
+        number, _ = timer.autorange()
+        results[name] = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    return results
+
+
+def count_api_server_connections(reads=CONNECTION_COUNT_READS):
+    """
+    Count the connections opened to a local stub of the Kubernetes API server
+    by `reads` namespace reads, made with a new `ApiClient` per read, as the
+    API objects were created before the shared client, and with
+    `get_api_client`.
+    :param reads: The number of reads made each way.
+    :return: The number of connections opened, keyed by way of creating
+    clients.
+    """
+    from azext_arcdata.kubernetes_sdk.client_pool import get_api_client
+    from kubernetes import client as k8sClient
+    from unittest import mock
+    from urllib3.connectionpool import HTTPConnectionPool
+
+    server = _serve_api_server_stub()
+    try:
+        configuration = k8sClient.Configuration()
+        configuration.host = "http://127.0.0.1:{0}".format(
+            server.server_address[1]
+        )
+        k8sClient.Configuration.set_default(configuration)
+
+        results = OrderedDict()
+        for description, new_client in [
+            ("new ApiClient per call", k8sClient.ApiClient),
+            ("get_api_client", get_api_client),
+        ]:
+            new_conn = HTTPConnectionPool._new_conn
+            opened = []
+
+            def counting_new_conn(pool):
+                opened.append(pool)
+                return new_conn(pool)
+
+            with mock.patch.object(
+                HTTPConnectionPool, "_new_conn", counting_new_conn
+            ):
+                for _ in range(reads):
+                    k8sClient.CoreV1Api(new_client()).read_namespace("default")
+
+            results[description] = len(opened)
+
+        return results
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _serve_api_server_stub():
+    """
+    Start an HTTP/1.1 server with keep-alive on a free local port that
+    answers every GET with the same namespace.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    import json
+    import threading
+
+    body = json.dumps(
+        {"apiVersion": "v1", "kind": "Namespace", "metadata": {"name": "x"}}
+    ).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class _Node(object):
+    """
+    Plain object encoded by the serialization benchmarks.
+    """
+
+    def __init__(self, index=0):
+        self.index = index
+        self.name = "node-{0}".format(index)
+        self.labels = {"app": "bench", "tier": str(index % 3)}
+        self.parent = None
+        self.children = []
+
+
+def _node_graph(size=400):
+    nodes = [_Node(i) for i in range(size)]
+    for i, node in enumerate(nodes[1:], 1):
+        node.parent = nodes[(i - 1) // 4]
+        node.parent.children.append(node)
+    return nodes[0]
+
+
+def _custom_resource(index, kind):
+    return {
+        "kind": kind,
+        "metadata": {"name": "{0}-{1}".format(kind.lower(), index)},
+        "spec": {"scale": {"replicas": 3, "workers": 2}},
+        "status": {
+            "state": "Ready",
+            "readyReplicas": "3/3",
+            "endpoints": {"primary": "10.0.0.{0}:1433".format(index % 255)},
+        },
+    }
+
+
+@benchmark("json-encode")
+def _json_encode():
+    """
+    `to_json` of a 400 object graph with back references.
+    """
+    from azext_arcdata.core.json_serialization import to_json
+
+    graph = _node_graph()
+    return lambda: to_json(graph)
+
+
+@benchmark("json-decode")
+def _json_decode():
+    """
+    `from_json` of the encoded 400 object graph.
+    """
+    from azext_arcdata.core.json_serialization import from_json, to_json
+
+    document = to_json(_node_graph())
+    return lambda: from_json(document)
+
+
+@benchmark("api-client")
+def _api_client():
+    """
+    `get_api_client` for an already loaded kube configuration.
+    """
+    from azext_arcdata.kubernetes_sdk.client_pool import get_api_client
+    from kubernetes.client import Configuration
+
+    configuration = Configuration()
+    configuration.host = "https://127.0.0.1:6443"
+    configuration.api_key = {"authorization": "Bearer benchmark"}
+    Configuration.set_default(configuration)
+    return get_api_client
+
+
+@benchmark("kube-config")
+def _kube_config():
+    """
+    `check_and_set_kubectl_context` for an unchanged kubeconfig. `KUBECONFIG`
+    is pointed at a temporary kubeconfig for the rest of the process.
+    """
+    from azext_arcdata.core.util import check_and_set_kubectl_context
+
+    kube_config = os.path.join(tempfile.mkdtemp(), "config")
+    with open(kube_config, "w") as f:
+        f.write(
+            "apiVersion: v1\n"
+            "kind: Config\n"
+            "clusters:\n"
+            "- name: bench\n"
+            "  cluster:\n"
+            "    server: https://127.0.0.1:6443\n"
+            "contexts:\n"
+            "- name: bench\n"
+            "  context:\n"
+            "    cluster: bench\n"
+            "    user: bench\n"
+            "current-context: bench\n"
+            "users:\n"
+            "- name: bench\n"
+            "  user:\n"
+            "    token: benchmark\n"
+        )
+    os.environ["KUBECONFIG"] = kube_config
+    os.environ.pop("KUBECTL_CONTEXT", None)
+    os.environ.pop("KUBERNETES_SERVICE_HOST", None)
+    return check_and_set_kubectl_context
+
+
+@benchmark("config-patch")
+def _config_patch():
+    """
+    `DeploymentConfigUtil.inline_patch` of key paths and a filtered json path
+    on a deployment profile.
+    """
+    from azext_arcdata.core.util import DeploymentConfigUtil
+
+    config = {
+        "spec": {
+            "docker": {"imageTag": "v1.0.0", "registry": "mcr.microsoft.com"},
+            "services": [
+                {"name": "controller", "port": 30080},
+                {"name": "serviceProxy", "port": 30777},
+            ],
+            "storage": {"data": {"size": "15Gi"}, "logs": {"size": "10Gi"}},
+        }
+    }
+    values = (
+        "spec.docker.imageTag=v1.1.0,spec.storage.data.size=20Gi,"
+        "spec.storage.logs.size=20Gi,"
+        '$.spec.services[?(@.name=="controller")].port=30081'
+    )
+    return lambda: DeploymentConfigUtil.inline_patch(config, values, "replace")
+
+
+@benchmark("retry")
+def _retry():
+    """
+    `retry` of a call that fails twice, without delay between attempts.
+    """
+    from azext_arcdata.core.util import retry
+
+    calls = itertools.count(1)
+
+    def flaky():
+        if next(calls) % 3:
+            raise ConnectionError()
+        return True
+
+    return lambda: retry(
+        flaky,
+        retry_count=3,
+        retry_delay=0,
+        retry_method="benchmark",
+        retry_on_exceptions=(ConnectionError,),
+    )
+
+
+@benchmark("list-rows")
+def _list_rows():
+    """
+    Project 500 raw SQL managed instances and 500 raw server groups into the
+    rows of `sql mi-arc list` and `postgres arc-server list`.
+    """
+    from azext_arcdata.postgres.custom import _postgres_list_entry
+    from azext_arcdata.sqlmi.custom import _sqlmi_list_entry
+
+    sqlmis = [_custom_resource(i, "SqlManagedInstance") for i in range(500)]
+    servers = [_custom_resource(i, "PostgreSql") for i in range(500)]
+
+    def project():
+        [_sqlmi_list_entry(item, True) for item in sqlmis]
+        [_postgres_list_entry(item, True) for item in servers]
+
+    return project
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.benchmark",
+        description="Run micro-benchmarks of the extension.",
+    )
+    parser.add_argument(
+        "names",
+        nargs="*",
+        metavar="name",
+        help="The benchmarks to run: {0}.".format(", ".join(_benchmarks)),
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=BENCHMARK_REPEAT,
+        help="The number of timed runs of each benchmark.",
+    )
+    parser.add_argument(
+        "--connections",
+        action="store_true",
+        help="Count the connections opened to a local API server stub "
+        "instead.",
+    )
+    args = parser.parse_args(args)
+
+    if args.connections:
+        for description, count in count_api_server_connections().items():
+            print(
+                "{0}: {1} connection(s) for {2} reads".format(
+                    description, count, CONNECTION_COUNT_READS
+                )
+            )
+        return 0
+
+    try:
+        results = run_benchmarks(args.names, args.repeat)
+    except ValueError as e:
+        parser.error(str(e))
+
+    width = max(len(name) for name in _benchmarks)
+    for name, seconds in results.items():
+        print("{0}  {1:10.1f}us".format(name.ljust(width), seconds * 1e6))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+# ------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# ------------------------------------------------------------------------------
+
+"""
+Import time regression check of the extension.
+
+`python -m tools.import_budget` measures, each in a fresh
+interpreter, `import azext_arcdata` and the loading of the `sql mi-arc list`
+command table and arguments. It fails when either takes longer than its
+budget or imports a dependency that is only needed once a command runs. The
+slowest imports, as reported by `-X importtime`, are listed on failure.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+__all__ = ["check_import_budget", "measure_import_time"]
+
+IMPORT_BUDGET_SECONDS = 0.15
+"""
+Budget of `import azext_arcdata`, once the Azure CLI core is imported.
+"""
+
+LOADER_BUDGET_SECONDS = 0.1
+"""
+Budget of loading the command table and the arguments of `sql mi-arc list`,
+once the extension is imported.
+"""
+
+DEFERRED_MODULES = (
+    "jinja2",
+    "jsonpatch",
+    "jsonpath_ng",
+    "kubernetes",
+    "pem",
+    "requests",
+)
+"""
+Dependencies that are only imported once a command runs.
+"""
+
+REPORTED_IMPORTS = 10
+"""
+Number of slowest imports reported when a budget is exceeded.
+"""
+
+_MARKER = "tools.import_budget"
+
+# The root of the repository, the measured `azext_arcdata` is imported from it
+#
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SETUP = """
+from azure.cli.core import get_default_cli
+import knack
+
+cli = get_default_cli()
+"""
+
+_IMPORT = """
+import azext_arcdata
+"""
+
+_LOADER = """
+from azext_arcdata import ArcDataCommandsLoader
+
+class Invocation(object):
+    data = {{"command_string": {command!r}}}
+
+cli.invocation = Invocation()
+loader = ArcDataCommandsLoader(cli)
+loader.load_command_table({command!r}.split())
+loader.command_name = {command!r}
+loader.load_arguments({command!r})
+"""
+
+_REPORT = """
+import json
+print(
+    json.dumps(
+        {{
+            "seconds": time.perf_counter() - start,
+            "deferred": sorted(
+                set(m.split(".")[0] for m in set(sys.modules) - imported)
+                & set({deferred!r})
+            ),
+        }}
+    )
+)
+"""
+
+
+def measure_import_time(code, setup=_SETUP):
+    """
+    Run `code` in a fresh interpreter with `-X importtime`, after `setup`.
+    :param code: The code that is measured.
+    :param setup: The code run first, it is not measured.
+    :return: The seconds `code` took, its slowest top level imports as
+    (seconds, module) and the deferred modules it imported.
+    """
+    script = "\n".join(
+        [
+            setup,
+            "import sys",
+            "import time",
+            "sys.stderr.write('import time: | | {0}\\n')".format(_MARKER),
+            "imported = set(sys.modules)",
+            "start = time.perf_counter()",
+            code,
+            _REPORT.format(deferred=DEFERRED_MODULES),
+        ]
+    )
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=_ROOT,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    # `importlib.import_module` is not reported by `-X importtime`, so the
+    # imports only explain the time, they do not measure it
+    #
+    imports = []
+    measured = False
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        fields = line.split("|")
+        if fields[-1].strip() == _MARKER:
+            measured = True
+        elif measured and fields[1].strip().isdigit():
+            # Nested imports are indented, their time is already part of
+            # the top level import that triggered them
+            #
+            if not fields[-1][1:].startswith(" "):
+                imports.append((int(fields[1]) / 1e6, fields[-1].strip()))
+
+    report = json.loads(process.stdout.strip().splitlines()[-1])
+    return (
+        report["seconds"],
+        sorted(imports, reverse=True)[:REPORTED_IMPORTS],
+        report["deferred"],
+    )
+
+
+def check_import_budget(command="sql mi-arc list"):
+    """
+    Check the import time of the extension and of loading a command against
+    their budgets.
+    :param command: The command whose loader path is checked.
+    :return: A description of each budget that was exceeded.
+    """
+    failures = []
+    for description, setup, code, budget in [
+        ("import azext_arcdata", _SETUP, _IMPORT, IMPORT_BUDGET_SECONDS),
+        (
+            "loading `{0}`".format(command),
+            _SETUP + _IMPORT,
+            _LOADER.format(command=command),
+            LOADER_BUDGET_SECONDS,
+        ),
+    ]:
+        seconds, slowest, deferred = measure_import_time(code, setup)
+        print(
+            "{0}: {1:.3f}s (budget {2:.3f}s)".format(
+                description, seconds, budget
+            )
+        )
+
+        if seconds > budget:
+            failures.append(
+                "{0} took {1:.3f}s, over its {2:.3f}s budget. Slowest "
+                "imports:\n{3}".format(
+                    description,
+                    seconds,
+                    budget,
+                    "\n".join(
+                        "    {0:.3f}s {1}".format(s, m) for s, m in slowest
+                    ),
+                )
+            )
+        if deferred:
+            failures.append(
+                "{0} imported {1}.".format(description, ", ".join(deferred))
+            )
+
+    return failures
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.import_budget",
+        description="Check the import time of the extension.",
+    )
+    parser.add_argument(
+        "--command",
+        default="sql mi-arc list",
+        help="The command whose loader path is checked.",
+    )
+    failures = check_import_budget(parser.parse_args(args).command)
+    for failure in failures:
+        print(failure, file=sys.stderr)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())